@@ -0,0 +1,105 @@
+import logging
+
+# Maps each accessory name to the id of its item_tr row in one pass over the Components table.
+RESOLVE_ROWS_JS = """
+var wanted = arguments[0];
+var found = {};
+var rows = document.querySelectorAll('tr.item_tr');
+for (var i = 0; i < rows.length; i++) {
+    var spans = rows[i].querySelectorAll('td span');
+    for (var j = 0; j < spans.length; j++) {
+        var text = spans[j].textContent.replace(/\\s+/g, ' ').trim();
+        if (wanted.indexOf(text) !== -1 && !(text in found)) {
+            found[text] = rows[i].id;
+        }
+    }
+}
+return found;
+"""
+
+# Drives the page's own editing path for every row: click the quantity cell so the page
+# creates its popup input, set the value, fire input/change and confirm with Enter.
+APPLY_QUANTITIES_JS = """
+var items = arguments[0];
+var applied = [];
+function pressEnter(input) {
+    if (window.jQuery) {
+        window.jQuery(input).trigger(window.jQuery.Event('keydown', {which: 13, keyCode: 13}));
+        window.jQuery(input).trigger(window.jQuery.Event('keyup', {which: 13, keyCode: 13}));
+    } else {
+        ['keydown', 'keyup'].forEach(function (type) {
+            var event = new KeyboardEvent(type, {key: 'Enter', bubbles: true});
+            Object.defineProperty(event, 'keyCode', {get: function () { return 13; }});
+            Object.defineProperty(event, 'which', {get: function () { return 13; }});
+            input.dispatchEvent(event);
+        });
+    }
+}
+for (var i = 0; i < items.length; i++) {
+    var row = document.getElementById(items[i][0]);
+    var cell = row && row.querySelector('td.item_qty');
+    if (!cell) { continue; }
+    cell.scrollIntoView({block: 'center'});
+    cell.dispatchEvent(new MouseEvent('mousedown', {bubbles: true}));
+    cell.dispatchEvent(new MouseEvent('mouseup', {bubbles: true}));
+    cell.click();
+    var input = document.getElementById('popup_textbox');
+    if (!input && document.activeElement && document.activeElement.tagName === 'INPUT') {
+        input = document.activeElement;
+    }
+    if (!input) { continue; }
+    input.value = items[i][1];
+    input.dispatchEvent(new Event('input', {bubbles: true}));
+    input.dispatchEvent(new Event('change', {bubbles: true}));
+    pressEnter(input);
+    applied.push(items[i][0]);
+}
+return applied;
+"""
+
+# Reads every requested row at once and returns the ids that are selected with the expected quantity.
+CONFIRMED_ROWS_JS = """
+var items = arguments[0];
+return items.filter(function (item) {
+    var row = document.getElementById(item[0]);
+    var cell = row && row.querySelector('td.item_qty');
+    return row && cell && (' ' + row.className + ' ').indexOf(' selected ') !== -1
+        && cell.textContent.trim() === item[1];
+}).map(function (item) { return item[0]; });
+"""
+
+
+def clean_accessory_name(acc_name):
+    """Strips the leading dash accessories are written with in Config.txt."""
+    return acc_name.strip().lstrip('-').strip()
+
+
+def set_quantities_bulk(driver, waiter, accessories, confirm=True):
+    """Sets accessory quantities with a few in-page scripts.
+
+    Returns the accessories that could not be confirmed as set, for the per-accessory fallback.
+    Without `confirm`, every row the page's editor accepted counts as set and is not read back.
+    """
+    names = {clean_accessory_name(acc_name): acc_name for acc_name in accessories}
+    row_ids = driver.execute_script(RESOLVE_ROWS_JS, list(names))
+    missing = [name for name in names if name not in row_ids]
+    if missing:
+        logging.info(f"Bulk accessory path could not find rows for: {missing}")
+
+    items = [[row_ids[name], str(accessories[names[name]])] for name in names if name in row_ids]
+    applied = driver.execute_script(APPLY_QUANTITIES_JS, items) if items else []
+    logging.info(f"Bulk accessory path applied {len(applied)}/{len(accessories)} quantities.")
+    if applied:
+        waiter.idle("bulk accessory quantities", timeout=10, fallback=1)
+
+    applied_items = [item for item in items if item[0] in applied]
+    if not confirm:
+        selected = set(applied)
+    else:
+        selected = set(driver.execute_script(CONFIRMED_ROWS_JS, applied_items)) if applied_items else set()
+    remaining = {
+        names[name]: accessories[names[name]]
+        for name in names if row_ids.get(name) not in selected
+    }
+    logging.info(f"Bulk accessory path confirmed {len(selected)} rows, {len(remaining)} left for the fallback.")
+    return remaining
@@ -0,0 +1,104 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from login import run_quotation, setup_logging
+
+WORKER_SLOT = 0  # Set in each worker process by init_worker
+
+
+def collect_config_files(paths):
+    """Expands directories into the .txt configuration files they contain."""
+    config_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            config_files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith('.txt') and os.path.isfile(os.path.join(path, name))
+            ))
+        else:
+            config_files.append(path)
+    return config_files
+
+
+def run_names(config_files):
+    """Derives a unique run directory name for each configuration file."""
+    names = []
+    seen = {}
+    for path in config_files:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        seen[stem] = seen.get(stem, 0) + 1
+        names.append(stem if seen[stem] == 1 else f"{stem}_{seen[stem]}")
+    return names
+
+
+def init_worker(slots):
+    """Claims a worker slot for the life of the process, so each worker keeps its own browser cache."""
+    global WORKER_SLOT
+    WORKER_SLOT = slots.get()
+
+
+def run_worker(config_file, run_name, output_dir, run_options=None, log_level=logging.INFO):
+    """Runs one configuration in a worker process with its own log file and screenshot directory."""
+    run_dir = os.path.join(output_dir, run_name)
+    os.makedirs(run_dir, exist_ok=True)
+    setup_logging(os.path.join(run_dir, "log.txt"), run=run_name, level=log_level)
+    run_options = dict(run_options or {})
+    if run_options.get('trace_file'):
+        run_options['trace_file'] = os.path.join(run_dir, run_options['trace_file'])
+    if run_options.get('browser_cache_dir'):
+        # Concurrent Chromes must not share a disk cache; a slot's directory is reused by the next batch
+        run_options['browser_cache_dir'] = os.path.join(run_options['browser_cache_dir'], f"worker_{WORKER_SLOT}")
+
+    start = time.perf_counter()
+    try:
+        ok = run_quotation(config_file, screenshot_dir=run_dir, **run_options)
+        error = None if ok else "run reported failure"
+    except Exception as e:
+        logging.error(f"Worker failed for {config_file}: {e}", exc_info=True)
+        ok, error = False, str(e)
+    return config_file, ok, time.perf_counter() - start, error
+
+
+def run_batch(paths, workers=1, output_dir='runs', run_options=None):
+    """Spreads configuration files over a pool of browser workers and logs a summary."""
+    config_files = collect_config_files(paths)
+    if not config_files:
+        logging.error("No configuration files found.")
+        return []
+
+    workers = max(1, min(workers, len(config_files)))
+    logging.info(f"Running {len(config_files)} configurations with {workers} workers.")
+
+    start = time.perf_counter()
+    results = []
+    slots = multiprocessing.Queue()
+    for slot in range(workers):
+        slots.put(slot)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(slots,)) as executor:
+        futures = {
+            executor.submit(run_worker, path, name, output_dir, run_options, logging.getLogger().level): path
+            for path, name in zip(config_files, run_names(config_files))
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = (futures[future], False, 0.0, str(e))
+            config_file, ok, elapsed, error = result
+            if ok:
+                logging.info(f"[OK]     {config_file} ({elapsed:.1f}s)")
+            else:
+                logging.error(f"[FAILED] {config_file} ({elapsed:.1f}s): {error}")
+            results.append(result)
+
+    wall = time.perf_counter() - start
+    succeeded = sum(1 for _, ok, _, _ in results if ok)
+    logging.info("====== Batch summary ======")
+    logging.info(f"Succeeded: {succeeded}/{len(results)}, failed: {len(results) - succeeded}")
+    logging.info(f"Wall time: {wall:.1f}s, {len(results) / max(wall, 1e-6) * 60:.2f} quotations/minute")
+    for config_file, ok, elapsed, error in sorted(results):
+        logging.info(f"  {'OK    ' if ok else 'FAILED'}  {elapsed:7.1f}s  {config_file}")
+    return results
@@ -0,0 +1,164 @@
+"""End-to-end benchmark of login.py against the local mock iConfig server.
+
+    python benchmark.py --sizes 10 100 1000 --latency 0.05
+
+Each size is the number of BOM lines (products plus accessories) in a generated
+config. Chrome runs headless; the report gives end-to-end time and time per product,
+and checks the quotation the mock ended up with against the generated config.
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+from login import get_config, run_quotation, setup_logging
+from mock_iconfig import MockIConfig, start_mock_server
+
+ACCESSORIES_PER_CHASSIS = 4
+
+
+def generate_bom(lines, name="Benchmark"):
+    """Builds a config with about `lines` BOM lines and the mock catalogue that serves it.
+
+    Every third product is an SFP part without accessories; the others are chassis
+    with a few accessories each.
+    """
+    body = [
+        "Page 1: Set basic information",
+        f"Quotation name: {name} {lines}",
+        "Country: Spain",
+        "Is U.S. ECCN needed: No",
+        "",
+        "Page 2: Configuration",
+    ]
+    catalogue = {}
+    index = 0
+    written = 0
+    while written < lines:
+        index += 1
+        if index % 3 == 0:
+            product = f"SFP-MOCK-{index:04d}"
+            catalogue[product] = {'tab': 'Parts', 'accessories': []}
+            body.append(f"{product}\t\t{index % 5 + 1}pcs")
+            written += 1
+            continue
+        product = f"S5130-MOCK-{index:04d}"
+        accessories = [f"UN-MOCK-ACC-{index:04d}-{j}" for j in range(ACCESSORIES_PER_CHASSIS)]
+        catalogue[product] = {'tab': 'Standard', 'accessories': accessories}
+        body.append(f"{product}\t\t{index % 4 + 1}pcs")
+        written += 1
+        for j, acc_name in enumerate(accessories):
+            if written >= lines:
+                break
+            body.append(f"    -{acc_name}\t{j + 1}")
+            written += 1
+    return "\n".join(body) + "\n", catalogue
+
+
+def verify(app, config):
+    """Compares the mock's final quotation with the config. Returns a list of differences."""
+    if not app.quotations:
+        return ["no quotation was saved"]
+    rows = {row['config_name']: row for row in list(app.quotations.values())[-1]['rows']}
+    problems = []
+    for name, data in config['products'].items():
+        row = rows.get(name)
+        if not row:
+            problems.append(f"{name}: missing")
+            continue
+        if row['sets'] != data['quantity']:
+            problems.append(f"{name}: sets {row['sets']} != {data['quantity']}")
+        for acc_name, qty in data['accessories'].items():
+            cleaned = acc_name.strip().lstrip('-').strip()
+            if row['accessories'].get(cleaned) != qty:
+                problems.append(f"{name}/{cleaned}: qty {row['accessories'].get(cleaned)} != {qty}")
+    return problems
+
+
+def run_size(lines, latency, work_dir, run_options):
+    """Runs one generated BOM end to end and returns its result row."""
+    text, catalogue = generate_bom(lines)
+    config_file = os.path.join(work_dir, f"bom_{lines}.txt")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+    config = get_config(config_file)
+
+    app = MockIConfig(catalogue, latency=latency)
+    server, base_url = start_mock_server(app)
+    run_dir = os.path.join(work_dir, f"run_{lines}")
+    setup_logging(os.path.join(work_dir, f"log_{lines}.txt"))
+    try:
+        start = time.perf_counter()
+        ok = run_quotation(
+            config_file,
+            screenshot_dir=run_dir,
+            session_file=None,
+            catalogue_file=os.path.join(work_dir, "catalogue_cache.json"),
+            trace_file=os.path.join(run_dir, "trace.jsonl"),
+            history_file=os.path.join(work_dir, "run_history.sqlite"),
+            base_url=base_url,
+            headless=True,
+            **run_options
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    products = len(config['products'])
+    problems = verify(app, config)
+    return {
+        'lines': lines,
+        'products': products,
+        'accessories': sum(len(data['accessories']) for data in config['products'].values()),
+        'seconds': round(elapsed, 2),
+        'seconds_per_product': round(elapsed / max(products, 1), 3),
+        'requests': app.requests,
+        'ok': ok and not problems,
+        'problems': problems[:10],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end benchmark against the mock iConfig server.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='BOM sizes in lines')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock server delay per API request in seconds')
+    parser.add_argument('--work-dir', help='Where configs, logs and traces go (default: a temporary directory)')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--chromedriver', help='Path to a pinned chromedriver')
+    parser.add_argument('--no-bulk-accessories', action='store_true')
+    parser.add_argument('--engine', choices=('browser', 'http'), default='browser')
+    parser.add_argument('--profile', choices=('default', 'lean'), default='default', help='Browser profile')
+    parser.add_argument('--tabs', type=int, default=1, help='Components pages configured at once in tabs')
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='iconfig_bench_')
+    os.makedirs(work_dir, exist_ok=True)
+    run_options = {
+        'chromedriver': args.chromedriver,
+        'bulk_accessories': not args.no_bulk_accessories,
+        'engine': args.engine,
+        'profile': args.profile,
+        'tabs': args.tabs,
+    }
+
+    results = [run_size(lines, args.latency, work_dir, run_options) for lines in args.sizes]
+
+    setup_logging(os.path.join(work_dir, "benchmark_log.txt"))
+    logging.info(f"====== Benchmark ({args.engine} engine, {args.profile} profile, latency {args.latency}s, outputs in {work_dir}) ======")
+    logging.info(f"  {'lines':>6} {'products':>8} {'accessories':>11} {'seconds':>9} {'s/product':>9} {'requests':>8}  result")
+    for r in results:
+        logging.info(
+            f"  {r['lines']:>6} {r['products']:>8} {r['accessories']:>11} {r['seconds']:>9.2f} "
+            f"{r['seconds_per_product']:>9.3f} {r['requests']:>8}  {'OK' if r['ok'] else 'MISMATCH'}"
+        )
+        for problem in r['problems']:
+            logging.info(f"         {problem}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'latency': args.latency, 'results': results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
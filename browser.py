@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+DRIVER_CACHE_FILE = "chromedriver_cache.json"
+DRIVER_CACHE_TTL = 7 * 24 * 3600  # Re-resolve the driver at most once a week
+BROWSER_CACHE_DIR = "chrome_cache"
+PROFILES = ('default', 'lean')
+VIEWPORT = (1920, 1080)
+
+# Requests the lean profile never makes: web fonts and analytics/tracking hosts
+LEAN_BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hm.baidu.com*", "*cnzz.com*", "*growingio.com*", "*facebook.net*", "*hotjar.com*",
+]
+
+
+def installed_chrome_version():
+    """Returns the locally installed Chrome version without any network access, or None."""
+    try:
+        from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except ImportError:
+        pass
+    try:
+        from webdriver_manager.core.utils import get_browser_version_from_os, ChromeType
+        return get_browser_version_from_os(ChromeType.GOOGLE)
+    except ImportError:
+        return None
+
+
+def major_version(version):
+    """Returns the major part of a version string such as '138.0.7204.98'."""
+    return version.split('.')[0] if version else None
+
+
+def load_driver_cache(cache_file=DRIVER_CACHE_FILE):
+    """Reads the cached driver entry, or returns None."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cached_driver_path(cache_file=DRIVER_CACHE_FILE, ttl=DRIVER_CACHE_TTL):
+    """Returns the cached driver path if it is still on disk, fresh and matches the installed Chrome."""
+    entry = load_driver_cache(cache_file)
+    if not entry:
+        return None
+    path = entry.get('path')
+    if not path or not os.path.isfile(path):
+        logging.info("Cached chromedriver is no longer on disk.")
+        return None
+    if time.time() - entry.get('resolved_at', 0) > ttl:
+        logging.info("Cached chromedriver entry has expired.")
+        return None
+    chrome_version = installed_chrome_version()
+    if chrome_version and major_version(chrome_version) != major_version(entry.get('chrome_version')):
+        logging.info(f"Chrome was updated to {chrome_version}, cached chromedriver no longer matches.")
+        return None
+    return path
+
+
+def resolve_chromedriver(pinned_path=None, cache_file=DRIVER_CACHE_FILE, ttl=DRIVER_CACHE_TTL):
+    """Finds a chromedriver: pinned path first, then the local cache, then webdriver_manager."""
+    pinned_path = pinned_path or os.environ.get('CHROMEDRIVER_PATH')
+    if pinned_path:
+        if not os.path.isfile(pinned_path):
+            raise FileNotFoundError(f"Pinned chromedriver not found: {pinned_path}")
+        logging.info(f"Using pinned chromedriver: {pinned_path}")
+        return pinned_path
+
+    path = cached_driver_path(cache_file, ttl)
+    if path:
+        logging.info(f"Using cached chromedriver: {path}")
+        return path
+
+    logging.info("====== WebDriver manager ======")
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    entry = {'path': path, 'chrome_version': installed_chrome_version(), 'resolved_at': time.time()}
+    tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, cache_file)
+    return path
+
+
+def create_driver(pinned_path=None, headless=False, profile='default', cache_dir=BROWSER_CACHE_DIR, blocked_urls=(),
+                  network_report=False):
+    """Starts Chrome and returns the driver together with its startup timings in seconds.
+
+    The 'lean' profile runs headless at a fixed viewport with eager page loads, keeps a disk
+    cache in `cache_dir` shared between runs, and does not load images, web fonts, analytics
+    or any of `blocked_urls`. Browsers running at the same time must not share a `cache_dir`.
+    `network_report` turns on the network event log that NetworkMonitor reads.
+    """
+    start = time.perf_counter()
+    service = Service(resolve_chromedriver(pinned_path))
+    resolved = time.perf_counter()
+    options = webdriver.ChromeOptions()
+    lean = profile == 'lean'
+    if headless or lean:
+        options.add_argument('--headless=new')
+        options.add_argument(f'--window-size={VIEWPORT[0]},{VIEWPORT[1]}')
+    if lean:
+        options.page_load_strategy = 'eager'
+        options.add_argument(f'--disk-cache-dir={os.path.abspath(cache_dir)}')
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    # Console messages for failure diagnostics, network events only when they are reported
+    logging_prefs = {'browser': 'ALL'}
+    if network_report:
+        logging_prefs['performance'] = 'ALL'
+    options.set_capability('goog:loggingPrefs', logging_prefs)
+    driver = webdriver.Chrome(service=service, options=options)
+    if lean or blocked_urls:
+        urls = (LEAN_BLOCKED_URLS if lean else []) + list(blocked_urls)
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': urls})
+        logging.info(f"Blocking {len(urls)} URL pattern(s) through the DevTools protocol.")
+    launched = time.perf_counter()
+
+    startup = {'resolve': resolved - start, 'launch': launched - resolved, 'total': launched - start}
+    logging.info(
+        f"Driver startup took {startup['total']:.2f}s "
+        f"(resolve {startup['resolve']:.2f}s, launch {startup['launch']:.2f}s)."
+    )
+    return driver, startup
+
+
+class NetworkMonitor:
+    """Totals the network events Chrome logs for a run: requests, bytes transferred and page loads.
+
+    Chrome buffers the events until they are read, so collect() is called between steps.
+    Without `enabled` the browser logs no network events and the monitor does nothing.
+    """
+
+    def __init__(self, driver, enabled=True):
+        self.driver = driver
+        self.stats = {'requests': 0, 'blocked': 0, 'bytes': 0, 'page_loads': 0, 'page_load_time': 0.0}
+        self.available = enabled
+        self._navigation_start = None
+
+    def collect(self):
+        if not self.available:
+            return self.stats
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            logging.warning(f"Network statistics are unavailable: {e}")
+            self.available = False
+            return self.stats
+        stats = self.stats
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            method, params = message['method'], message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                stats['requests'] += 1
+                if params.get('type') == 'Document':
+                    self._navigation_start = params['timestamp']
+            elif method == 'Network.loadingFinished':
+                stats['bytes'] += params.get('encodedDataLength', 0)
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                stats['blocked'] += 1
+            elif method == 'Page.loadEventFired' and self._navigation_start is not None:
+                stats['page_loads'] += 1
+                stats['page_load_time'] += params['timestamp'] - self._navigation_start
+                self._navigation_start = None
+        return stats
+
+    def log_summary(self):
+        stats = self.collect()
+        if not self.available:
+            return
+        average = stats['page_load_time'] / stats['page_loads'] if stats['page_loads'] else 0.0
+        logging.info(
+            f"Network: {stats['requests']} requests ({stats['blocked']} blocked), "
+            f"{stats['bytes'] / 1e6:.2f} MB transferred, {stats['page_loads']} page loads "
+            f"taking {stats['page_load_time']:.2f}s ({average:.2f}s average)."
+        )
+
+
+def browser_memory_mb(driver):
+    """Resident memory of chromedriver and the Chrome processes it started, or None without psutil."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (psutil.Error, AttributeError):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue  # Renderer exited between listing and reading
+    return total / 1e6
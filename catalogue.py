@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+import re
+import time
+
+CATALOGUE_FILE = "catalogue_cache.json"
+CATALOGUE_TTL = 30 * 24 * 3600  # Product codes rarely change; re-check monthly
+CATALOGUE_MAX_ENTRIES = 5000
+
+
+def configname_prefix(config_name):
+    """Strips the numeric suffix iConfig appends to a config name, e.g. 'SFP-XG-LX-SM1310-A_3' -> 'SFP-XG-LX-SM1310-A'."""
+    return re.sub(r'_\d+$', '', config_name) or config_name
+
+
+class CatalogueCache:
+    """On-disk index of product name -> product code, tab and configname prefix."""
+
+    def __init__(self, path=CATALOGUE_FILE, ttl=CATALOGUE_TTL, max_entries=CATALOGUE_MAX_ENTRIES, refresh=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.searches_skipped = 0
+        self.looked_up = set()  # Products counted in hits/misses; a product counts once per run
+        self.entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable catalogue cache {self.path}: {e}")
+            return {}
+
+    def get(self, product_name):
+        """Returns the cached entry for a product, or None on a miss or expired entry."""
+        entry = None if self.refresh else self.entries.get(product_name)
+        if entry and time.time() - entry.get('updated_at', 0) > self.ttl:
+            del self.entries[product_name]
+            entry = None
+        first = product_name not in self.looked_up
+        self.looked_up.add(product_name)
+        if entry is None:
+            if first:
+                self.misses += 1
+            return None
+        if first:
+            self.hits += 1
+        entry['last_used'] = time.time()
+        return entry
+
+    def put(self, product_name, **fields):
+        """Records what a search revealed about a product."""
+        entry = self.entries.setdefault(product_name, {})
+        entry.update({key: value for key, value in fields.items() if value is not None})
+        entry['updated_at'] = entry['last_used'] = time.time()
+
+    def save(self):
+        """Merges with entries written by other runs, evicts least recently used ones and writes the file."""
+        merged = self._read()
+        for name, entry in self.entries.items():
+            if entry.get('updated_at', 0) >= merged.get(name, {}).get('updated_at', 0):
+                merged[name] = entry
+        if len(merged) > self.max_entries:
+            by_use = sorted(merged, key=lambda name: merged[name].get('last_used', 0), reverse=True)
+            merged = {name: merged[name] for name in by_use[:self.max_entries]}
+        self.entries = merged
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def log_stats(self):
+        """Logs hit/miss counters for the run."""
+        lookups = self.hits + self.misses
+        if not lookups:
+            return
+        logging.info(
+            f"Catalogue cache: {self.hits}/{lookups} hits, {self.misses} misses, "
+            f"{self.searches_skipped} searches skipped."
+        )
@@ -0,0 +1,327 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from collections import deque
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+from browser import BROWSER_CACHE_DIR, PROFILES, browser_memory_mb, create_driver
+from logs import log_context, setup_logging
+from login import BASE_URL, run_quotation, start_session
+from session import LOGGED_IN_PROBE, SESSION_FILE, is_logged_in, load_session
+from tracing import TRACE_FILE
+from waits import PageWaiter
+
+SPOOL_DIR = "spool"
+QUEUE_DIRS = ('incoming', 'running', 'done', 'failed', 'runs')
+STATUS_FILE = "status.json"
+DEFAULT_RECYCLE_JOBS = 20
+DEFAULT_MAX_MEMORY_MB = 1500
+POLL_INTERVAL = 1.0
+
+
+def write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class JobQueue:
+    """A spool directory of configuration files: incoming/ is the queue, running/ holds claimed jobs.
+
+    Jobs are claimed by renaming them out of incoming/, so several daemons can share a spool.
+    """
+
+    def __init__(self, spool_dir=SPOOL_DIR):
+        self.spool_dir = spool_dir
+        self.dirs = {name: os.path.join(spool_dir, name) for name in QUEUE_DIRS}
+        for path in self.dirs.values():
+            os.makedirs(path, exist_ok=True)
+
+    def submit(self, config_file):
+        """Queues a copy of a configuration file under a unique name and returns that name."""
+        stem = os.path.splitext(os.path.basename(config_file))[0]
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{stem}.txt"
+        tmp_path = os.path.join(self.dirs['incoming'], f".{name}.tmp")
+        shutil.copyfile(config_file, tmp_path)
+        # The daemon only picks up .txt files, so it never reads a partial copy
+        os.replace(tmp_path, os.path.join(self.dirs['incoming'], name))
+        return name
+
+    def pending(self):
+        """Names of the queued jobs, oldest first."""
+        incoming = self.dirs['incoming']
+        names = [name for name in os.listdir(incoming) if name.endswith('.txt') and not name.startswith('.')]
+        return sorted(names, key=lambda name: os.path.getmtime(os.path.join(incoming, name)))
+
+    def claim(self):
+        """Takes the oldest job off the queue. Returns (name, path, seconds queued), or None when it is empty."""
+        for name in self.pending():
+            source = os.path.join(self.dirs['incoming'], name)
+            target = os.path.join(self.dirs['running'], name)
+            try:
+                queued = time.time() - os.path.getmtime(source)
+                os.rename(source, target)
+            except FileNotFoundError:
+                continue  # Claimed by another daemon
+            return name, target, queued
+        return None
+
+    def finish(self, name, ok, result):
+        """Moves a job to done/ or failed/ with its result next to it."""
+        target_dir = self.dirs['done' if ok else 'failed']
+        os.replace(os.path.join(self.dirs['running'], name), os.path.join(target_dir, name))
+        write_json(os.path.join(target_dir, f"{os.path.splitext(name)[0]}.result.json"), result)
+
+
+class WarmBrowser:
+    """A logged-in Chrome kept open between jobs, restarted after `recycle_after` jobs or above `max_memory_mb`."""
+
+    def __init__(self, browser_options, base_url=BASE_URL, session_file=SESSION_FILE,
+                 recycle_after=DEFAULT_RECYCLE_JOBS, max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+        self.browser_options = browser_options
+        self.base_url = base_url
+        self.session_file = session_file
+        self.recycle_after = recycle_after
+        self.max_memory_mb = max_memory_mb
+        self.driver = None
+        self.jobs = 0
+        self.started = 0
+        self.memory_mb = None
+
+    def _log_in(self):
+        waiter = PageWaiter(self.driver, timeout=20)
+        if not start_session(self.driver, WebDriverWait(self.driver, 20), waiter, self.base_url, self.session_file):
+            raise RuntimeError("Could not log in; check Account.txt")
+
+    def acquire(self):
+        """Returns the warm driver, starting and logging in a browser first if there is none."""
+        if self.driver is None:
+            logging.info("Starting a warm browser.")
+            self.driver, _ = create_driver(**self.browser_options)
+            self.jobs = 0
+            self.started += 1
+            try:
+                self._log_in()
+            except Exception:
+                self.close()
+                raise
+            return self.driver
+        # The session can expire while the browser idles between jobs. The page left by the last
+        # job usually shows the logged-in header already; otherwise load the logged-in landing page.
+        if self.driver.find_elements(*LOGGED_IN_PROBE):
+            return self.driver
+        self.driver.get(self.landing_url())
+        if not is_logged_in(self.driver, probe_timeout=5):
+            logging.info("Warm browser's session has expired, logging in again.")
+            self._log_in()
+        return self.driver
+
+    def landing_url(self):
+        """The page a logged-in session lands on: the one saved with the session, or Home."""
+        session = load_session(self.session_file) if self.session_file else None
+        return (session or {}).get('url') or f"{self.base_url}/Home"
+
+    def release(self, ok=True):
+        """Hands the browser back after a job and recycles it when it is due."""
+        if self.driver is None:
+            return
+        self.jobs += 1
+        self.memory_mb = browser_memory_mb(self.driver)
+        if self.jobs >= self.recycle_after:
+            self.recycle(f"served {self.jobs} jobs")
+        elif self.memory_mb is not None and self.memory_mb > self.max_memory_mb:
+            self.recycle(f"using {self.memory_mb:.0f} MB")
+        elif not ok and not self.alive():
+            self.recycle("browser stopped responding")
+
+    def alive(self):
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def recycle(self, reason):
+        logging.info(f"Recycling the warm browser: {reason}.")
+        self.close()
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logging.warning(f"Could not close the browser cleanly: {e}")
+            self.driver = None
+
+
+class Daemon:
+    """Runs queued quotation jobs one after another on a warm browser and publishes queue metrics."""
+
+    def __init__(self, queue, browser, run_options=None, poll_interval=POLL_INTERVAL):
+        self.queue = queue
+        self.browser = browser
+        self.run_options = dict(run_options or {})
+        self.poll_interval = poll_interval
+        self.completed = 0
+        self.failed = 0
+        self.running = None
+        self.wait_times = deque(maxlen=100)
+        self.run_times = deque(maxlen=100)
+        self.status_path = os.path.join(queue.spool_dir, STATUS_FILE)
+
+    def status(self):
+        def average(values):
+            return round(sum(values) / len(values), 2) if values else None
+        return {
+            'updated_at': time.time(),
+            'pid': os.getpid(),
+            'queue_depth': len(self.queue.pending()),
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'queued_seconds_avg': average(self.wait_times),
+            'run_seconds_avg': average(self.run_times),
+            'run_seconds_last': self.run_times[-1] if self.run_times else None,
+            'browser': {
+                'warm': self.browser.driver is not None,
+                'jobs': self.browser.jobs,
+                'started': self.browser.started,
+                'memory_mb': round(self.browser.memory_mb, 1) if self.browser.memory_mb is not None else None,
+            },
+        }
+
+    def write_status(self):
+        write_json(self.status_path, self.status())
+
+    def run_job(self, name, config_file, queued):
+        stem = os.path.splitext(name)[0]
+        run_dir = os.path.join(self.queue.dirs['runs'], stem)
+        options = dict(self.run_options)
+        if options.get('trace_file'):
+            options['trace_file'] = os.path.join(run_dir, options['trace_file'])
+        self.running = name
+        self.write_status()
+        logging.info(f"Job {name}: starting after {queued:.1f}s in the queue ({len(self.queue.pending())} waiting).")
+
+        start = time.perf_counter()
+        error = None
+        with log_context(run=stem):
+            try:
+                ok = run_quotation(config_file, screenshot_dir=run_dir, driver=self.browser.acquire(), **options)
+            except Exception as e:
+                logging.error(f"Job {name} failed: {e}", exc_info=True)
+                ok, error = False, str(e)
+        elapsed = time.perf_counter() - start
+        self.browser.release(ok)
+
+        self.running = None
+        self.wait_times.append(queued)
+        self.run_times.append(round(elapsed, 2))
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.queue.finish(name, ok, {
+            'ok': ok, 'error': error, 'run_dir': run_dir,
+            'queued_seconds': round(queued, 2), 'run_seconds': round(elapsed, 2), 'finished_at': time.time(),
+        })
+        logging.info(f"Job {name}: {'OK' if ok else 'FAILED'} in {elapsed:.1f}s.")
+
+    def serve(self, once=False):
+        """Runs jobs as they arrive; with `once`, returns when the queue is empty."""
+        stale = os.listdir(self.queue.dirs['running'])
+        if stale:
+            logging.warning(f"Jobs left in {self.queue.dirs['running']} by an earlier daemon: {', '.join(stale)}")
+        logging.info(f"Daemon serving {self.queue.dirs['incoming']} (pid {os.getpid()}).")
+        try:
+            while True:
+                job = self.queue.claim()
+                if job is None:
+                    self.write_status()
+                    if once:
+                        return
+                    time.sleep(self.poll_interval)
+                    continue
+                self.run_job(*job)
+                self.write_status()
+        except KeyboardInterrupt:
+            logging.info("Daemon stopping.")
+        finally:
+            self.browser.close()
+            self.write_status()
+            logging.info(f"Daemon served {self.completed} job(s) OK and {self.failed} failed, "
+                         f"on {self.browser.started} browser(s).")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Runs quotation jobs from a spool directory on a warm, logged-in browser.')
+    parser.add_argument('--spool', default=SPOOL_DIR, help=f'Spool directory (default: {SPOOL_DIR})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='Run queued jobs as they arrive')
+    serve.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+    serve.add_argument('--recycle-after', type=int, default=DEFAULT_RECYCLE_JOBS,
+                       help=f'Restart the browser after this many jobs (default: {DEFAULT_RECYCLE_JOBS})')
+    serve.add_argument('--max-memory-mb', type=float, default=DEFAULT_MAX_MEMORY_MB,
+                       help=f'Restart the browser above this resident memory; needs psutil (default: {DEFAULT_MAX_MEMORY_MB})')
+    serve.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                       help=f'Seconds between looks at an empty queue (default: {POLL_INTERVAL})')
+    serve.add_argument('--session-file', default=SESSION_FILE, help=f'Login session file (default: {SESSION_FILE})')
+    serve.add_argument('--base-url', default=BASE_URL, help=f'iConfig base URL (default: {BASE_URL})')
+    serve.add_argument('--headless', action='store_true', help='Run Chrome without a window')
+    serve.add_argument('--profile', choices=PROFILES, default='default', help='Browser profile (default: default)')
+    serve.add_argument('--browser-cache-dir', default=BROWSER_CACHE_DIR,
+                       help=f'Disk cache of the lean profile, used from its daemon subdirectory (default: {BROWSER_CACHE_DIR})')
+    serve.add_argument('--chromedriver', help='Path to a pinned chromedriver')
+    serve.add_argument('--tabs', type=int, default=1, help='Components pages configured at once in tabs (default: 1)')
+    serve.add_argument('--no-trace', action='store_true', help='Turn off per-step timing spans')
+    serve.add_argument('--log-level', default='INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'))
+
+    submit = commands.add_parser('submit', help='Queue configuration files')
+    submit.add_argument('config_files', nargs='+')
+
+    commands.add_parser('status', help='Print the metrics of the serving daemon')
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    queue = JobQueue(args.spool)
+    if args.command == 'submit':
+        for config_file in args.config_files:
+            print(f"Queued {config_file} as {queue.submit(config_file)}")
+        return
+    if args.command == 'status':
+        try:
+            with open(os.path.join(args.spool, STATUS_FILE), 'r', encoding='utf-8') as f:
+                print(f.read())
+        except FileNotFoundError:
+            print(f"No daemon status in {args.spool}; queue depth {len(queue.pending())}.")
+        return
+
+    setup_logging(os.path.join(args.spool, "daemon_log.txt"), level=args.log_level)
+    logging.getLogger('webdriver_manager').setLevel(logging.WARNING)
+    base_url = args.base_url.rstrip('/')
+    browser = WarmBrowser(
+        {'pinned_path': args.chromedriver, 'headless': args.headless, 'profile': args.profile,
+         'cache_dir': os.path.join(args.browser_cache_dir, 'daemon'), 'network_report': args.profile == 'lean'},
+        base_url, args.session_file, args.recycle_after, args.max_memory_mb,
+    )
+    run_options = {
+        'base_url': base_url,
+        'session_file': args.session_file,
+        'headless': args.headless,
+        'profile': args.profile,
+        'tabs': args.tabs,
+        'trace_file': None if args.no_trace else TRACE_FILE,
+    }
+    Daemon(queue, browser, run_options, args.poll_interval).serve(once=args.once)
+
+
+if __name__ == "__main__":
+    main()
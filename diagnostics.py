@@ -0,0 +1,132 @@
+import base64
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import threading
+
+ARTIFACTS_DIR = "artifacts"
+DEFAULT_BUDGET = 20
+
+
+def slug(text):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(text)).strip('_')[:80]
+
+
+class Diagnostics:
+    """Captures screenshots, page source and console logs of failures into a per-run artifacts directory.
+
+    Only grabbing the data from the browser happens on the caller's thread; decoding,
+    compression and disk writes are done by a background writer. Captures are capped by
+    `budget` and a failure that repeats (same step, subject and error) is captured once.
+    """
+
+    def __init__(self, artifacts_dir, budget=DEFAULT_BUDGET, compress=False):
+        self.artifacts_dir = artifacts_dir
+        self.budget = budget
+        self.compress = compress
+        self.captured = 0
+        self.duplicates = 0
+        self.over_budget = 0
+        self._seen = set()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="diagnostics-writer", daemon=True)
+        self._writer.start()
+
+    def capture(self, driver, step, subject='', error=None):
+        """Records the browser state of a failure. Returns False if it was skipped."""
+        # Selenium messages often carry no detail ("Message: "), so the subject tells failures apart
+        if error is not None:
+            key = (step, subject, type(error).__name__, str(error).split('\n', 1)[0])
+        else:
+            key = (step, subject)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(key)
+        if self.captured >= self.budget:
+            self.over_budget += 1
+            return False
+        self.captured += 1
+
+        name = f"{self.captured:03d}_{slug(step)}" + (f"_{slug(subject)}" if subject else "")
+        artifacts = {}
+        try:
+            artifacts['png'] = driver.get_screenshot_as_base64()
+            artifacts['html'] = driver.page_source
+        except Exception as e:
+            logging.warning(f"Could not capture diagnostics for {name}: {e}")
+        try:
+            artifacts['console.json'] = driver.get_log('browser')
+        except Exception:
+            pass  # Console logs are only available when the driver was started with logging enabled
+        if error is not None:
+            artifacts['error.txt'] = f"{type(error).__name__}: {error}"
+        self._queue.put((name, artifacts))
+        return True
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            name, artifacts = item
+            try:
+                self._write(name, artifacts)
+            except Exception as e:
+                logging.warning(f"Could not write diagnostics {name}: {e}")
+
+    def _write(self, name, artifacts):
+        os.makedirs(self.artifacts_dir, exist_ok=True)
+        for extension, content in artifacts.items():
+            if extension == 'png':
+                data = base64.b64decode(content)
+            elif extension.endswith('.json'):
+                data = json.dumps(content, ensure_ascii=False, indent=1).encode('utf-8')
+            else:
+                data = content.encode('utf-8')
+            path = os.path.join(self.artifacts_dir, f"{name}.{extension}")
+            # Screenshots are already compressed; only the text artifacts are gzipped
+            if self.compress and extension != 'png':
+                data = gzip.compress(data)
+                path += '.gz'
+            with open(path, 'wb') as f:
+                f.write(data)
+
+    def close(self):
+        """Waits for pending writes and logs what was captured."""
+        self._queue.put(None)
+        self._writer.join()
+        if self.captured or self.duplicates or self.over_budget:
+            logging.info(
+                f"Diagnostics: {self.captured} failure(s) captured in {self.artifacts_dir}, "
+                f"{self.duplicates} repeat(s) and {self.over_budget} over budget skipped."
+            )
+
+
+_diagnostics = None
+
+
+def start(artifacts_dir, budget=DEFAULT_BUDGET, compress=False):
+    """Turns diagnostics capture on for this process."""
+    global _diagnostics
+    _diagnostics = Diagnostics(artifacts_dir, budget, compress)
+    return _diagnostics
+
+
+def finish():
+    """Flushes pending artifacts, then turns diagnostics capture off."""
+    global _diagnostics
+    diagnostics, _diagnostics = _diagnostics, None
+    if diagnostics:
+        diagnostics.close()
+    return diagnostics
+
+
+def capture(driver, step, subject='', error=None):
+    """Captures a failure on the active diagnostics, or does nothing when capture is off."""
+    if _diagnostics is None:
+        return False
+    return _diagnostics.capture(driver, step, subject, error)
@@ -0,0 +1,235 @@
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+HISTORY_FILE = "run_history.sqlite"
+RECENT_RUNS = 5
+REGRESSION_THRESHOLD = 1.25
+MIN_BASELINE = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    config TEXT,
+    engine TEXT,
+    profile TEXT,
+    ok INTEGER,
+    wall REAL,
+    products INTEGER,
+    retries INTEGER,
+    screenshots INTEGER
+);
+CREATE TABLE IF NOT EXISTS phases (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    phase TEXT NOT NULL,
+    subject TEXT,
+    wall REAL NOT NULL,
+    retries INTEGER,
+    outcome TEXT
+);
+CREATE INDEX IF NOT EXISTS phases_by_phase ON phases (phase, run_id);
+"""
+
+# Span attributes that say what a phase worked on, in order of preference
+SUBJECT_ATTRS = ('product', 'accessory', 'tab', 'step', 'query')
+
+
+def connect(path=HISTORY_FILE):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")  # Batch workers record their runs concurrently
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_run(path, tracer, started_at, config_file, ok, wall, engine='browser', profile='default',
+               products=0, screenshots=0):
+    """Stores a finished run and the timing of each of its traced phases. Returns the run id."""
+    spans = [span for span in (tracer.spans if tracer else []) if span.wall is not None]
+    phases = [
+        (span.name, next((str(span.attrs[key]) for key in SUBJECT_ATTRS if key in span.attrs), None),
+         span.wall, span.retries, span.outcome)
+        for span in spans
+    ]
+    try:
+        with closing(connect(path)) as conn, conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (started_at, config, engine, profile, ok, wall, products, retries, screenshots)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (started_at, config_file, engine, profile, int(bool(ok)), wall, products,
+                 sum(span.retries for span in spans), screenshots),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO phases (run_id, phase, subject, wall, retries, outcome) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id,) + phase for phase in phases],
+            )
+    except sqlite3.Error as e:
+        logging.warning(f"Could not record the run in {path}: {e}")
+        return None
+    logging.info(f"Recorded run {run_id} with {len(phases)} phase timings in {path}.")
+    return run_id
+
+
+def percentile(values, q):
+    """The q-th percentile (0-100) of `values`, interpolating between the closest ranks."""
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def select_runs(conn, engine=None, config=None):
+    """Ids of the recorded runs grouped by (engine, config), oldest first, optionally for one engine or config."""
+    groups = {}
+    for run_id, run_engine, run_config in conn.execute("SELECT id, engine, config FROM runs ORDER BY id"):
+        if (engine and run_engine != engine) or (config and run_config != config):
+            continue
+        groups.setdefault((run_engine, run_config), []).append(run_id)
+    return groups
+
+
+def phase_stats(conn, recent_runs=RECENT_RUNS, threshold=REGRESSION_THRESHOLD, min_baseline=MIN_BASELINE,
+                engine=None, config=None):
+    """Per-phase percentiles, with the recent runs' median compared to the older ones'.
+
+    Phases are compared within runs of the same engine and config only: a phase of the HTTP
+    engine times a whole batch where the browser's times one product, and a 1000-line BOM
+    is not slower than a 10-line one. A phase is flagged as a regression when its median
+    over the group's last `recent_runs` runs is more than `threshold` times its median
+    before them, given `min_baseline` older samples.
+    """
+    groups = select_runs(conn, engine, config)
+    group_of = {}
+    recent = set()
+    for group, run_ids in groups.items():
+        group_of.update((run_id, group) for run_id in run_ids)
+        recent.update(run_ids[-recent_runs:])
+
+    samples = {}
+    rows = conn.execute("SELECT run_id, phase, wall FROM phases").fetchall()
+    rows += [(run_id, 'run', wall) for run_id, wall in conn.execute("SELECT id, wall FROM runs WHERE wall IS NOT NULL")]
+    for run_id, phase, wall in rows:
+        if run_id not in group_of:
+            continue
+        entry = samples.setdefault(group_of[run_id] + (phase,), ([], []))
+        entry[0 if run_id in recent else 1].append(wall)
+
+    stats = []
+    for (run_engine, run_config, phase), (recent_walls, baseline_walls) in samples.items():
+        walls = recent_walls + baseline_walls
+        recent_p50 = percentile(recent_walls, 50)
+        baseline_p50 = percentile(baseline_walls, 50)
+        regression = (
+            recent_p50 is not None and len(baseline_walls) >= min_baseline
+            and baseline_p50 > 0 and recent_p50 > baseline_p50 * threshold
+        )
+        stats.append({
+            'phase': phase,
+            'engine': run_engine,
+            'config': run_config,
+            'count': len(walls),
+            'p50': percentile(walls, 50),
+            'p90': percentile(walls, 90),
+            'p95': percentile(walls, 95),
+            'max': max(walls),
+            'recent_p50': recent_p50,
+            'baseline_p50': baseline_p50,
+            'regression': regression,
+        })
+    return sorted(stats, key=lambda entry: entry['p50'] * entry['count'], reverse=True)
+
+
+def weekly_trend(conn, phase, engine, config):
+    """Median wall time of a phase (or of whole runs for 'run') per ISO week: [(week, runs, median)]."""
+    if phase == 'run':
+        rows = conn.execute(
+            "SELECT started_at, wall, id FROM runs WHERE wall IS NOT NULL AND engine IS ? AND config IS ?",
+            (engine, config)
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            "SELECT runs.started_at, phases.wall, runs.id FROM phases JOIN runs ON runs.id = phases.run_id"
+            " WHERE phases.phase = ? AND runs.engine IS ? AND runs.config IS ?", (phase, engine, config)
+        ).fetchall()
+    weeks = {}
+    for started_at, wall, run_id in rows:
+        week = time.strftime('%G-W%V', time.localtime(started_at))
+        walls, run_ids = weeks.setdefault(week, ([], set()))
+        walls.append(wall)
+        run_ids.add(run_id)
+    return [(week, len(run_ids), percentile(walls, 50)) for week, (walls, run_ids) in sorted(weeks.items())]
+
+
+def seconds(value):
+    return f"{value:8.2f}" if value is not None else f"{'-':>8}"
+
+
+def print_report(path=HISTORY_FILE, recent_runs=RECENT_RUNS, threshold=REGRESSION_THRESHOLD,
+                 min_baseline=MIN_BASELINE, phases=None, limit=20, engine=None, config=None):
+    """Prints phase percentiles, weekly trends and regressions from the run history."""
+    with closing(connect(path)) as conn:
+        total, succeeded, first, last = conn.execute(
+            "SELECT COUNT(*), SUM(ok), MIN(started_at), MAX(started_at) FROM runs").fetchone()
+        if not total:
+            print(f"No runs recorded in {path}.")
+            return []
+        retries, screenshots = conn.execute("SELECT SUM(retries), SUM(screenshots) FROM runs").fetchone()
+        print(f"{total} run(s) from {time.strftime('%Y-%m-%d', time.localtime(first))} to "
+              f"{time.strftime('%Y-%m-%d', time.localtime(last))}: {succeeded or 0} OK, "
+              f"{retries or 0} retries, {screenshots or 0} failure capture(s).")
+
+        stats = phase_stats(conn, recent_runs, threshold, min_baseline, engine, config)
+        if phases:
+            stats = [entry for entry in stats if entry['phase'] in phases]
+        print(f"\n{'phase':<20} {'engine':<8} {'config':<24} {'count':>6} {'p50':>8} {'p90':>8} {'p95':>8} "
+              f"{'max':>8} {'recent':>8} {'baseline':>8}")
+        for entry in stats[:limit]:
+            config_name = os.path.basename(entry['config'] or '-')
+            print(f"{entry['phase']:<20} {entry['engine'] or '-':<8} {config_name[:24]:<24} {entry['count']:>6} "
+                  f"{seconds(entry['p50'])} {seconds(entry['p90'])} {seconds(entry['p95'])} {seconds(entry['max'])} "
+                  f"{seconds(entry['recent_p50'])} {seconds(entry['baseline_p50'])}"
+                  f"{'  REGRESSION' if entry['regression'] else ''}")
+
+        regressions = [entry for entry in stats if entry['regression']]
+        trends = [entry for entry in stats if entry['regression'] or (phases and entry['phase'] in phases)]
+        for entry in trends:
+            print(f"\nWeekly median of '{entry['phase']}' ({entry['engine']}, {entry['config']}):")
+            for week, runs, median in weekly_trend(conn, entry['phase'], entry['engine'], entry['config']):
+                print(f"  {week}  {runs:>4} run(s)  {seconds(median)}s")
+
+        if regressions:
+            slower = ', '.join(f"{entry['phase']} ({entry['engine']})" for entry in regressions)
+            print(f"\n{len(regressions)} phase(s) slower than {threshold:.2f}x their baseline over the last "
+                  f"{recent_runs} run(s): {slower}")
+        else:
+            print(f"\nNo phase is slower than {threshold:.2f}x its baseline over the last {recent_runs} run(s).")
+        return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reports phase timings and regressions from the run history.')
+    parser.add_argument('--history-file', default=HISTORY_FILE, help=f'Run history database (default: {HISTORY_FILE})')
+    parser.add_argument('--recent', type=int, default=RECENT_RUNS,
+                        help=f'Runs compared against the older ones (default: {RECENT_RUNS})')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f'Slowdown of the median that counts as a regression (default: {REGRESSION_THRESHOLD})')
+    parser.add_argument('--min-baseline', type=int, default=MIN_BASELINE,
+                        help=f'Older samples a phase needs before it can be flagged (default: {MIN_BASELINE})')
+    parser.add_argument('--phase', action='append', help='Only report this phase, with its weekly trend; may be repeated')
+    parser.add_argument('--limit', type=int, default=20, help='Phases listed (default: 20)')
+    parser.add_argument('--engine', choices=('browser', 'http'), help='Only report runs of this engine')
+    parser.add_argument('--config', help='Only report runs of this configuration file, as recorded')
+    args = parser.parse_args()
+    regressions = print_report(args.history_file, args.recent, args.threshold, args.min_baseline, args.phase, args.limit,
+                               args.engine, args.config)
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Browserless execution engine: builds a quotation straight over iConfig's HTTP endpoints.
+
+The endpoint map defaults to the JSON API of mock_iconfig.py. For the live site, capture
+the matching XHRs from the browser's network panel and pass them with --endpoints as a
+JSON object of {operation: [method, path template]}.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import tracing
+from accessories import clean_accessory_name
+from catalogue import configname_prefix
+from login import get_credentials
+from session import load_session
+
+DEFAULT_ENDPOINTS = {
+    'login': ('POST', '/api/login'),
+    'quotations': ('GET', '/api/quotations'),
+    'search': ('GET', '/api/search'),
+    'save_quotation': ('POST', '/api/quotation/save'),
+    'quotation': ('GET', '/api/quotation/{id}'),
+    'add': ('POST', '/api/quotation/{id}/add'),
+    'edit': ('POST', '/api/quotation/{id}/edit'),
+    'config_save': ('POST', '/api/quotation/{id}/config_save'),
+}
+REQUEST_TIMEOUT = 30
+
+
+def load_endpoints(endpoints_file=None):
+    """Returns the default endpoint map, overridden by a JSON file if one is given."""
+    endpoints = dict(DEFAULT_ENDPOINTS)
+    if endpoints_file:
+        with open(endpoints_file, 'r', encoding='utf-8') as f:
+            endpoints.update({op: tuple(value) for op, value in json.load(f).items()})
+    return endpoints
+
+
+class IConfigClient:
+    """Keep-alive HTTP client for the iConfig endpoints, safe to share between threads."""
+
+    def __init__(self, base_url, endpoints, pool_size=8):
+        self.base_url = base_url.rstrip('/')
+        self.endpoints = endpoints
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def load_cookies(self, session_file):
+        """Reuses the cookies of a saved browser login. Returns True if there were any."""
+        saved = load_session(session_file) if session_file else None
+        if not saved:
+            return False
+        for cookie in saved.get('cookies', []):
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        return True
+
+    def call(self, operation, params=None, body=None, **path_args):
+        """Calls one endpoint and returns its decoded JSON response."""
+        method, path = self.endpoints[operation]
+        with self._lock:
+            self.requests += 1
+        with tracing.span("http", operation=operation):
+            response = self.session.request(method, self.base_url + path.format(**path_args),
+                                            params=params, json=body, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            return response.json()
+
+    def logged_in(self):
+        try:
+            self.call('quotations')
+            return True
+        except (requests.RequestException, ValueError):
+            return False
+
+
+def find_added_row(rows, product, claimed):
+    """Finds the checkList row created for a product among rows that were not there before.
+
+    A row labelled with the product's name wins; otherwise the row's configname without
+    its numeric suffix must be the product's code or name, so 'SFP-XG' never claims the
+    row of 'SFP-XG-LX'.
+    """
+    unclaimed = [row for row in rows if row['configname'] not in claimed]
+    matches = [row for row in unclaimed if row.get('name') == product['name']] or [
+        row for row in unclaimed if configname_prefix(row['configname']) in (product['code'], product['name'])
+    ]
+    if not matches:
+        return None
+    claimed.add(matches[0]['configname'])
+    return matches[0]
+
+
+def run_http_quotation(plan, base_url, session_file=None, endpoints_file=None, concurrency=8):
+    """Builds the quotation of a compiled config over HTTP without a browser. Returns True on success."""
+    start = time.perf_counter()
+    config = plan.settings
+    client = IConfigClient(base_url, load_endpoints(endpoints_file), pool_size=concurrency)
+
+    with tracing.span("login") as login_span:
+        if client.load_cookies(session_file) and client.logged_in():
+            login_span.set(session='reused')
+            logging.info("Reusing the saved login session over HTTP.")
+        else:
+            username, password = get_credentials()
+            if not username or not password:
+                logging.error("Username or password not found in Account.txt")
+                return False
+            client.call('login', body={'user': username, 'password': password})
+            if not client.logged_in():
+                logging.error("HTTP login was not accepted.")
+                return False
+
+    with tracing.span("create quotation"):
+        quotation_id = client.call('save_quotation', body={
+            'name': config.get("Quotation name"),
+            'country': config.get("Country"),
+            'eccn': '1' if config.get("Is U.S. ECCN needed") == "Yes" else '0',
+        })['id']
+        logging.info(f"Created quotation {quotation_id}: {config.get('Quotation name')}")
+
+    products = [
+        {'name': name, 'tab': planned.tab[1], 'quantity': planned.quantity,
+         'accessories': planned.accessories, 'code': None}
+        for name, planned in plan.products.items()
+    ]
+
+    def search(product):
+        results = client.call('search', params={'tab': product['tab'], 'q': product['name']})['products']
+        match = next((p for p in results if p['name'] == product['name']), None)
+        product['code'] = match and match['code']
+        return match is not None
+
+    ok = True
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        with tracing.span("search", count=len(products)):
+            found = list(pool.map(search, products))
+        for product, was_found in zip(products, found):
+            if not was_found:
+                logging.error(f"Product {product['name']} was not found in the '{product['tab']}' catalogue.")
+                ok = False
+        products = [product for product, was_found in zip(products, found) if was_found]
+
+        with tracing.span("add products", count=len(products)):
+            before = {row['configname'] for row in client.call('quotation', id=quotation_id)['rows']}
+            for tab in sorted({product['tab'] for product in products}):
+                names = [product['name'] for product in products if product['tab'] == tab]
+                client.call('add', body={'tab': tab, 'names': names}, id=quotation_id)
+            new_rows = [row for row in client.call('quotation', id=quotation_id)['rows']
+                        if row['configname'] not in before]
+
+        claimed = set()
+        for product in products:
+            row = find_added_row(new_rows, product, claimed)
+            product['configname'] = row and row['configname']
+            if not row:
+                logging.error(f"Could not identify the added row for {product['name']}.")
+                ok = False
+        products = [product for product in products if product['configname']]
+
+        def edit(product):
+            client.call('edit', id=quotation_id, body={
+                'configname': product['configname'], 'config_name': product['name'], 'sets': product['quantity'],
+            })
+
+        def save_accessories(product):
+            client.call('config_save', id=quotation_id, body={
+                'configname': product['configname'],
+                'accessories': {clean_accessory_name(name): qty for name, qty in product['accessories'].items()},
+            })
+
+        with tracing.span("edit", count=len(products)):
+            list(pool.map(edit, products))
+        with_accessories = [product for product in products if product['accessories']]
+        with tracing.span("accessories", count=len(with_accessories)):
+            list(pool.map(save_accessories, with_accessories))
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"HTTP engine built {len(products)} product(s) with {client.requests} requests in {elapsed:.2f}s.")
+    return ok
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+# Product fields needed to edit or configure an already added product after a restart
+RESUME_FIELDS = ('name', 'quantity', 'is_parts', 'product_code', 'config_name', 'edit_xpath')
+
+
+def journal_path(config_file, run_dir='.'):
+    """Returns the journal file used for a configuration file."""
+    return os.path.join(run_dir, f"{os.path.splitext(os.path.basename(config_file))[0]}.journal.json")
+
+
+def file_digest(path):
+    """Returns a short content hash used to notice that a config changed between runs."""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+class Journal:
+    """Checkpoint journal of a quotation build, rewritten after every completed step."""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {}
+
+    def start(self, config_file, applied=None):
+        """Begins a fresh journal for a new quotation, or for a sync carrying over `applied`."""
+        self.state = {
+            'config_file': config_file,
+            'config_digest': file_digest(config_file),
+            'started_at': time.time(),
+            'quotation_name': None,
+            'quotation_url': None,
+            'added': {},
+            'edited': [],
+            'accessories': {},
+            'completed': False,
+            'applied': applied or {},
+        }
+        self._write()
+
+    def load(self, config_file):
+        """Loads the journal of an earlier run. Returns False if there is nothing to resume."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            logging.warning(f"No checkpoint journal at {self.path}; starting a new quotation.")
+            return False
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable checkpoint journal {self.path}: {e}")
+            return False
+        if not self.state.get('quotation_name') and not self.state.get('quotation_url'):
+            logging.warning("The journaled run never created its quotation; starting a new quotation.")
+            return False
+        if self.state.get('config_digest') != file_digest(config_file):
+            logging.warning(f"{config_file} changed since the journaled run; resuming by product name.")
+        logging.info(
+            f"Resuming quotation '{self.state.get('quotation_name')}': {len(self.state['added'])} added, "
+            f"{len(self.state['edited'])} edited."
+        )
+        return True
+
+    def previous_run(self):
+        """Returns the journal state of the last run, or an empty dict if there is none."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def completed(self):
+        return self.state.get('completed', False)
+
+    @property
+    def quotation_url(self):
+        return self.state.get('quotation_url')
+
+    @property
+    def quotation_name(self):
+        return self.state.get('quotation_name')
+
+    def quotation_created(self, name, url):
+        self.state['quotation_name'] = name
+        self.state['quotation_url'] = url
+        self._write()
+
+    def added_products(self, products):
+        """Returns the journaled products that are still in the config, rebuilt with their current data."""
+        restored = []
+        for name, saved in self.state['added'].items():
+            if name not in products:
+                continue
+            product = dict(saved)
+            product.update({
+                'quantity': products[name]['quantity'],
+                'accessories': products[name].get('accessories', {}),
+                'cached': None,
+            })
+            restored.append(product)
+        return restored
+
+    def is_added(self, product_name):
+        return product_name in self.state['added']
+
+    def product_added(self, product):
+        self.state['added'][product['name']] = {field: product.get(field) for field in RESUME_FIELDS}
+        self._write()
+
+    def is_edited(self, product_name):
+        return product_name in self.state['edited']
+
+    def product_edited(self, product_name):
+        if product_name not in self.state['edited']:
+            self.state['edited'].append(product_name)
+            self._write()
+
+    def accessories_done(self, product_name):
+        return set(self.state['accessories'].get(product_name, []))
+
+    def accessories_saved(self, product_name, acc_names):
+        """Records accessories whose quantities were set and saved on the Components page."""
+        done = self.state['accessories'].setdefault(product_name, [])
+        done.extend(name for name in acc_names if name not in done)
+        self._write()
+
+    @property
+    def added(self):
+        """The journaled fields of each added product, by product name."""
+        return self.state.get('added', {})
+
+    @property
+    def applied(self):
+        """Accessory quantities per product as of the last completed run."""
+        return self.state.get('applied', {})
+
+    def complete(self, products):
+        """Marks the quotation done and records the accessories it now has for the next sync."""
+        self.state['completed'] = True
+        self.state['applied'] = {name: data['accessories'] for name, data in products.items()}
+        self._write()
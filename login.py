@@ -1,75 +1,134 @@
+import argparse
 import logging
+import os
 import time
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import ElementClickInterceptedException, StaleElementReferenceException, TimeoutException
 from selenium.webdriver.common.action_chains import ActionChains
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("log.txt", mode='w', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
-import argparse
-
-def get_config():
-    """Reads hierarchical configuration from a command-line specified file."""
+from accessories import clean_accessory_name, set_quantities_bulk
+from browser import BROWSER_CACHE_DIR, PROFILES, NetworkMonitor, create_driver
+from catalogue import CATALOGUE_FILE, CatalogueCache, configname_prefix
+import diagnostics
+from diagnostics import ARTIFACTS_DIR, DEFAULT_BUDGET
+import history
+from history import HISTORY_FILE
+import tracing
+from journal import Journal, journal_path
+from logs import log_context, setup_logging
+from page_index import PageIndex
+import retry
+from retry import REENTRANT, CircuitOpenError
+from plan import PARTS_TAB, STANDARD_TAB, ConfigError, TABS_BY_NAME, compile_config
+from session import SESSION_FILE, restore_session, save_session
+from sync import SyncRefusedError, diff_quotation, log_diff, read_config_rows, remove_rows
+from tabs import DEFAULT_TABS, TabScheduler
+from tracing import TRACE_FILE
+from verify import REPORT_FILE, verify_quotation
+from waits import PageWaiter
+
+BASE_URL = "https://iconfig-cloud.h3c.com/iconfig"
+CHECKLIST_LOCATOR = (By.XPATH, "//input[@name='checkList']")
+
+
+def parse_args(argv=None):
+    """Parses the command line."""
     parser = argparse.ArgumentParser(description='Automated iConfig Configuration.')
-    parser.add_argument('config_file', nargs='?', default='Config.txt', help='Path to the configuration file (default: Config.txt)')
-    args = parser.parse_args()
-
-    config = {'products': {}}
-    with open(args.config_file, 'r', encoding='utf-8') as f:
-        page_context = None
-        current_product = None
-        for line in f:
-            line = line.rstrip()
-            if not line.strip():
-                continue
-
-            if line.startswith('Page '):
-                page_context = line.strip()
-                current_product = None
-                continue
-
-            if page_context == 'Page 2: Configuration':
-                indent_level = len(line) - len(line.lstrip(' '))
-                parts = line.strip().split()
-                
-                if len(parts) >= 2:
-                    quantity_str = parts[-1]
-                    product_name = " ".join(parts[:-1])
-                    
-                    try:
-                        quantity = int(''.join(filter(str.isdigit, quantity_str)))
-                        
-                        if indent_level == 0:  # Main product
-                            config['products'][product_name] = {
-                                'quantity': quantity,
-                                'accessories': {}
-                            }
-                            current_product = product_name
-                        elif current_product and indent_level > 0:  # Accessory
-                            if current_product in config['products']:
-                                config['products'][current_product]['accessories'][product_name] = quantity
-                                
-                    except (ValueError, IndexError):
-                        pass  # Ignore lines that don't parse correctly
-            elif ':' in line:
-                key, value = line.split(':', 1)
-                config[key.strip()] = value.strip()
-    return config
+    parser.add_argument('config_files', nargs='*', default=['Config.txt'],
+                        help='Configuration files or directories of them (default: Config.txt)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of concurrent browser workers in batch mode (default: 1)')
+    parser.add_argument('--output-dir', default='runs',
+                        help='Directory for per-configuration logs and screenshots in batch mode (default: runs)')
+    parser.add_argument('--session-file', default=SESSION_FILE,
+                        help=f'File used to save and reuse the login session (default: {SESSION_FILE})')
+    parser.add_argument('--no-session', action='store_true',
+                        help='Always log in with credentials and do not save the session')
+    parser.add_argument('--search-separator',
+                        help='Separator for multi-condition catalogue searches; searches one product at a time if unset')
+    parser.add_argument('--catalogue-file', default=CATALOGUE_FILE,
+                        help=f'Product catalogue cache (default: {CATALOGUE_FILE})')
+    parser.add_argument('--refresh-catalogue', action='store_true',
+                        help='Ignore cached catalogue entries and refill them from fresh searches')
+    parser.add_argument('--row-order', choices=('config', 'grouped'), default='config',
+                        help='config keeps the quotation rows in Config.txt order and only merges neighbours of the same '
+                             'tab; grouped adds each tab\'s products in one visit, listing them together (default: config)')
+    parser.add_argument('--no-bulk-accessories', action='store_true',
+                        help='Set accessory quantities one by one instead of with in-page scripts')
+    parser.add_argument('--trace-file', default=TRACE_FILE,
+                        help=f'JSON-lines file for per-step timing spans; per run directory in batch mode (default: {TRACE_FILE})')
+    parser.add_argument('--no-trace', action='store_true',
+                        help='Turn off per-step timing spans; the run history then only gets the run\'s total time')
+    parser.add_argument('--resume', action='store_true',
+                        help='Reopen the quotation of an interrupted run and only do the unfinished work')
+    parser.add_argument('--sync', action='store_true',
+                        help='Update the existing quotation of the same name with only the changes instead of creating a new one')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='With --sync, only log the rows that would be added, edited and deleted')
+    parser.add_argument('--diagnostics-budget', type=int, default=DEFAULT_BUDGET,
+                        help=f'Most failures captured (screenshot, page source, console log) per run (default: {DEFAULT_BUDGET})')
+    parser.add_argument('--compress-diagnostics', action='store_true',
+                        help='Gzip captured page sources and console logs')
+    parser.add_argument('--verify', action='store_true',
+                        help=f'Check the finished quotation against the config in one pass and write {REPORT_FILE}')
+    parser.add_argument('--no-step-confirmation', action='store_true',
+                        help='Skip reading back each accessory after setting it; implies --verify')
+    parser.add_argument('--tabs', type=int, default=1,
+                        help=f'Components pages configured at once in tabs of the same browser, e.g. {DEFAULT_TABS} '
+                             f'for large multi-chassis quotations (default: 1, one product at a time)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Attempts per step (at least 1) before giving up on it, with exponential backoff between them (default: 3)')
+    parser.add_argument('--history-file', default=HISTORY_FILE,
+                        help=f'SQLite run history each run is added to, with its phase timings unless --no-trace; '
+                             f'see history.py (default: {HISTORY_FILE})')
+    parser.add_argument('--no-history', action='store_true',
+                        help='Do not record this run in the run history')
+    parser.add_argument('--log-level', default='INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'),
+                        help='Lowest level written to the logs; DEBUG adds per-click detail of the accessory loop (default: INFO)')
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help=f'iConfig base URL, e.g. a local mock_iconfig.py server (default: {BASE_URL})')
+    parser.add_argument('--headless', action='store_true',
+                        help='Run Chrome without a window')
+    parser.add_argument('--profile', choices=PROFILES, default='default',
+                        help='Browser profile; lean is headless with eager loads, a disk cache kept between runs, '
+                             'no images, web fonts or analytics, and a network report (default: default)')
+    parser.add_argument('--browser-cache-dir', default=BROWSER_CACHE_DIR,
+                        help='Disk cache of the lean profile, kept between runs; each batch worker uses its own '
+                             f'subdirectory of it (default: {BROWSER_CACHE_DIR})')
+    parser.add_argument('--block-url', action='append', default=[], metavar='PATTERN',
+                        help='Extra URL pattern to block, e.g. "*.example-cdn.com*"; may be repeated')
+    parser.add_argument('--network-report', action='store_true',
+                        help='Log Chrome network events and report requests, bytes and page loads after the run; '
+                             'always on with the lean profile')
+    parser.add_argument('--chromedriver',
+                        help='Path to a pinned chromedriver; skips driver lookup (default: $CHROMEDRIVER_PATH or cache)')
+    parser.add_argument('--engine', choices=('browser', 'http'), default='browser',
+                        help='Drive the site through Chrome, or call its HTTP endpoints directly (default: browser)')
+    parser.add_argument('--endpoints',
+                        help='JSON file overriding the HTTP engine endpoint map (default: the mock_iconfig.py API)')
+    parser.add_argument('--http-concurrency', type=int, default=8,
+                        help='Concurrent requests of the HTTP engine (default: 8)')
+    args = parser.parse_args(argv)
+    if args.retries < 1:
+        parser.error("--retries must be at least 1 (one attempt, no retries)")
+    if args.dry_run and not args.sync:
+        parser.error("--dry-run requires --sync")
+    if args.engine == 'http':
+        # The HTTP engine always builds a new quotation in one go, without a journal or a read-back
+        unsupported = [flag for flag, used in (('--sync', args.sync), ('--resume', args.resume), ('--verify', args.verify),
+                                               ('--no-step-confirmation', args.no_step_confirmation)) if used]
+        if unsupported:
+            parser.error(f"--engine http does not support {', '.join(unsupported)}")
+    return args
+
+
+def get_config(config_file='Config.txt'):
+    """Reads hierarchical configuration from the given file. Raises ConfigError if it has bad lines."""
+    return compile_config(config_file).as_config()
 
 def get_credentials():
     """Reads username and password from Account.txt."""
@@ -86,504 +145,1181 @@ def get_credentials():
     return username, password
 
 def click_tab_with_retry(driver, wait, tab_id, tab_name):
-    """Waits for overlay to disappear and clicks a tab with retries."""
-    for attempt in range(3):
-        try:
-            # Wait for any loading overlay to disappear
-            wait.until(EC.invisibility_of_element_located((By.CSS_SELECTOR, "div.blockUI.blockOverlay")))
-            
-            # Find and click the tab
-            tab_element = wait.until(EC.element_to_be_clickable((By.ID, tab_id)))
-            tab_element.click()
-            
-            logging.info(f"Successfully clicked '{tab_name}' tab on attempt {attempt + 1}.")
-            return True
-        except Exception as e:
-            logging.warning(f"Attempt {attempt + 1} to click '{tab_name}' tab failed: {e}")
-            time.sleep(1) # Wait a bit before retrying
-    
-    logging.error(f"Failed to click '{tab_name}' tab after multiple attempts.")
-    return False
+    """Waits for overlay to disappear and clicks a tab, retrying with backoff on transient errors."""
+    def click_tab():
+        # Wait for any loading overlay to disappear
+        wait.until(EC.invisibility_of_element_located((By.CSS_SELECTOR, "div.blockUI.blockOverlay")))
 
+        # Find and click the tab
+        tab_element = wait.until(EC.element_to_be_clickable((By.ID, tab_id)))
+        tab_element.click()
 
-def main():
-    """Main function to perform login."""
-    # Suppress webdriver_manager logs
-    logging.getLogger('webdriver_manager').setLevel(logging.WARNING)
+    try:
+        retry.call(f"click '{tab_name}' tab", click_tab)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logging.error(f"Failed to click '{tab_name}' tab: {e}")
+        return False
+    logging.info(f"Successfully clicked '{tab_name}' tab.")
+    return True
+
+
+def product_entry(product_name, planned, catalogue=None):
+    """Returns the tab a planned product is added from and the product's working state.
+
+    The catalogue's tab for a product overrides the one the plan guessed from its name.
+    """
+    cached = catalogue.get(product_name) if catalogue else None
+    tab = TABS_BY_NAME.get((cached or {}).get('tab'), planned.tab)
+    return tab, {
+        'name': product_name,
+        'quantity': planned.quantity,
+        'accessories': planned.accessories,
+        # Only explicit Parts are found by their new config name; everything else by product code
+        'is_parts': planned.is_parts,
+        'product_code': cached.get('product_code') if cached and not planned.is_parts else None,
+        'cached': cached,
+        'result_xpath': planned.result_xpath,
+        'edit_xpath': None,
+    }
+
+
+def group_products_by_tab(products, catalogue=None):
+    """Groups planned products by the tab they are added from, keeping config order within a tab."""
+    groups = {}
+    for product_name, planned in products.items():
+        tab, product = product_entry(product_name, planned, catalogue)
+        groups.setdefault(tab, []).append(product)
+    return groups
+
+
+def schedule_products(products, catalogue=None, row_order='config'):
+    """Plans the tab visits that add the products, as a list of (tab, products) in visiting order.
+
+    'grouped' visits each tab once, so the quotation lists each tab's rows together.
+    'config' keeps the rows in config order and only merges products next to each other
+    that share a tab.
+    """
+    if row_order == 'grouped':
+        return list(group_products_by_tab(products, catalogue).items())
+    schedule = []
+    for product_name, planned in products.items():
+        tab, product = product_entry(product_name, planned, catalogue)
+        if schedule and schedule[-1][0] == tab:
+            schedule[-1][1].append(product)
+        else:
+            schedule.append((tab, [product]))
+    return schedule
 
 
+def log_schedule(schedule, config_order, row_order):
+    """Logs how many tab switches and Add dialogs the schedule saves over visiting a tab per product."""
+    tabs = {product['name']: tab for tab, group in schedule for product in group}
+    ordered = [tabs[name] for name in config_order if name in tabs]
+    runs = sum(1 for i, tab in enumerate(ordered) if i == 0 or ordered[i - 1] != tab)
+    logging.info(
+        f"Tab schedule ({row_order} row order): {len(schedule)} tab visit(s) for {len(ordered)} product(s); "
+        f"saves {len(ordered) - len(schedule)} tab switch(es) and Add dialog(s) over one per product, "
+        f"{runs - len(schedule)} over following config order."
+    )
 
-    username, password = get_credentials()
-    if not username or not password:
-        logging.error("Username or password not found in Account.txt")
-        return
 
-    # Setup webdriver
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service)
-    wait = WebDriverWait(driver, 20) # Increased wait time
+def listed_in_results(index, product):
+    """Returns True if a cached product's row is already shown in the catalogue results, so no search is needed."""
+    if not product['cached']:
+        return False
+    entry = index.result_row(product['name'])
+    return bool(entry and entry['visible'])
 
-    try:
-        logging.info("Opening login page...")
-        driver.get("https://iconfig-cloud.h3c.com/iconfig/Index")
-
-        logging.info("Selecting language...")
-        english_link = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, ".englishDiv a")))
-        english_link.click()
-        
-        wait.until(EC.text_to_be_present_in_element((By.ID, "lblLoginTitle"), "Welcome Channel user to login the H3C Configurator"))
-        logging.info("Language selected: English")
-
-        logging.info("Clicking 'H3C user' tab...")
-        h3c_user_tab = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#InternalUser a")))
-        h3c_user_tab.click()
-        logging.info("'H3C user' tab clicked.")
-
-        wait.until(EC.visibility_of_element_located((By.ID, "userAccounts")))
-        
-        logging.info("Entering credentials...")
-        username_field = wait.until(EC.element_to_be_clickable((By.ID, "userAccounts")))
-        password_field = wait.until(EC.element_to_be_clickable((By.ID, "password")))
-        
-        username_field.send_keys(username)
-        password_field.send_keys(password)
-        logging.info("Credentials entered.")
-
-        logging.info("Clicking login button...")
-        login_button = wait.until(EC.element_to_be_clickable((By.ID, "login_submit")))
-        login_button.click()
-
-        logging.info("Login successful!")
-        
-        driver.maximize_window()
-        logging.info("Browser window maximized.")
-
-        logging.info("Waiting 10 seconds for page to load after login...")
-        time.sleep(10)
-        
-        # Click the Quotation menu using JavaScript to ensure the click is registered
-        logging.info("Attempting to click Quotation menu...")
-        quotation_menu = wait.until(EC.element_to_be_clickable((By.ID, "myH3CQuotation")))
-        driver.execute_script("arguments[0].click();", quotation_menu)
-        logging.info("Clicked the Quotation menu.")
-        time.sleep(10)
-
-        # Wait for the 'New' button to be clickable on the new page
-        logging.info("Waiting for 'New' button...")
-        new_button = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "New")))
-        new_button.click()
-        logging.info("Clicked 'New' button.")
-
-        # Get config and fill form
-        config = get_config()
-        
-        quotation_name_input = wait.until(EC.visibility_of_element_located((By.ID, "quoterName")))
-        quotation_name_input.send_keys(config.get("Quotation name"))
-        logging.info(f"Entered Quotation name: {config.get('Quotation name')}")
-
-        logging.info("Clicking country dropdown...")
-        country_dropdown_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-id='countryCode']")))
-        country_dropdown_button.click()
-
-        country_name = config.get("Country")
-        logging.info(f"Selecting country: {country_name}")
-        country_option_xpath = f"//div[contains(@class, 'dropdown-menu')]//span[text()='{country_name}']"
-        country_option = wait.until(EC.element_to_be_clickable((By.XPATH, country_option_xpath)))
-        country_option.click()
-        logging.info(f"Selected Country: {country_name}")
-
-        if config.get("Is U.S. ECCN needed") == "Yes":
-            eccn_radio = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='eccn'][value='1']")))
-            eccn_radio.click()
-            logging.info("Selected 'Is U.S. ECCN needed': Yes")
-        else:
-            eccn_radio = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='eccn'][value='0']")))
-            eccn_radio.click()
-            logging.info("Selected 'Is U.S. ECCN needed': No")
 
-        logging.info("Basic information filled.")
+def search_products(driver, wait, waiter, query):
+    """Runs one catalogue search and waits for the results."""
+    logging.info(f"Searching for product(s): {query}")
+    with tracing.span("search", query=query):
+        search_input = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "input[placeholder*='for multiple conditi']")))
+        search_input.clear()
+        search_input.send_keys(query)
 
-        logging.info("Clicking 'Save' button...")
-        save_button = wait.until(EC.element_to_be_clickable((By.ID, "quotation_sava_btn")))
-        save_button.click()
-        logging.info("Clicked 'Save' button.")
+        search_button = wait.until(EC.element_to_be_clickable((By.ID, "searchBtn")))
+        search_button.click()
+        logging.info("Search button clicked.")
 
-        time.sleep(2)
+        waiter.idle(f"search results for {query}", fallback=3)
 
-        logging.info("Clicking 'Configuration' tab...")
-        configuration_tab = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "config_page")))
-        configuration_tab.click()
-        logging.info("Clicked 'Configuration' tab.")
 
-        time.sleep(10) # Wait for configuration page to load
+def select_product(driver, wait, index, product):
+    """Ticks a product in the search results and captures its product code. Returns True on success."""
+    product_name = product['name']
+    try:
+        entry = index.result_row(product_name)
+        if entry and entry['visible']:
+            product_row, checkbox = entry['row'], entry['checkbox']
+            product_code = entry['cells'][1] if len(entry['cells']) > 1 else None
+        else:
+            # Not in the snapshot yet (results still loading or the name is not a whole cell)
+            product_row = wait.until(EC.visibility_of_element_located((By.XPATH, product['result_xpath'])))
+            checkbox = product_row.find_element(By.XPATH, ".//input[@type='checkbox']")
+            product_code = None
 
-        # Add products from config
-        for product_name, product_data in config.get('products', {}).items():
-            quantity = product_data['quantity']
-            accessories = product_data.get('accessories', {})
-            is_standard_type = product_name.startswith(('S', 'F', 'R'))
-            is_parts_type = product_name.startswith(('WA', 'SFP', 'QSFP'))
+        if product['product_code']:
+            logging.info(f"Using cached Product Code for Standard type: {product['product_code']}")
+        elif not product['is_parts']:
+            # A short snapshot row has no code cell; read it from the page as the XPath path does
+            product_code = product_code or product_row.find_element(By.XPATH, ".//td[2]").text.strip()
+            if not product_code:
+                logging.error(f"Could not read the Product Code of {product_name} from its search result row.")
+                return False
+            product['product_code'] = product_code
+            logging.info(f"Captured Product Code for Standard type: {product['product_code']}")
+
+        logging.info(f"Selecting checkbox for {product_name}")
+        checkbox.click()
+        logging.info("Product checkbox selected.")
+        return True
+    except Exception as e:
+        logging.error(f"Could not select product {product_name} in the search results: {e}")
+        return False
 
-            if is_parts_type:
-                logging.info(f"Product {product_name} is a 'Parts' type. Clicking 'Parts' tab.")
-                if not click_tab_with_retry(driver, wait, "partsCfg", "Parts"):
-                    continue
-            elif is_standard_type:
-                logging.info(f"Product {product_name} is a 'Standard' type. Clicking 'Standard' tab.")
-                if not click_tab_with_retry(driver, wait, "normCfg", "Standard"):
-                    continue
+
+def match_new_parts(index, parts, new_configs):
+    """Assigns each newly added Parts row to its product among the config names that appeared."""
+    new_configs = set(new_configs)
+    logging.info(f"Found newly added Part config names: {new_configs}")
+    if len(parts) == 1 and len(new_configs) == 1:
+        parts[0]['config_name'] = new_configs.pop()
+        return
+    # Cached configname prefixes identify most rows without reading their text
+    for part in parts:
+        prefix = (part['cached'] or {}).get('configname_prefix')
+        matches = [config_name for config_name in new_configs if prefix and configname_prefix(config_name) == prefix]
+        if len(matches) == 1:
+            part['config_name'] = matches[0]
+            new_configs.discard(matches[0])
+    for config_name in new_configs:
+        row_text = index.config(config_name)['text']
+        for part in parts:
+            if 'config_name' not in part and part['name'] in row_text:
+                part['config_name'] = config_name
+                break
+
+
+def add_products(driver, wait, waiter, index, products, search_separator=None, catalogue=None, journal=None,
+                 row_order='config'):
+    """Adds all products tab by tab, committing each tab visit's products with a single Add/OK.
+
+    With a `search_separator`, each tab's products are found with one multi-condition
+    search; otherwise each product is searched and moved down with 'Add' on its own.
+    Products found in the `catalogue` skip the search while their row is already listed.
+    A product not found in the tab it was scheduled for is looked for in the other tab, so
+    the catalogue learns the tab it really is in.
+    `products` maps names to the PlannedProducts of the compiled config; `row_order` is
+    passed to schedule_products.
+    Returns the added products in config order, each with the XPath of its 'Edit' link.
+    """
+    config_order = list(products)
+    schedule = schedule_products(products, catalogue, row_order)
+    log_schedule(schedule, config_order, row_order)
+    added = []
+    unfound = []
+    for (tab_id, tab_name), group in schedule:
+        with tracing.span("add products", tab=tab_name, count=len(group)) as tab_span:
+            tab_added = add_tab_group(driver, wait, waiter, index, tab_id, tab_name, group, search_separator, catalogue,
+                                      journal, unfound)
+            if len(tab_added) < len(group):
+                tab_span.outcome = 'partial'
+            added.extend(tab_added)
+
+    other_tabs = {}
+    for tab, product in unfound:
+        other = STANDARD_TAB if tab == PARTS_TAB else PARTS_TAB
+        logging.info(f"{product['name']} was not found in the '{tab[1]}' tab, looking in the '{other[1]}' tab.")
+        # Products found on the Standard tab are identified by their product code
+        other_tabs.setdefault(other, []).append(dict(product, is_parts=product['is_parts'] and other == PARTS_TAB))
+    for (tab_id, tab_name), group in other_tabs.items():
+        with tracing.span("add products", tab=tab_name, count=len(group), other_tab=True) as tab_span:
+            tab_added = add_tab_group(driver, wait, waiter, index, tab_id, tab_name, group, search_separator, catalogue,
+                                      journal)
+            if len(tab_added) < len(group):
+                tab_span.outcome = 'partial'
+            added.extend(tab_added)
+
+    added.sort(key=lambda product: config_order.index(product['name']))
+    return added
+
+
+def add_tab_group(driver, wait, waiter, index, tab_id, tab_name, group, search_separator=None, catalogue=None, journal=None,
+                  unfound=None):
+    """Searches, ticks and commits one tab's products. Returns the products that were added.
+
+    Products that could not be selected in the search results are appended to `unfound`
+    with the tab, as ((tab id, tab name), product).
+    """
+    logging.info(f"Adding {len(group)} product(s) from the '{tab_name}' tab.")
+    with tracing.span("tab click", tab=tab_name) as tab_span:
+        if not click_tab_with_retry(driver, wait, tab_id, tab_name):
+            tab_span.outcome = 'failed'
+            return []
+        waiter.idle(f"tab content for {tab_name}", fallback=2)
+
+    existing_configs = set(index.refresh().configs)
+    rows_before = len(existing_configs)
+
+    if search_separator:
+        batches = [group]
+    else:
+        batches = [[product] for product in group]
+
+    staged = []
+    for batch in batches:
+        index.refresh()
+        to_search = [product for product in batch if not listed_in_results(index, product)]
+        if to_search:
+            search_products(driver, wait, waiter, (search_separator or " ").join(p['name'] for p in to_search))
+            index.refresh()
+        else:
+            logging.info(f"Cached product(s) already listed, skipping search: {[p['name'] for p in batch]}")
+        if catalogue:
+            catalogue.searches_skipped += len(batch) - len(to_search)
+        selected = []
+        for product in batch:
+            with tracing.span("select", product=product['name']) as select_span, log_context(product=product['name']):
+                if select_product(driver, wait, index, product):
+                    selected.append(product)
+                else:
+                    select_span.outcome = 'failed'
+                    if unfound is not None:
+                        unfound.append(((tab_id, tab_name), product))
+        if not selected:
+            continue
+
+        # Move the ticked rows down before the next search replaces the results (↓Add)
+        logging.info("Clicking 'Add' button.")
+        add_button = wait.until(EC.element_to_be_clickable((By.ID, "addToTable2")))
+        add_button.click()
+        logging.info("'Add' button clicked.")
+        staged.extend(selected)
+
+    if not staged:
+        return []
+
+    with tracing.span("commit", tab=tab_name, count=len(staged)):
+        logging.info(f"Clicking 'OK' button to add {len(staged)} product(s).")
+        ok_button = wait.until(EC.element_to_be_clickable((By.ID, "ok_button")))
+        ok_button.click()
+        logging.info("'OK' button clicked.")
+
+        waiter.row_count_change(f"main list update for {tab_name}", CHECKLIST_LOCATOR, rows_before, fallback=3)
+
+    new_configs = [config_name for config_name in index.refresh().configs if config_name not in existing_configs]
+    parts = [product for product in staged if product['is_parts']]
+    if parts:
+        match_new_parts(index, parts, new_configs)
+
+    added = []
+    for product in staged:
+        if product['is_parts']:
+            config_name = product.get('config_name')
+            if not config_name:
+                logging.error(f"Could not identify the newly added Part's config name for {product['name']}.")
+                continue
+            product['edit_xpath'] = edit_link_xpath(config_name)
+        elif not product['product_code']:
+            logging.error(f"No Product Code for {product['name']}, cannot identify its new row.")
+            continue
+        else:
+            # Standard rows carry the product code in their configname
+            matches = [config_name for config_name in new_configs if product['product_code'] in config_name]
+            if matches:
+                product['config_name'] = matches[0]
+                new_configs.remove(matches[0])
+                product['edit_xpath'] = edit_link_xpath(matches[0])
             else:
-                logging.warning(f"Product {product_name} has an unknown type. Assuming 'Parts' and proceeding.")
-                if not click_tab_with_retry(driver, wait, "partsCfg", "Parts"):
+                product['edit_xpath'] = f"//tr[.//input[@name='checkList' and contains(@configname, '{product['product_code']}')]]//a[@class='editConfig pointer']"
+        added.append(product)
+        if journal:
+            journal.product_added(product)
+        if catalogue:
+            catalogue.put(
+                product['name'],
+                tab=tab_name,
+                product_code=product['product_code'],
+                configname_prefix=configname_prefix(product['config_name']) if product['is_parts'] else None
+            )
+    return added
+
+
+def edit_link_xpath(config_name):
+    """XPath of the 'Edit' link of the configuration list row with the given configname."""
+    return f"//tr[.//input[@name='checkList' and @configname='{config_name}']]//a[@class='editConfig pointer']"
+
+
+def edit_product(driver, wait, index, product):
+    """Sets the config name and number of sets of an added product in the group editing dialog."""
+    product_name = product['name']
+    logging.info(f"Opening 'Edit' for {product_name}.")
+    entry = index.refresh().config(product.get('config_name'))
+    edit_button = entry and entry['edit']
+    if edit_button:
+        try:
+            driver.execute_script("arguments[0].scrollIntoView(true);", edit_button)
+            edit_button.click()
+        except (StaleElementReferenceException, ElementClickInterceptedException):
+            edit_button = None  # The list was re-rendered after the snapshot
+    if not edit_button:
+        edit_button = wait.until(EC.element_to_be_clickable((By.XPATH, product['edit_xpath'])))
+        driver.execute_script("arguments[0].scrollIntoView(true);", edit_button)
+        edit_button.click()
+    logging.info(f"Clicked 'Edit' for {product_name}.")
+
+    # The edit dialog is ready once the configName input below becomes visible
+
+    # --- Configure group editing dialog ---
+    # 1. Edit Config name
+    config_name_input = wait.until(EC.visibility_of_element_located((By.ID, "configName")))
+    config_name_input.clear()
+    config_name_input.send_keys(product_name)
+    logging.info(f"Set 'Config name' to '{product_name}'.")
+
+    # 2. Edit Sets
+    sets_input = wait.until(EC.visibility_of_element_located((By.NAME, "siteNum")))
+    sets_input.clear()
+    sets_input.send_keys(str(product['quantity']))
+    logging.info(f"Set 'Sets' to '{product['quantity']}'.")
+
+    # 3. Click OK to save changes
+    dialog_ok_button = wait.until(EC.element_to_be_clickable((By.ID, "ok_button")))
+    dialog_ok_button.click()
+    logging.info("Clicked 'OK' in the group editing dialog.")
+
+
+def set_accessory_quantity(driver, waiter, index, acc_name, acc_qty, confirm=True):
+    """Sets one accessory's quantity through the row's popup editor. Returns True once the row is selected.
+
+    Without `confirm`, returns once the quantity is entered; the end-of-run verification checks it.
+    """
+    cleaned_acc_name = clean_accessory_name(acc_name)
+    try:
+        logging.info(f"Processing accessory: '{cleaned_acc_name}'. Will select max value from dropdown or use configured quantity '{acc_qty}'.")
+
+        # 1. Find and click the accessory row to make it editable
+        # 使用更精确的XPath定位器
+        accessory_row_xpath = f"//tr[contains(@class, 'item_tr') and .//td[.//span[normalize-space(text())='{cleaned_acc_name}']]]"
+        logging.debug("Waiting for accessory row: %s", cleaned_acc_name)
+
+        # 增加等待时间，确保元素完全加载
+        wait = WebDriverWait(driver, 20)
+        entry = index.accessory_row(cleaned_acc_name)
+        if entry and entry['id']:
+            item_tr_id = entry['id']
+            accessory_row = driver.find_element(By.ID, item_tr_id)
+        else:
+            accessory_row = wait.until(EC.presence_of_element_located((By.XPATH, accessory_row_xpath)))
+            item_tr_id = accessory_row.get_attribute('id')
+        logging.debug("Found accessory row for %s with id: %s", cleaned_acc_name, item_tr_id)
+
+        # 确保元素在视图中并可点击
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", accessory_row)
+        waiter.idle(f"scroll to {cleaned_acc_name}", timeout=5, quiet=0.2)  # 等待滚动完成
+
+        # 1. 点击数量单元格以触发下拉列表
+        try:
+            # 尝试多种可能的数量单元格定位器
+            quantity_cell_xpath_list = [
+                f"//tr[@id='{item_tr_id}']//td[contains(@class, 'item_qty')]"
+            ]
+
+            quantity_cell = None
+            for qty_xpath in quantity_cell_xpath_list:
+                try:
+                    logging.debug("Trying quantity cell xpath: %s", qty_xpath)
+                    quantity_cell = wait.until(EC.element_to_be_clickable((By.XPATH, qty_xpath)))
+                    logging.debug("Found quantity cell using xpath: %s", qty_xpath)
+                    break
+                except TimeoutException:
                     continue
 
-            time.sleep(2) # Wait for tab content to load
-
-            logging.info(f"Adding product {product_name}...")
-
-            # 1. Search for the product
-            logging.info(f"Searching for product: {product_name}")
-            search_input = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "input[placeholder*='for multiple conditi']")))
-            search_input.clear()
-            search_input.send_keys(product_name)
-            
-            search_button = wait.until(EC.element_to_be_clickable((By.ID, "searchBtn")))
-            search_button.click()
-            logging.info("Search button clicked.")
-            
-            time.sleep(3) # Wait for search results
-            
-            # 2. Find the product row and get the Product Code (if standard)
-            product_row_xpath = f"//tr[contains(., '{product_name}')]"
-            product_row = wait.until(EC.visibility_of_element_located((By.XPATH, product_row_xpath)))
+            if not quantity_cell:
+                raise Exception("Could not find quantity cell with any of the attempted xpaths")
 
-            product_code = None
-            if not is_parts_type:
-                product_code_element = product_row.find_element(By.XPATH, ".//td[2]")
-                product_code = product_code_element.text
-                logging.info(f"Captured Product Code for Standard type: {product_code}")
-
-            # Before adding, get the current set of config names if it's a Parts type
-            if is_parts_type:
-                existing_configs = {el.get_attribute('configname') for el in driver.find_elements(By.XPATH, "//input[@name='checkList']")}
-                logging.info(f"Existing config names before adding Part: {existing_configs}")
-
-            # Select the checkbox for the product
-            logging.info(f"Selecting checkbox for {product_name}")
-            product_checkbox = product_row.find_element(By.XPATH, ".//input[@type='checkbox']")
-            product_checkbox.click()
-            logging.info("Product checkbox selected.")
-            
-            # 3. Click the 'Add' button (↓Add)
-            logging.info("Clicking 'Add' button.")
-            add_button = wait.until(EC.element_to_be_clickable((By.ID, "addToTable2")))
-            add_button.click()
-            logging.info("'Add' button clicked.")
-            
-            # 4. Click the 'OK' button
-            logging.info("Clicking 'OK' button.")
-            ok_button = wait.until(EC.element_to_be_clickable((By.ID, "ok_button")))
-            ok_button.click()
-            logging.info("'OK' button clicked.")
-
-            time.sleep(3) # Wait for the main list to update
-
-            # Find the row and click 'Edit'
+            # 直接点击数量单元格，优先使用ActionChains
+            try:
+                logging.debug("Attempting to click quantity cell for '%s' with ActionChains.", cleaned_acc_name)
+                ActionChains(driver).move_to_element(quantity_cell).click().perform()
+                logging.debug("ActionChains click on quantity cell successful.")
+            except Exception as e:
+                logging.warning(f"ActionChains click on quantity cell failed: {e}. Falling back to JavaScript click.")
+                driver.execute_script("arguments[0].click();", quantity_cell)
+                logging.debug("Clicked quantity cell with JavaScript.")
+
+            # 等待行进入编辑状态
+            try:
+                wait.until(lambda driver: 'editing' in driver.find_element(By.XPATH, f"//tr[@id='{item_tr_id}']").get_attribute('class'))
+                logging.debug("Row %s is now in editing state", item_tr_id)
+            except TimeoutException:
+                logging.warning(f"Row {item_tr_id} did not enter editing state, continuing anyway")
+
+            # 2. 根据item_tr_id判断使用弹出菜单还是直接输入
             try:
-                edit_button_xpath = ''
-                if is_parts_type:
-                    logging.info("Finding new config name for Parts type...")
-                    # Find the new config name by comparing with the old set
-                    new_configs = {el.get_attribute('configname') for el in driver.find_elements(By.XPATH, "//input[@name='checkList']")}
-                    newly_added_configs = new_configs - existing_configs
-                    if newly_added_configs:
-                        new_config_name = newly_added_configs.pop()
-                        logging.info(f"Found newly added Part config name: {new_config_name}")
-                        edit_button_xpath = f"//tr[.//input[@name='checkList' and @configname='{new_config_name}']]//a[@class='editConfig pointer']"
+                # 尝试弹出菜单方式，如果失败则尝试直接输入
+                popup_menu_success = False
+                try:
+                    # 等待弹出菜单出现
+                    popup_menu_xpath = f"//div[@id='action_div' and contains(@class, 'popup-menu')]//a[text()='{acc_qty}']"
+                    target_option = WebDriverWait(driver, 3).until(
+                        EC.element_to_be_clickable((By.XPATH, popup_menu_xpath))
+                    )
+
+                    # 点击目标选项
+                    target_option.click()
+                    logging.debug("Successfully clicked popup menu option '%s'", acc_qty)
+                    popup_menu_success = True
+
+                    # 发送Enter键确认
+                    from selenium.webdriver.common.keys import Keys
+                    target_option.send_keys(Keys.ENTER)
+                    logging.debug("Sent Enter key to confirm popup menu selection")
+
+                except Exception as e:
+                    logging.debug("Popup menu approach failed: %s. Trying direct input instead.", e)
+
+                # 如果弹出菜单方式失败，尝试直接输入
+                if not popup_menu_success:
+                    logging.debug("Switching to direct input for quantity '%s'...", acc_qty)
+
+                    # 终极方法V2：通过获取活动元素来定位输入框
+                    logging.debug("Switching to active element strategy for quantity '%s'...", acc_qty)
+                    # 等待JS创建input并聚焦
+                    waiter.until(f"quantity input for {cleaned_acc_name}",
+                                 lambda d: d.switch_to.active_element.tag_name == 'input',
+                                 timeout=5, fallback=1)
+
+                    # 1. 直接获取当前页面的活动元素
+                    quantity_input = driver.switch_to.active_element
+                    if quantity_input and quantity_input.tag_name == 'input':
+                        # outerHTML costs a browser round trip, so only fetch it when it will be logged
+                        if logging.getLogger().isEnabledFor(logging.DEBUG):
+                            logging.debug("Successfully got active element: %s", quantity_input.get_attribute('outerHTML'))
+                        # 2. 使用JS设值并触发事件
+                        js_script = """
+                        var input = arguments[0];
+                        var value = arguments[1];
+                        input.value = value;
+                        var event_input = new Event('input', { bubbles: true });
+                        var event_change = new Event('change', { bubbles: true });
+                        input.dispatchEvent(event_input);
+                        input.dispatchEvent(event_change);
+                        """
+                        driver.execute_script(js_script, quantity_input, str(acc_qty))
+                        logging.debug("Set quantity to '%s' and dispatched events.", acc_qty)
+
+                        # 3. 发送Enter键确认
+                        from selenium.webdriver.common.keys import Keys
+                        quantity_input.send_keys(Keys.ENTER)
+                        logging.debug("Sent Enter key to finalize input.")
                     else:
-                        logging.error("Could not identify the newly added Part's config name.")
-                        continue # Skip to next product
-                else: # Standard type
-                    logging.info(f"Finding row for standard product code {product_code} to edit.")
-                    edit_button_xpath = f"//tr[.//input[@name='checkList' and contains(@configname, '{product_code}')]]//a[@class='editConfig pointer']"
-
-                edit_button = wait.until(EC.element_to_be_clickable((By.XPATH, edit_button_xpath)))
-                
-                driver.execute_script("arguments[0].scrollIntoView(true);", edit_button)
-                time.sleep(1)
-                edit_button.click()
-                logging.info(f"Clicked 'Edit' for the last added product.")
-
-                time.sleep(2) # Wait for the edit dialog to appear
-
-                # --- Configure group editing dialog ---
-                # 1. Edit Config name
-                config_name_input = wait.until(EC.visibility_of_element_located((By.ID, "configName")))
-                config_name_input.clear()
-                config_name_input.send_keys(product_name)
-                logging.info(f"Set 'Config name' to '{product_name}'.")
-
-                # 2. Edit Sets
-                sets_input = wait.until(EC.visibility_of_element_located((By.NAME, "siteNum")))
-                sets_input.clear()
-                sets_input.send_keys(str(quantity))
-                logging.info(f"Set 'Sets' to '{quantity}'.")
-
-                # 3. Click OK to save changes
-                dialog_ok_button = wait.until(EC.element_to_be_clickable((By.ID, "ok_button")))
-                dialog_ok_button.click()
-                logging.info("Clicked 'OK' in the group editing dialog.")
-
-                # If accessories exist, enter detail page to add them
-                if accessories:
-                    logging.info(f"Entering detail page for {product_name} to add accessories.")
-                    # From the screenshot, the link is an <a> tag with class 'showConfig'.
-                    detail_link_xpath = f"//a[@class='showConfig' and contains(., '{product_name}')]"
-                    detail_link = wait.until(EC.element_to_be_clickable((By.XPATH, detail_link_xpath)))
-                    # Use JavaScript click to avoid potential interception
-                    driver.execute_script("arguments[0].click();", detail_link)
-                    logging.info(f"Clicked product name to enter detail page.")
-                    time.sleep(5)  # Wait for detail page to load
-
-                    # On the Components page, find and click the link ending with "#1" to go to the accessory selection page.
-                    logging.info("On Components page, looking for link ending with '#1'.")
-                    try:
-                        switch_link_id = f"node_title__{product_code}_0"
-                        switch_link = wait.until(EC.element_to_be_clickable((By.ID, switch_link_id)))
-                        driver.execute_script("arguments[0].click();", switch_link)
-                        logging.info("Clicked the switch link ending with '#1'.")
-                        logging.info("Waiting for accessory page to load...")
-                        wait.until(EC.presence_of_element_located((By.ID, "allzhankai")))
-                        logging.info("Accessory page loaded.")
-
-                        # Click 'Expand all'
-                        try:
-                            logging.info("Waiting for 'Expand all' button to be clickable.")
-                            expand_all_button = WebDriverWait(driver, 20).until(
-                                EC.element_to_be_clickable((By.ID, "expand_all"))
-                            )
-                            expand_all_button.click()
-                            logging.info("Clicked 'Expand all'.")
-                            time.sleep(2) # Wait for sections to expand
-                        except Exception as e:
-                            logging.error(f"Could not find or click 'Expand all': {str(e)}")
-                            driver.save_screenshot("expand_all_error.png")
-
-                        # Process each accessory
-                        for acc_name, acc_qty in accessories.items():
-                            cleaned_acc_name = acc_name.strip().lstrip('-').strip()
-                            try:
-                                logging.info(f"Processing accessory: '{cleaned_acc_name}'. Will select max value from dropdown or use configured quantity '{acc_qty}'.")
-
-                                # 1. Find and click the accessory row to make it editable
-                                # 使用更精确的XPath定位器
-                                accessory_row_xpath = f"//tr[contains(@class, 'item_tr') and .//td[.//span[normalize-space(text())='{cleaned_acc_name}']]]"
-                                logging.info(f"Waiting for accessory row: {cleaned_acc_name}")
-                                
-                                # 增加等待时间，确保元素完全加载
-                                wait = WebDriverWait(driver, 20)
-                                accessory_row = wait.until(EC.presence_of_element_located((By.XPATH, accessory_row_xpath)))
-                                item_tr_id = accessory_row.get_attribute('id')
-                                logging.info(f"Found accessory row for {cleaned_acc_name} with id: {item_tr_id}")
-                                
-                                # 确保元素在视图中并可点击
-                                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", accessory_row)
-                                time.sleep(2)  # 等待滚动完成
-                                
-                                # 1. 点击数量单元格以触发下拉列表
-                                try:
-                                    # 尝试多种可能的数量单元格定位器
-                                    quantity_cell_xpath_list = [
-                                        f"//tr[@id='{item_tr_id}']//td[contains(@class, 'item_qty')]"
-                                    ]
-                                    
-                                    quantity_cell = None
-                                    for qty_xpath in quantity_cell_xpath_list:
-                                        try:
-                                            logging.info(f"Trying quantity cell xpath: {qty_xpath}")
-                                            quantity_cell = wait.until(EC.element_to_be_clickable((By.XPATH, qty_xpath)))
-                                            logging.info(f"Found quantity cell using xpath: {qty_xpath}")
-                                            break
-                                        except TimeoutException:
-                                            continue
-                                    
-                                    if not quantity_cell:
-                                        raise Exception("Could not find quantity cell with any of the attempted xpaths")
-                                    
-                                    # 直接点击数量单元格，优先使用ActionChains
-                                    try:
-                                        logging.info(f"Attempting to click quantity cell for '{cleaned_acc_name}' with ActionChains.")
-                                        ActionChains(driver).move_to_element(quantity_cell).click().perform()
-                                        logging.info("ActionChains click on quantity cell successful.")
-                                    except Exception as e:
-                                        logging.warning(f"ActionChains click on quantity cell failed: {e}. Falling back to JavaScript click.")
-                                        driver.execute_script("arguments[0].click();", quantity_cell)
-                                        logging.info("Clicked quantity cell with JavaScript.")
-                                    
-                                    time.sleep(1) # 短暂等待，以防下拉菜单有动画
-                                    
-                                    # 等待行进入编辑状态
-                                    try:
-                                        wait.until(lambda driver: 'editing' in driver.find_element(By.XPATH, f"//tr[@id='{item_tr_id}']").get_attribute('class'))
-                                        logging.info(f"Row {item_tr_id} is now in editing state")
-                                    except TimeoutException:
-                                        logging.warning(f"Row {item_tr_id} did not enter editing state, continuing anyway")
-
-                                    # 2. 根据item_tr_id判断使用弹出菜单还是直接输入
-                                    try:
-                                        # 尝试弹出菜单方式，如果失败则尝试直接输入
-                                        popup_menu_success = False
-                                        try:
-                                            # 等待弹出菜单出现
-                                            popup_menu_xpath = f"//div[@id='action_div' and contains(@class, 'popup-menu')]//a[text()='{acc_qty}']"
-                                            target_option = WebDriverWait(driver, 3).until(
-                                                EC.element_to_be_clickable((By.XPATH, popup_menu_xpath))
-                                            )
-                                            
-                                            # 点击目标选项
-                                            target_option.click()
-                                            logging.info(f"Successfully clicked popup menu option '{acc_qty}'")
-                                            popup_menu_success = True
-                                            
-                                            # 发送Enter键确认
-                                            from selenium.webdriver.common.keys import Keys
-                                            target_option.send_keys(Keys.ENTER)
-                                            logging.info("Sent Enter key to confirm popup menu selection")
-                                            
-                                        except Exception as e:
-                                            logging.info(f"Popup menu approach failed: {e}. Trying direct input instead.")
-                                        
-                                        # 如果弹出菜单方式失败，尝试直接输入
-                                        if not popup_menu_success:
-                                            logging.info(f"Switching to direct input for quantity '{acc_qty}'...")
-                                            
-                                            # 终极方法V2：通过获取活动元素来定位输入框
-                                            logging.info(f"Switching to active element strategy for quantity '{acc_qty}'...")
-                                            time.sleep(1) # 等待JS创建input并聚焦
-
-                                            # 1. 直接获取当前页面的活动元素
-                                            quantity_input = driver.switch_to.active_element
-                                            if quantity_input and quantity_input.tag_name == 'input':
-                                                logging.info(f"Successfully got active element: {quantity_input.get_attribute('outerHTML')}")
-                                                # 2. 使用JS设值并触发事件
-                                                js_script = """
-                                                var input = arguments[0];
-                                                var value = arguments[1];
-                                                input.value = value;
-                                                var event_input = new Event('input', { bubbles: true });
-                                                var event_change = new Event('change', { bubbles: true });
-                                                input.dispatchEvent(event_input);
-                                                input.dispatchEvent(event_change);
-                                                """
-                                                driver.execute_script(js_script, quantity_input, str(acc_qty))
-                                                logging.info(f"Set quantity to '{acc_qty}' and dispatched events.")
-                                                time.sleep(0.5)
-
-                                                # 3. 发送Enter键确认
-                                                from selenium.webdriver.common.keys import Keys
-                                                quantity_input.send_keys(Keys.ENTER)
-                                                logging.info("Sent Enter key to finalize input.")
-                                            else:
-                                                raise Exception("Failed to get active element or it was not an input field.")
-                                    
-                                        # 等待行变为selected状态以确认操作成功
-                                        WebDriverWait(driver, 5).until(
-                                            lambda d: 'selected' in d.find_element(By.XPATH, f"//tr[@id='{item_tr_id}']").get_attribute('class')
-                                        )
-                                        logging.info(f"Row {item_tr_id} is now in selected state, confirming quantity update")
-
-                                    except Exception as e:
-                                        logging.error(f"Failed to select quantity for '{cleaned_acc_name}': {e}")
-                                        driver.save_screenshot(f'error_screenshot_select_qty_{cleaned_acc_name}_{int(time.time())}.png')
-                                        continue # 继续处理下一个附件
-
-                                except Exception as e:
-                                    logging.error(f"Failed to perform quantity selection for '{cleaned_acc_name}': {e}")
-                                    driver.save_screenshot(f'error_screenshot_perform_qty_selection_{cleaned_acc_name}_{int(time.time())}.png')
-                                    continue # 继续处理下一个附件
-
-                                # 4. Wait for the row to become 'selected' to confirm the action
-                                selected_row_xpath = f"{accessory_row_xpath}[contains(@class, 'selected')]"
-                                logging.info(f"Waiting for row to become selected: {selected_row_xpath}")
-                                wait.until(EC.presence_of_element_located((By.XPATH, selected_row_xpath)))
-                                logging.info(f"Successfully selected quantity for '{cleaned_acc_name}'.")
-                                time.sleep(1) # Pause before next accessory
-
-                            except Exception as e:
-                                logging.error(f"Could not process accessory '{cleaned_acc_name}': {str(e)}")
-                                driver.save_screenshot(f"error_acc_{cleaned_acc_name.replace(' ', '_')}.png")
-                                # Continue to the next accessory instead of crashing
-
-                        # After configuring accessories, save and go back to the main configuration page.
-                        logging.info("Finished configuring accessories. Returning to main configuration page.")
-                        
-                        # 保存配置
-                        logging.info("Step 3: Saving configuration...")
-                        try:
-                            save_button = WebDriverWait(driver, 10).until(
-                                EC.element_to_be_clickable((By.ID, "h3c_save_config"))
-                            )
-                            save_button.click()
-                            logging.info("Successfully clicked save button")
-                            time.sleep(2)  # 等待保存完成
-                        except Exception as e:
-                            logging.error(f"Error clicking save button: {e}")
-                        
-                        # 返回主列表
-                        logging.info("Step 4: Returning to main list...")
-                        try:
-                            back_button = WebDriverWait(driver, 10).until(
-                                EC.element_to_be_clickable((By.ID, "back_list"))
-                            )
-                            back_button.click()
-                            logging.info("Successfully clicked back button.")
-
-                            # Check for and handle the confirmation dialog
-                            try:
-                                confirm_yes_button = WebDriverWait(driver, 3).until(
-                                    EC.element_to_be_clickable((By.ID, "_confirm_yes"))
-                                )
-                                confirm_yes_button.click()
-                                logging.info("Confirmation dialog appeared and 'Yes' was clicked.")
-                            except TimeoutException:
-                                logging.info("Confirmation dialog did not appear.")
-
-                            logging.info("Returned to main list")
-                            time.sleep(2)  # Wait for page to load
-                        except Exception as e:
-                            logging.error(f"Error clicking back button: {e}")
-                            raise
-
-                    except Exception as e:
-                        logging.error(f"Could not process accessories on Components page for {product_name}: {e}")
-                        driver.save_screenshot(f"error_components_page_{product_name}.png")
-                        # If we fail, try to refresh and see if it helps before going back.
-                        logging.info("Refreshing page to recover from error.")
-                        driver.refresh()
-                        time.sleep(5)
-                        try:
-                            logging.info("Attempting to return to main configuration page after error.")
-                            back_button = wait.until(EC.element_to_be_clickable((By.ID, "back_list")))
-                            driver.execute_script("arguments[0].click();", back_button)
-                            time.sleep(3)
-                        except Exception as back_e:
-                            logging.error(f"Failed to go back to the main page after refresh: {back_e}")
-                            raise
+                        raise Exception("Failed to get active element or it was not an input field.")
+
+                # 等待行变为selected状态以确认操作成功
+                if confirm:
+                    WebDriverWait(driver, 5).until(
+                        lambda d: 'selected' in d.find_element(By.XPATH, f"//tr[@id='{item_tr_id}']").get_attribute('class')
+                    )
+                    logging.debug("Row %s is now in selected state, confirming quantity update", item_tr_id)
 
             except Exception as e:
-                logging.error(f"Failed to edit configuration or add accessories for {product_name}: {e}")
-                driver.save_screenshot(f"error_main_product_{product_name}.png")
+                logging.error(f"Failed to select quantity for '{cleaned_acc_name}': {e}")
+                diagnostics.capture(driver, "select_qty", cleaned_acc_name, e)
+                return False # 继续处理下一个附件
 
-            logging.info(f"Finished processing product: {product_name}.")
+        except Exception as e:
+            logging.error(f"Failed to perform quantity selection for '{cleaned_acc_name}': {e}")
+            diagnostics.capture(driver, "perform_qty_selection", cleaned_acc_name, e)
+            return False # 继续处理下一个附件
+
+        # 4. Wait for the row to become 'selected' to confirm the action
+        if confirm:
+            selected_row_xpath = f"//tr[@id='{item_tr_id}'][contains(@class, 'selected')]"
+            logging.debug("Waiting for row to become selected: %s", selected_row_xpath)
+            wait.until(EC.presence_of_element_located((By.XPATH, selected_row_xpath)))
+            logging.info(f"Successfully selected quantity for '{cleaned_acc_name}'.")
+        waiter.idle(f"accessory {cleaned_acc_name} applied", timeout=10, fallback=1)
+        return True
 
-        time.sleep(10) # Final wait to observe the result
+    except Exception as e:
+        logging.error(f"Could not process accessory '{cleaned_acc_name}': {str(e)}")
+        diagnostics.capture(driver, "accessory", cleaned_acc_name, e)
+        # Continue to the next accessory instead of crashing
+        return False
+
+
+def fill_accessory_page(driver, waiter, index, product, bulk_accessories=True, confirm_steps=True):
+    """Expands an open accessory page, sets the product's accessory quantities and saves them.
+
+    Returns the names of the accessories that were set and saved. Without `confirm_steps`
+    the rows are not read back after being set.
+    """
+    product_name = product['name']
+    accessories = product['accessories']
+
+    # Click 'Expand all'
+    try:
+        logging.info("Waiting for 'Expand all' button to be clickable.")
+        expand_all_button = WebDriverWait(driver, 20).until(
+            EC.element_to_be_clickable((By.ID, "expand_all"))
+        )
+        expand_all_button.click()
+        logging.info("Clicked 'Expand all'.")
+        waiter.idle("expand all", fallback=2)
+    except Exception as e:
+        logging.error(f"Could not find or click 'Expand all': {str(e)}")
+        diagnostics.capture(driver, "expand_all", error=e)
+
+    # Process each accessory: in bulk first, then one by one for rows the bulk path could not set
+    remaining = accessories
+    if bulk_accessories:
+        with tracing.span("bulk accessories", count=len(accessories)) as bulk_span:
+            remaining = set_quantities_bulk(driver, waiter, accessories, confirm_steps)
+            bulk_span.set(fallback=len(remaining))
+    configured = [acc_name for acc_name in accessories if acc_name not in remaining]
+    if remaining:
+        index.refresh()
+    for acc_name, acc_qty in remaining.items():
+        cleaned_acc_name = clean_accessory_name(acc_name)
+        with tracing.span("accessory", accessory=cleaned_acc_name) as acc_span, log_context(accessory=cleaned_acc_name):
+            if set_accessory_quantity(driver, waiter, index, acc_name, acc_qty, confirm_steps):
+                configured.append(acc_name)
+            else:
+                acc_span.outcome = 'failed'
+
+    logging.info("Finished configuring accessories.")
+
+    # 保存配置
+    with tracing.span("save", product=product_name) as save_span:
+        logging.info("Step 3: Saving configuration...")
+        try:
+            save_button = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.ID, "h3c_save_config"))
+            )
+            save_button.click()
+            logging.info("Successfully clicked save button")
+            waiter.idle(f"save configuration for {product_name}", fallback=2)  # 等待保存完成
+        except Exception as e:
+            logging.error(f"Error clicking save button: {e}")
+            save_span.outcome = 'failed'
+            configured = []  # Nothing set on this page was saved
+    return configured
+
+
+def configure_accessories(driver, wait, waiter, index, product, bulk_accessories=True, confirm_steps=True):
+    """Opens a product's Components page, sets its accessory quantities, saves and returns to the list.
+
+    Returns the names of the accessories that were set and saved. Raises if the page itself
+    fails; the caller then re-enters the product from the quotation's configuration list.
+    """
+    product_name = product['name']
+    product_code = product['product_code']
+    logging.info(f"Entering detail page for {product_name} to add accessories.")
+    # From the screenshot, the link is an <a> tag with class 'showConfig'.
+    entry = index.refresh().config(product.get('config_name'))
+    detail_link = entry and entry['detail']
+    try:
+        # Use JavaScript click to avoid potential interception
+        if detail_link:
+            driver.execute_script("arguments[0].click();", detail_link)
+    except StaleElementReferenceException:
+        detail_link = None  # The list was re-rendered after the snapshot
+    if not detail_link:
+        detail_link_xpath = f"//a[@class='showConfig' and contains(., '{product_name}')]"
+        detail_link = wait.until(EC.element_to_be_clickable((By.XPATH, detail_link_xpath)))
+        driver.execute_script("arguments[0].click();", detail_link)
+    logging.info(f"Clicked product name to enter detail page.")
+    waiter.page_ready(f"detail page for {product_name}", fallback=5)
+
+    # On the Components page, find and click the link ending with "#1" to go to the accessory selection page.
+    logging.info("On Components page, looking for link ending with '#1'.")
+    try:
+        switch_link_id = f"node_title__{product_code}_0"
+        switch_link = wait.until(EC.element_to_be_clickable((By.ID, switch_link_id)))
+        driver.execute_script("arguments[0].click();", switch_link)
+        logging.info("Clicked the switch link ending with '#1'.")
+        logging.info("Waiting for accessory page to load...")
+        wait.until(EC.presence_of_element_located((By.ID, "allzhankai")))
+        logging.info("Accessory page loaded.")
+        configured = fill_accessory_page(driver, waiter, index, product, bulk_accessories, confirm_steps)
+
+        # 返回主列表
+        with tracing.span("back to list", product=product_name):
+            logging.info("Step 4: Returning to main list...")
+            try:
+                back_button = WebDriverWait(driver, 10).until(
+                    EC.element_to_be_clickable((By.ID, "back_list"))
+                )
+                back_button.click()
+                logging.info("Successfully clicked back button.")
+
+                # Check for and handle the confirmation dialog
+                try:
+                    confirm_yes_button = WebDriverWait(driver, 3).until(
+                        EC.element_to_be_clickable((By.ID, "_confirm_yes"))
+                    )
+                    confirm_yes_button.click()
+                    logging.info("Confirmation dialog appeared and 'Yes' was clicked.")
+                except TimeoutException:
+                    logging.info("Confirmation dialog did not appear.")
+
+                logging.info("Returned to main list")
+                waiter.page_ready("main list", fallback=2)
+            except Exception as e:
+                logging.error(f"Error clicking back button: {e}")
+                raise
+        return configured
+
+    except Exception as e:
+        logging.error(f"Could not process accessories on Components page for {product_name}: {e}")
+        diagnostics.capture(driver, "components_page", product_name, e)
+        raise
+
+
+def accessory_tab_steps(driver, waiter, product, bulk_accessories=True, confirm_steps=True):
+    """Sets a product's accessories on its Components page, opened in a tab of its own.
+
+    A TabScheduler job: yields while the tab loads the accessory tree, then returns the
+    names of the accessories that were set and saved.
+    """
+    product_name = product['name']
+    wait = WebDriverWait(driver, 20)
+    waiter.page_ready(f"detail page for {product_name}", fallback=5)
+    switch_link = wait.until(EC.element_to_be_clickable((By.ID, f"node_title__{product['product_code']}_0")))
+    driver.execute_script("arguments[0].click();", switch_link)
+    yield
+    wait.until(EC.presence_of_element_located((By.ID, "allzhankai")))
+    # Each tab is its own document, so it gets its own index
+    return fill_accessory_page(driver, waiter, PageIndex(driver), product, bulk_accessories, confirm_steps)
+
+
+def configure_accessories_in_tabs(driver, waiter, index, products, journal, max_tabs, bulk_accessories=True,
+                                  confirm_steps=True):
+    """Sets the pending accessories of several products at once, each on its Components page in its own tab.
+
+    Products whose tab fails stay unfinished in the journal and are picked up by the one-by-one pass.
+    """
+    index.refresh()
+    jobs = []
+    for product in products:
+        product_name = product['name']
+        pending = {name: qty for name, qty in product['accessories'].items()
+                   if name not in journal.accessories_done(product_name)}
+        if not pending:
+            continue
+        entry = index.config(product.get('config_name'))
+        try:
+            url = entry and entry['detail'] and entry['detail'].get_attribute('href')
+        except StaleElementReferenceException:
+            url = None  # The list was re-rendered after the snapshot; left to the one-by-one pass
+        if not url or not url.startswith('http'):
+            continue
+        jobs.append((product_name, url, lambda product=dict(product, accessories=pending):
+                     accessory_tab_steps(driver, waiter, product, bulk_accessories, confirm_steps)))
+    if not jobs:
+        return
+
+    logging.info(f"Configuring accessories of {len(jobs)} product(s) in up to {max_tabs} tabs.")
+    scheduler = TabScheduler(driver, max_tabs)
+    with tracing.span("accessory tabs", count=len(jobs), tabs=max_tabs):
+        results = scheduler.run(jobs)
+    for product_name, configured in results.items():
+        if isinstance(configured, Exception):
+            continue
+        journal.accessories_saved(product_name, configured)
+    scheduler.log_summary()
+
+
+def process_product(driver, wait, waiter, index, product, journal, bulk_accessories=True, confirm_steps=True):
+    """Edits a product and sets its accessories, skipping what the journal already records.
+
+    Each finished part is journaled before the next starts, so this can simply be run again
+    after a failure. Returns True once every accessory is set and saved.
+    """
+    product_name = product['name']
+    if not journal.is_edited(product_name):
+        with tracing.span("edit", product=product_name):
+            edit_product(driver, wait, index, product)
+        journal.product_edited(product_name)
+
+    done = journal.accessories_done(product_name)
+    pending = {name: qty for name, qty in product['accessories'].items() if name not in done}
+    if not pending:
+        return True
+    # If accessories exist, enter detail page to add them
+    with tracing.span("accessories", product=product_name, count=len(pending)):
+        configured = configure_accessories(driver, wait, waiter, index, dict(product, accessories=pending),
+                                           bulk_accessories, confirm_steps)
+    journal.accessories_saved(product_name, configured)
+    return len(configured) == len(pending)
+
+
+def return_to_quotation(driver, wait, waiter, quotation_url):
+    """Brings the browser back to the quotation's configuration list so a failed product can be re-entered."""
+    logging.info("Returning to the quotation's configuration list.")
+    if quotation_url:
+        driver.get(quotation_url)
+        waiter.page_ready("quotation reload", fallback=3)
+    else:
+        back_button = wait.until(EC.element_to_be_clickable((By.ID, "back_list")))
+        driver.execute_script("arguments[0].click();", back_button)
+        waiter.page_ready("main list", fallback=3)
+    open_configuration_tab(driver, wait, waiter)
+
+
+def login(driver, wait, waiter, username, password, base_url=BASE_URL):
+    """Runs the credential login flow on the login page."""
+    logging.info("Opening login page...")
+    driver.get(f"{base_url}/Index")
+
+    logging.info("Selecting language...")
+    english_link = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, ".englishDiv a")))
+    english_link.click()
+    
+    wait.until(EC.text_to_be_present_in_element((By.ID, "lblLoginTitle"), "Welcome Channel user to login the H3C Configurator"))
+    logging.info("Language selected: English")
+
+    logging.info("Clicking 'H3C user' tab...")
+    h3c_user_tab = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#InternalUser a")))
+    h3c_user_tab.click()
+    logging.info("'H3C user' tab clicked.")
+
+    wait.until(EC.visibility_of_element_located((By.ID, "userAccounts")))
+    
+    logging.info("Entering credentials...")
+    username_field = wait.until(EC.element_to_be_clickable((By.ID, "userAccounts")))
+    password_field = wait.until(EC.element_to_be_clickable((By.ID, "password")))
+    
+    username_field.send_keys(username)
+    password_field.send_keys(password)
+    logging.info("Credentials entered.")
+
+    logging.info("Clicking login button...")
+    login_button = wait.until(EC.element_to_be_clickable((By.ID, "login_submit")))
+    login_button.click()
+
+    logging.info("Waiting for page to load after login...")
+    waiter.page_ready("login", fallback=10)
+    wait.until(EC.presence_of_element_located((By.ID, "myH3CQuotation")))
+    logging.info("Login successful!")
+
+
+def start_session(driver, wait, waiter, base_url=BASE_URL, session_file=SESSION_FILE):
+    """Logs the browser in, reusing the saved session while it is valid. Returns False without credentials."""
+    with tracing.span("login") as login_span:
+        if session_file and restore_session(driver, f"{base_url}/Index", session_file):
+            login_span.set(session='reused')
+            return True
+        username, password = get_credentials()
+        if not username or not password:
+            logging.error("Username or password not found in Account.txt")
+            login_span.outcome = 'failed'
+            return False
+        login(driver, wait, waiter, username, password, base_url)
+        if session_file:
+            save_session(driver, session_file)
+        return True
+
+
+def open_quotation_list(driver, wait, waiter):
+    """Opens the quotation list from the main menu."""
+    # Click the Quotation menu using JavaScript to ensure the click is registered
+    logging.info("Attempting to click Quotation menu...")
+    quotation_menu = wait.until(EC.element_to_be_clickable((By.ID, "myH3CQuotation")))
+    driver.execute_script("arguments[0].click();", quotation_menu)
+    logging.info("Clicked the Quotation menu.")
+    waiter.page_ready("quotation list", fallback=10)
+
+
+def open_configuration_tab(driver, wait, waiter):
+    """Switches an open quotation to its Configuration tab."""
+    logging.info("Clicking 'Configuration' tab...")
+    configuration_tab = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "config_page")))
+    configuration_tab.click()
+    logging.info("Clicked 'Configuration' tab.")
+
+    waiter.page_ready("configuration page", fallback=10)
+
+
+def open_existing_quotation(driver, wait, waiter, name, url=None):
+    """Reopens a saved quotation, by its URL when known or else by name from the quotation list."""
+    if url:
+        logging.info(f"Reopening quotation '{name}' at {url}")
+        driver.get(url)
+        waiter.page_ready(f"quotation {name}", fallback=5)
+    else:
+        open_quotation_list(driver, wait, waiter)
+        logging.info(f"Opening quotation '{name}' from the quotation list...")
+        quotation_link = wait.until(EC.element_to_be_clickable((By.XPATH, f"//table//a[normalize-space(.)='{name}']")))
+        driver.execute_script("arguments[0].click();", quotation_link)
+        waiter.page_ready(f"quotation {name}", fallback=5)
+    open_configuration_tab(driver, wait, waiter)
+
+
+def sync_quotation(driver, wait, waiter, plan, journal, catalogue=None, dry_run=False):
+    """Opens the quotation named in the config and brings it in line with the config.
+
+    Rows no longer configured are deleted, and the journal is seeded with the rows that
+    stay, so the usual add/edit/accessory steps only do what changed. Returns the products
+    to work through, including accessories to set back to zero, or None after a `dry_run`
+    that only logs the changes. Raises SyncRefusedError rather than delete every row.
+    """
+    config = plan.as_config()
+    products = config['products']
+    name = config['Quotation name']
+    previous = journal.previous_run()
+    url = previous.get('quotation_url') if previous.get('quotation_name') == name else None
+    open_existing_quotation(driver, wait, waiter, name, url)
+
+    if not previous.get('applied'):
+        logging.info("No accessory record from an earlier run; accessories of existing rows are left as they are.")
+    # Rows are recognised by the configname and product code journaled or cached for each product
+    known = {product_name: dict(saved) for product_name, saved in previous.get('added', {}).items()}
+    for product_name in products:
+        cached = catalogue.get(product_name) if catalogue else None
+        if cached and cached.get('product_code') and not plan.products[product_name].is_parts:
+            known.setdefault(product_name, {}).setdefault('product_code', cached['product_code'])
+    rows = read_config_rows(driver)
+    diff = diff_quotation(rows, products, previous.get('applied'), known)
+    log_diff(diff, products)
+    if dry_run:
+        logging.info("Dry run: the quotation was not changed.")
+        return None
+    if rows and len(diff['remove']) == len(rows):
+        raise SyncRefusedError(
+            f"Sync would delete all {len(rows)} row(s) of '{name}', none of which matched a configured product; "
+            f"not changing the quotation. Check the diff above with --dry-run."
+        )
+    if diff['remove']:
+        with tracing.span("remove", count=len(diff['remove'])):
+            remove_rows(driver, wait, waiter, diff['remove'])
+
+    journal.start(plan.path, applied=previous.get('applied'))
+    journal.quotation_created(name, driver.current_url)
+    targets = {}
+    for product_name, data in products.items():
+        changed = diff['accessories'].get(product_name, {})
+        targets[product_name] = dict(data, accessories=dict(data['accessories'], **changed))
+        row = diff['kept'].get(product_name)
+        if not row:
+            continue
+        planned = plan.products[product_name]
+        cached = catalogue.get(product_name) if catalogue else None
+        product_code = (cached or {}).get('product_code')
+        if not product_code and not planned.is_parts:
+            product_code = configname_prefix(row['configname'])
+        journal.product_added({
+            'name': product_name,
+            'quantity': planned.quantity,
+            'is_parts': planned.is_parts,
+            'product_code': product_code,
+            'config_name': row['configname'],
+            'edit_xpath': edit_link_xpath(row['configname']),
+        })
+        if product_name not in diff['edit']:
+            journal.product_edited(product_name)
+        journal.accessories_saved(product_name, [acc_name for acc_name in data['accessories'] if acc_name not in changed])
+    return targets
+
+
+def create_quotation(driver, wait, waiter, config):
+    """Opens a new quotation, fills in its basic information and moves to the Configuration tab.
+
+    Returns the URL of the saved quotation so a later run can reopen it.
+    """
+    open_quotation_list(driver, wait, waiter)
+
+    # Wait for the 'New' button to be clickable on the new page
+    logging.info("Waiting for 'New' button...")
+    new_button = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "New")))
+    new_button.click()
+    logging.info("Clicked 'New' button.")
+
+    # Fill the basic information form
+    quotation_name_input = wait.until(EC.visibility_of_element_located((By.ID, "quoterName")))
+    quotation_name_input.send_keys(config.get("Quotation name"))
+    logging.info(f"Entered Quotation name: {config.get('Quotation name')}")
+
+    logging.info("Clicking country dropdown...")
+    country_dropdown_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-id='countryCode']")))
+    country_dropdown_button.click()
+
+    country_name = config.get("Country")
+    logging.info(f"Selecting country: {country_name}")
+    country_option_xpath = f"//div[contains(@class, 'dropdown-menu')]//span[text()='{country_name}']"
+    country_option = wait.until(EC.element_to_be_clickable((By.XPATH, country_option_xpath)))
+    country_option.click()
+    logging.info(f"Selected Country: {country_name}")
+
+    if config.get("Is U.S. ECCN needed") == "Yes":
+        eccn_radio = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='eccn'][value='1']")))
+        eccn_radio.click()
+        logging.info("Selected 'Is U.S. ECCN needed': Yes")
+    else:
+        eccn_radio = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='eccn'][value='0']")))
+        eccn_radio.click()
+        logging.info("Selected 'Is U.S. ECCN needed': No")
+
+    logging.info("Basic information filled.")
+
+    logging.info("Clicking 'Save' button...")
+    save_button = wait.until(EC.element_to_be_clickable((By.ID, "quotation_sava_btn")))
+    save_button.click()
+    logging.info("Clicked 'Save' button.")
+
+    waiter.idle("save basic information", fallback=2)
+    quotation_url = driver.current_url
+
+    open_configuration_tab(driver, wait, waiter)
+    return quotation_url
+
+
+def run_quotation(config_file='Config.txt', screenshot_dir='.', session_file=SESSION_FILE, chromedriver=None,
+                  search_separator=None, catalogue_file=CATALOGUE_FILE, refresh_catalogue=False,
+                  bulk_accessories=True, trace_file=TRACE_FILE, resume=False, base_url=BASE_URL, headless=False,
+                  profile='default', browser_cache_dir=BROWSER_CACHE_DIR, blocked_urls=(), network_report=False,
+                  retries=3, tabs=1, row_order='config',
+                  verify=False, confirm_steps=True, history_file=HISTORY_FILE, dry_run=False,
+                  engine='browser', endpoints_file=None, http_concurrency=8, sync=False,
+                  diagnostics_budget=DEFAULT_BUDGET, compress_diagnostics=False, driver=None):
+    """Logs in and builds one quotation from a configuration file. Returns True once it is complete.
+
+    Progress is checkpointed to a journal in `screenshot_dir`; with `resume`, the quotation
+    of the journaled run is reopened and only the unfinished work is done. Failure screenshots,
+    page source and console logs go to its artifacts directory. With `sync`, the
+    quotation of the same name is updated in place with only the changes; `dry_run` only
+    logs those changes. With `verify`, the
+    finished quotation is checked against the config in one pass and a diff report written;
+    `confirm_steps` keeps the per-accessory confirmation waits. With the 'http'
+    engine the quotation is built over HTTP without starting a browser. Every run is added to
+    the run history in `history_file`, with its phase timings when it is traced to `trace_file`.
+    The network report is on with `network_report` and always with the 'lean' profile. A
+    logged-in `driver` is used as is and left open, as the daemon does with its warm browser.
+    """
+    os.makedirs(screenshot_dir, exist_ok=True)
+    started_at, start = time.time(), time.perf_counter()
+    try:
+        plan = compile_config(config_file)
+    except ConfigError as e:
+        logging.error(str(e))
+        return False
+    plan.log_summary()
+
+    if engine == 'http':
+        from http_engine import run_http_quotation
+        if trace_file:
+            tracing.start(trace_file)
+        ok = False
+        try:
+            ok = run_http_quotation(plan, base_url, session_file, endpoints_file, http_concurrency)
+            return ok
+        except Exception as e:
+            logging.error(f"An unexpected error occurred: {e}", exc_info=True)
+            return False
+        finally:
+            tracer = tracing.finish()
+            if history_file:
+                history.record_run(history_file, tracer, started_at, config_file, ok, time.perf_counter() - start,
+                                   engine, None, len(plan.products))
+
+    # Suppress webdriver_manager logs
+    logging.getLogger('webdriver_manager').setLevel(logging.WARNING)
+
+    config = plan.as_config()
+    products = config['products']
+    journal = Journal(journal_path(config_file, screenshot_dir))
+    resume = resume and not sync and journal.load(config_file)
+    if resume and journal.completed:
+        logging.info(f"Quotation '{journal.quotation_name}' was already completed; nothing to resume.")
+        return True
+    if trace_file:
+        tracing.start(trace_file)
+    diagnostics.start(os.path.join(screenshot_dir, ARTIFACTS_DIR), diagnostics_budget, compress_diagnostics)
+    retry.start(attempts=retries)
+
+    own_driver = driver is None
+    network_report = network_report or profile == 'lean'
+    catalogue = CatalogueCache(catalogue_file, refresh=refresh_catalogue)
+    waiter = index = network = None
+
+    ok = False
+    try:
+        # Setup webdriver; inside the try so a failed start still flushes diagnostics and the trace
+        if own_driver:
+            with tracing.span("driver startup") as startup_span:
+                driver, startup = create_driver(chromedriver, headless, profile, browser_cache_dir, blocked_urls,
+                                                network_report)
+                startup_span.set(resolve=round(startup['resolve'], 3), launch=round(startup['launch'], 3))
+        wait = WebDriverWait(driver, 20) # Increased wait time
+        waiter = PageWaiter(driver, timeout=20)
+        index = PageIndex(driver)
+        network = NetworkMonitor(driver, network_report)
+
+        if own_driver:
+            if not start_session(driver, wait, waiter, base_url, session_file):
+                return False
+            if not (headless or profile == 'lean'):
+                driver.maximize_window()
+                logging.info("Browser window maximized.")
+
+        if sync:
+            with tracing.span("sync quotation"):
+                products = sync_quotation(driver, wait, waiter, plan, journal, catalogue, dry_run)
+            if products is None:
+                ok = True
+                return True
+        elif resume:
+            with tracing.span("reopen quotation"):
+                open_existing_quotation(driver, wait, waiter, journal.quotation_name, journal.quotation_url)
+        else:
+            with tracing.span("create quotation"):
+                journal.start(config_file)
+                quotation_url = create_quotation(driver, wait, waiter, config)
+                journal.quotation_created(config.get("Quotation name"), quotation_url)
+
+        # Add products from config: all adds first, one Add/OK per tab, then the per-product edits
+        to_add = {name: planned for name, planned in plan.products.items() if not journal.is_added(name)}
+        if len(to_add) < len(products):
+            logging.info(f"Skipping {len(products) - len(to_add)} product(s) already in the quotation.")
+        add_products(driver, wait, waiter, index, to_add, search_separator, catalogue, journal, row_order)
+        config_order = list(products)
+        all_products = sorted(journal.added_products(products), key=lambda product: config_order.index(product['name']))
+
+        if tabs > 1:
+            try:
+                configure_accessories_in_tabs(driver, waiter, index, all_products, journal, tabs, bulk_accessories,
+                                              confirm_steps)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                # Whatever the tabs did not save is still pending in the journal for the one-by-one pass
+                logging.error(f"Configuring accessories in tabs failed, continuing one product at a time: {e}")
+                diagnostics.capture(driver, "accessory_tabs", error=e)
+
+        complete = len(all_products) == len(products)
+        for product in all_products:
+            product_name = product['name']
+            pending = {name: qty for name, qty in product['accessories'].items()
+                       if name not in journal.accessories_done(product_name)}
+            if journal.is_edited(product_name) and not pending:
+                logging.info(f"Product {product_name} was completed in the journaled run, skipping.")
+                continue
+            with tracing.span("product", product=product_name) as product_span, log_context(product=product_name):
+                try:
+                    done = retry.call(
+                        f"product {product_name}",
+                        lambda: process_product(driver, wait, waiter, index, product, journal, bulk_accessories,
+                                                confirm_steps),
+                        recover=lambda: return_to_quotation(driver, wait, waiter, journal.quotation_url),
+                        retry_on=REENTRANT,
+                    )
+                    complete = complete and done
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Failed to edit configuration or add accessories for {product_name}: {e}")
+                    diagnostics.capture(driver, "main_product", product_name, e)
+                    product_span.outcome = 'error'
+                    complete = False
+
+            network.collect()
+            logging.info(f"Finished processing product: {product_name}.")
 
+        if complete:
+            journal.complete(config['products'])
+        else:
+            logging.warning(f"Quotation is incomplete; rerun with --resume to finish it (journal: {journal.path}).")
+
+        waiter.idle("final result", fallback=10)
+        if verify:
+            with tracing.span("verify") as verify_span:
+                report = verify_quotation(driver, wait, waiter, config['products'], journal.quotation_url,
+                                          os.path.join(screenshot_dir, REPORT_FILE), journal.added)
+                if not report['ok']:
+                    verify_span.outcome = 'failed'
+                    return False
+        ok = complete
+        return ok
+
+    except SyncRefusedError as e:
+        logging.error(str(e))
+        return False
+    except CircuitOpenError as e:
+        logging.error(f"{e} Stopping; rerun with --resume once the site is back (journal: {journal.path}).")
+        return False
     except Exception as e:
         logging.error(f"An unexpected error occurred: {e}", exc_info=True)
-        driver.save_screenshot('unexpected_error.png')
+        if driver is not None:
+            diagnostics.capture(driver, "unexpected_error", error=e)
+        return False
     finally:
-        logging.info("Closing the browser.")
-        driver.quit()
+        if waiter:
+            waiter.log_summary()
+        retry.finish()
+        if network:
+            network.log_summary()
+        if index:
+            index.log_stats()
+        catalogue.log_stats()
+        catalogue.save()
+        if own_driver and driver is not None:
+            logging.info("Closing the browser.")
+            driver.quit()
+        captures = diagnostics.finish()
+        tracer = tracing.finish()
+        if history_file:
+            history.record_run(history_file, tracer, started_at, config_file, ok, time.perf_counter() - start,
+                               engine, profile, len(config['products']), captures.captured if captures else 0)
+
+
+def main():
+    """Runs a single configuration, or a batch when given several files or a directory."""
+    args = parse_args()
+    run_options = {
+        'session_file': None if args.no_session else args.session_file,
+        'chromedriver': args.chromedriver,
+        'search_separator': args.search_separator,
+        'catalogue_file': args.catalogue_file,
+        'refresh_catalogue': args.refresh_catalogue,
+        'bulk_accessories': not args.no_bulk_accessories,
+        'resume': args.resume,
+        'sync': args.sync,
+        'dry_run': args.dry_run,
+        'diagnostics_budget': args.diagnostics_budget,
+        'compress_diagnostics': args.compress_diagnostics,
+        'base_url': args.base_url.rstrip('/'),
+        'headless': args.headless,
+        'profile': args.profile,
+        'browser_cache_dir': args.browser_cache_dir,
+        'blocked_urls': args.block_url,
+        'network_report': args.network_report,
+        'retries': args.retries,
+        'tabs': args.tabs,
+        'row_order': args.row_order,
+        'verify': args.verify or args.no_step_confirmation,
+        'confirm_steps': not args.no_step_confirmation,
+        'history_file': None if args.no_history else args.history_file,
+        'engine': args.engine,
+        'endpoints_file': args.endpoints,
+        'http_concurrency': args.http_concurrency,
+    }
+    if len(args.config_files) > 1 or any(os.path.isdir(path) for path in args.config_files):
+        from batch import run_batch
+        os.makedirs(args.output_dir, exist_ok=True)
+        setup_logging(os.path.join(args.output_dir, "batch_log.txt"), run="batch", level=args.log_level)
+        run_options['trace_file'] = None if args.no_trace else os.path.basename(args.trace_file)
+        results = run_batch(args.config_files, workers=args.workers, output_dir=args.output_dir, run_options=run_options)
+        ok = bool(results) and all(result[1] for result in results)
+    else:
+        setup_logging(run=os.path.splitext(os.path.basename(args.config_files[0]))[0], level=args.log_level)
+        run_options['trace_file'] = None if args.no_trace else args.trace_file
+        ok = run_quotation(args.config_files[0], **run_options)
+    raise SystemExit(0 if ok else 1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from contextlib import contextmanager
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_BACKUPS = 5
+
+# Run/product/accessory fields attached to every record logged inside log_context()
+_context = contextvars.ContextVar('log_context', default={})
+_listener = None
+
+
+@contextmanager
+def log_context(**fields):
+    """Adds fields such as product or accessory to the structured records logged inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current log context onto each record before it is queued."""
+
+    def __init__(self, run=None):
+        super().__init__()
+        self.run = run
+
+    def filter(self, record):
+        record.context = dict(_context.get(), run=self.run) if self.run else dict(_context.get())
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line with its context fields (tracebacks are in 'msg')."""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'msg': record.getMessage(),
+            **getattr(record, 'context', {}),
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def rotating_handler(path, formatter):
+    """File handler that moves the previous run's file to path.1, path.2, ... instead of overwriting it."""
+    handler = logging.handlers.RotatingFileHandler(path, backupCount=LOG_BACKUPS, encoding='utf-8', delay=True)
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        handler.doRollover()
+    handler.setFormatter(formatter)
+    return handler
+
+
+def stop_logging():
+    """Flushes queued records and stops the background listener."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def setup_logging(log_file="log.txt", run=None, level=logging.INFO, json_log=True):
+    """Configures logging to rotated per-run files and the console through a background listener.
+
+    Callers only put records on a queue; formatting and I/O happen on the listener's thread.
+    With `json_log`, structured records also go to the log file's .jsonl sibling.
+    """
+    stop_logging()
+    text_formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [rotating_handler(log_file, text_formatter), logging.StreamHandler()]
+    handlers[1].setFormatter(text_formatter)
+    if json_log:
+        handlers.append(rotating_handler(f"{os.path.splitext(log_file)[0]}.jsonl", JsonFormatter()))
+
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Level and time are added by the listener's handlers
+    queue_handler.addFilter(ContextFilter(run))
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+
+    global _listener
+    _listener = logging.handlers.QueueListener(records, *handlers)
+    _listener.start()
+
+
+atexit.register(stop_logging)
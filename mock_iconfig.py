@@ -0,0 +1,594 @@
+"""Local stand-in for the iConfig web app, reproducing the elements login.py drives.
+
+Run it on its own to point the script at it by hand:
+
+    python mock_iconfig.py --port 8765 --latency 0.2 Config.txt
+    python login.py Config.txt --base-url http://127.0.0.1:8765/iconfig --no-session
+"""
+import argparse
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from login import get_config
+from plan import PARTS_PREFIXES
+
+COUNTRIES = ['China', 'France', 'Germany', 'Italy', 'Japan', 'Spain', 'United Kingdom', 'United States']
+SESSION_COOKIE = 'mock_iconfig_session'
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>iConfig (mock)</title>
+<style>
+body { font-family: sans-serif; margin: 20px; }
+.hidden { display: none; }
+.modal { position: fixed; top: 60px; left: 50%; transform: translateX(-50%); width: 700px;
+         max-height: 80%; overflow: auto; background: #fff; border: 1px solid #888; padding: 12px; z-index: 500; }
+.blockUI.blockOverlay { position: fixed; top: 0; left: 0; right: 0; bottom: 0; background: rgba(0,0,0,.1); z-index: 1000; }
+.dropdown-menu span, .popup-menu a { display: block; cursor: pointer; padding: 2px; }
+.popup-menu { position: absolute; background: #eee; border: 1px solid #888; max-height: 200px; overflow: auto; z-index: 600; }
+tr.selected { background: #dfd; }
+td { padding: 2px 6px; }
+</style></head>
+<body>
+__BODY__
+<script>
+function overlay(on) {
+    var el = document.getElementById('__overlay');
+    if (on && !el) {
+        el = document.createElement('div');
+        el.id = '__overlay';
+        el.className = 'blockUI blockOverlay';
+        document.body.appendChild(el);
+    } else if (!on && el) {
+        el.parentNode.removeChild(el);
+    }
+}
+function api(method, url, body) {
+    overlay(true);
+    return fetch(url, {method: method, headers: {'Content-Type': 'application/json'},
+                       body: body === undefined ? undefined : JSON.stringify(body)})
+        .then(function (r) { return r.json(); })
+        .finally(function () { overlay(false); });
+}
+function param(name) { return new URLSearchParams(location.search).get(name); }
+function esc(text) { var d = document.createElement('div'); d.textContent = text; return d.innerHTML; }
+__SCRIPT__
+</script></body></html>
+"""
+
+LOGIN_BODY = """
+<h2 id="lblLoginTitle">欢迎渠道用户登录新华三配置器</h2>
+<div class="englishDiv"><a href="javascript:void(0)">English</a></div>
+<ul><li id="InternalUser"><a href="javascript:void(0)">H3C user</a></li></ul>
+<div id="loginForm" class="hidden">
+  <input id="userAccounts"> <input id="password" type="password">
+  <button id="login_submit">Login</button>
+</div>
+"""
+
+LOGIN_SCRIPT = """
+document.querySelector('.englishDiv a').onclick = function () {
+    setTimeout(function () {
+        document.getElementById('lblLoginTitle').textContent = 'Welcome Channel user to login the H3C Configurator';
+    }, 50);
+};
+document.querySelector('#InternalUser a').onclick = function () {
+    document.getElementById('loginForm').classList.remove('hidden');
+};
+document.getElementById('login_submit').onclick = function () {
+    api('POST', '/iconfig/api/login', {user: document.getElementById('userAccounts').value})
+        .then(function () { location.href = '/iconfig/Home'; });
+};
+"""
+
+HOME_BODY = """
+<h2>Home</h2>
+<a id="myH3CQuotation" href="/iconfig/Quotation/List">Quotation</a>
+"""
+
+LIST_BODY = """
+<h2>Quotations</h2>
+<a href="/iconfig/Quotation/Edit">New</a>
+<table id="quotationList"><tbody></tbody></table>
+"""
+
+LIST_SCRIPT = """
+api('GET', '/iconfig/api/quotations').then(function (data) {
+    var body = document.querySelector('#quotationList tbody');
+    data.quotations.forEach(function (q) {
+        var tr = document.createElement('tr');
+        tr.innerHTML = '<td><a href="/iconfig/Quotation/Edit?id=' + q.id + '&tab=config">' + esc(q.name) + '</a></td>';
+        body.appendChild(tr);
+    });
+});
+"""
+
+EDIT_BODY = """
+<div><a class="basic_page" href="javascript:void(0)">Basic information</a> |
+     <a class="config_page" href="javascript:void(0)">Configuration</a></div>
+<div id="basicSection">
+  <input id="quoterName">
+  <button type="button" data-id="countryCode">Select country</button>
+  <div class="dropdown-menu hidden">__COUNTRIES__</div>
+  <label><input type="radio" name="eccn" value="1">Yes</label>
+  <label><input type="radio" name="eccn" value="0">No</label>
+  <button id="quotation_sava_btn">Save</button>
+</div>
+<div id="configSection" class="hidden">
+  <a id="partsCfg" href="javascript:void(0)">Parts</a> | <a id="normCfg" href="javascript:void(0)">Standard</a>
+  | <button id="batchDelete">Delete</button>
+  <table id="configList"><tbody></tbody></table>
+</div>
+<div id="modal" class="modal hidden"></div>
+"""
+
+EDIT_SCRIPT = """
+var quotation = {id: param('id'), country: null};
+var modal = document.getElementById('modal');
+
+function showConfig() {
+    document.getElementById('basicSection').classList.add('hidden');
+    document.getElementById('configSection').classList.remove('hidden');
+    loadList();
+}
+function loadList() {
+    if (!quotation.id) { return; }
+    api('GET', '/iconfig/api/quotation/' + quotation.id).then(function (q) {
+        document.getElementById('quoterName').value = q.name;
+        var body = document.querySelector('#configList tbody');
+        body.innerHTML = '';
+        q.rows.forEach(function (row) {
+            var tr = document.createElement('tr');
+            tr.innerHTML = '<td><input type="checkbox" name="checkList" configname="' + esc(row.configname)
+                + '" siteNum="' + row.sets + '"></td>'
+                + '<td><a class="showConfig" href="/iconfig/Config/Components?id=' + quotation.id
+                + '&cfg=' + encodeURIComponent(row.configname) + '">' + esc(row.config_name) + '</a></td>'
+                + '<td class="sets">' + row.sets + '</td>'
+                + '<td><a class="editConfig pointer" href="javascript:void(0)">Edit</a></td>';
+            tr.querySelector('.editConfig').onclick = function () { openEdit(row); };
+            body.appendChild(tr);
+        });
+    });
+}
+function openAdd(tab) {
+    modal.innerHTML = '<h3>' + tab + '</h3>'
+        + '<input placeholder="Please enter keywords for multiple conditions"> <button id="searchBtn">Search</button>'
+        + '<table id="results"><tbody></tbody></table>'
+        + '<button id="addToTable2">&darr;Add</button>'
+        + '<table id="staged"><tbody></tbody></table>'
+        + '<button id="ok_button">OK</button>';
+    modal.classList.remove('hidden');
+    var staged = [];
+    document.getElementById('searchBtn').onclick = function () {
+        var query = modal.querySelector('input[placeholder]').value;
+        api('GET', '/iconfig/api/search?tab=' + tab + '&q=' + encodeURIComponent(query)).then(function (data) {
+            var body = document.querySelector('#results tbody');
+            body.innerHTML = '';
+            data.products.forEach(function (p) {
+                var tr = document.createElement('tr');
+                tr.innerHTML = '<td><input type="checkbox" name="product"></td><td>' + esc(p.code) + '</td><td>' + esc(p.name) + '</td>';
+                tr.dataset.name = p.name;
+                body.appendChild(tr);
+            });
+        });
+    };
+    document.getElementById('addToTable2').onclick = function () {
+        document.querySelectorAll('#results tr').forEach(function (tr) {
+            var box = tr.querySelector('input');
+            if (box.checked && staged.indexOf(tr.dataset.name) === -1) {
+                staged.push(tr.dataset.name);
+                var row = document.createElement('tr');
+                row.innerHTML = '<td>' + esc(tr.dataset.name) + '</td>';
+                document.querySelector('#staged tbody').appendChild(row);
+                box.checked = false;
+            }
+        });
+    };
+    document.getElementById('ok_button').onclick = function () {
+        modal.classList.add('hidden');
+        modal.innerHTML = '';
+        api('POST', '/iconfig/api/quotation/' + quotation.id + '/add', {tab: tab, names: staged}).then(loadList);
+    };
+}
+function openEdit(row) {
+    modal.innerHTML = '<h3>Group editing</h3>'
+        + 'Config name <input id="configName"> Sets <input name="siteNum"> <button id="ok_button">OK</button>';
+    modal.classList.remove('hidden');
+    document.getElementById('configName').value = row.config_name;
+    modal.querySelector('input[name=siteNum]').value = row.sets;
+    document.getElementById('ok_button').onclick = function () {
+        var body = {configname: row.configname, config_name: document.getElementById('configName').value,
+                    sets: parseInt(modal.querySelector('input[name=siteNum]').value, 10)};
+        modal.classList.add('hidden');
+        modal.innerHTML = '';
+        api('POST', '/iconfig/api/quotation/' + quotation.id + '/edit', body).then(loadList);
+    };
+}
+
+document.querySelector('button[data-id=countryCode]').onclick = function () {
+    document.querySelector('.dropdown-menu').classList.toggle('hidden');
+};
+document.querySelectorAll('.dropdown-menu span').forEach(function (span) {
+    span.onclick = function () {
+        quotation.country = span.textContent;
+        document.querySelector('button[data-id=countryCode]').textContent = span.textContent;
+        document.querySelector('.dropdown-menu').classList.add('hidden');
+    };
+});
+document.getElementById('quotation_sava_btn').onclick = function () {
+    var eccn = document.querySelector('input[name=eccn]:checked');
+    api('POST', '/iconfig/api/quotation/save', {
+        id: quotation.id, name: document.getElementById('quoterName').value,
+        country: quotation.country, eccn: eccn ? eccn.value : null
+    }).then(function (data) {
+        quotation.id = String(data.id);
+        history.replaceState(null, '', '/iconfig/Quotation/Edit?id=' + data.id);
+    });
+};
+document.getElementById('batchDelete').onclick = function () {
+    var confignames = Array.prototype.map.call(document.querySelectorAll('input[name=checkList]:checked'), function (box) {
+        return box.getAttribute('configname');
+    });
+    modal.innerHTML = 'Delete ' + confignames.length + ' configuration(s)? <button id="_confirm_yes">Yes</button>';
+    modal.classList.remove('hidden');
+    document.getElementById('_confirm_yes').onclick = function () {
+        modal.classList.add('hidden');
+        modal.innerHTML = '';
+        api('POST', '/iconfig/api/quotation/' + quotation.id + '/delete', {confignames: confignames}).then(loadList);
+    };
+};
+document.querySelector('.config_page').onclick = showConfig;
+document.getElementById('partsCfg').onclick = function () { openAdd('Parts'); };
+document.getElementById('normCfg').onclick = function () { openAdd('Standard'); };
+if (param('tab') === 'config') { showConfig(); } else { loadList(); }
+"""
+
+COMPONENTS_BODY = """
+<h2>Components</h2>
+<div id="tree"></div>
+<div id="accessoryPage"></div>
+<button id="h3c_save_config">Save</button>
+<button id="back_list">Back</button>
+<div id="confirm" class="modal hidden">Leave this page? <button id="_confirm_yes">Yes</button></div>
+"""
+
+COMPONENTS_SCRIPT = """
+var quotationId = param('id');
+var configname = param('cfg');
+var editing = null;
+
+function closeEditor() {
+    ['popup_textbox', 'action_div'].forEach(function (id) {
+        var el = document.getElementById(id);
+        if (el) { el.parentNode.removeChild(el); }
+    });
+}
+function commit(tr, value) {
+    tr.querySelector('td.item_qty').textContent = String(value);
+    tr.classList.remove('editing');
+    tr.classList.add('selected');
+    closeEditor();
+    editing = null;
+}
+function startEditing(tr, max) {
+    closeEditor();
+    editing = tr;
+    tr.classList.add('editing');
+    var cell = tr.querySelector('td.item_qty');
+    var rect = cell.getBoundingClientRect();
+    var menu = document.createElement('div');
+    menu.id = 'action_div';
+    menu.className = 'popup-menu';
+    menu.style.top = (rect.bottom + window.scrollY) + 'px';
+    menu.style.left = rect.left + 'px';
+    for (var i = 0; i <= max; i++) {
+        var a = document.createElement('a');
+        a.textContent = String(i);
+        a.onclick = (function (value) { return function () { commit(tr, value); }; })(i);
+        menu.appendChild(a);
+    }
+    document.body.appendChild(menu);
+    var input = document.createElement('input');
+    input.id = 'popup_textbox';
+    input.className = 'autocomplete_input';
+    input.style.position = 'absolute';
+    input.style.top = (rect.top + window.scrollY) + 'px';
+    input.style.left = (rect.right + 10) + 'px';
+    input.addEventListener('keydown', function (e) {
+        if (e.key === 'Enter' || e.keyCode === 13) { commit(tr, parseInt(input.value, 10) || 0); }
+    });
+    document.body.appendChild(input);
+    input.focus();
+}
+function renderAccessories(data) {
+    var page = document.getElementById('accessoryPage');
+    page.innerHTML = '<div id="allzhankai"><button id="expand_all">Expand all</button>'
+        + '<table id="items" class="hidden"><tbody></tbody></table></div>';
+    var body = page.querySelector('tbody');
+    data.accessories.forEach(function (acc) {
+        var tr = document.createElement('tr');
+        tr.id = acc.row_id;
+        tr.className = 'item_tr';
+        tr.innerHTML = '<td><span>' + esc(acc.name) + '</span></td><td class="item_qty">' + acc.qty + '</td>';
+        tr.querySelector('td.item_qty').onclick = function () { startEditing(tr, acc.max); };
+        body.appendChild(tr);
+    });
+    document.getElementById('expand_all').onclick = function () {
+        document.getElementById('items').classList.remove('hidden');
+    };
+}
+
+api('GET', '/iconfig/api/quotation/' + quotationId + '/components?cfg=' + encodeURIComponent(configname)).then(function (data) {
+    var link = document.createElement('a');
+    link.id = 'node_title__' + data.product_code + '_0';
+    link.href = 'javascript:void(0)';
+    link.textContent = data.config_name + '#1';
+    link.onclick = function () {
+        api('GET', '/iconfig/api/quotation/' + quotationId + '/components?cfg=' + encodeURIComponent(configname))
+            .then(renderAccessories);
+    };
+    document.getElementById('tree').appendChild(link);
+});
+document.getElementById('h3c_save_config').onclick = function () {
+    var accessories = {};
+    document.querySelectorAll('tr.item_tr.selected').forEach(function (tr) {
+        accessories[tr.querySelector('span').textContent] = parseInt(tr.querySelector('td.item_qty').textContent, 10);
+    });
+    api('POST', '/iconfig/api/quotation/' + quotationId + '/config_save', {configname: configname, accessories: accessories});
+};
+document.getElementById('back_list').onclick = function () {
+    document.getElementById('confirm').classList.remove('hidden');
+};
+document.getElementById('_confirm_yes').onclick = function () {
+    location.href = '/iconfig/Quotation/Edit?id=' + quotationId + '&tab=config';
+};
+"""
+
+
+def product_code(product_name):
+    """Derives a stable 8-character product code from a product name."""
+    return '02' + hashlib.md5(product_name.encode('utf-8')).hexdigest()[:6].upper()
+
+
+def slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_')
+
+
+class MockIConfig:
+    """In-memory catalogue and quotations behind the mock pages and JSON API."""
+
+    def __init__(self, catalogue=None, latency=0.0, accessory_max=64):
+        # catalogue: product name -> {'tab': 'Parts' | 'Standard', 'accessories': [names]}
+        self.catalogue = catalogue or {}
+        self.latency = latency
+        self.accessory_max = accessory_max
+        self.quotations = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config_files(cls, paths, **kwargs):
+        """Builds a catalogue holding every product and accessory named in the given config files."""
+        catalogue = {}
+        for path in paths:
+            for name, data in get_config(path)['products'].items():
+                entry = catalogue.setdefault(name, {
+                    'tab': 'Parts' if name.startswith(PARTS_PREFIXES) else 'Standard',
+                    'accessories': [],
+                })
+                for acc_name in data['accessories']:
+                    cleaned = acc_name.strip().lstrip('-').strip()
+                    if cleaned not in entry['accessories']:
+                        entry['accessories'].append(cleaned)
+        return cls(catalogue, **kwargs)
+
+    def search(self, tab, query):
+        terms = [term for term in re.split(r'[;,\s]+', query) if term]
+        return [
+            {'name': name, 'code': product_code(name)}
+            for name, entry in self.catalogue.items()
+            if entry['tab'] == tab and any(term in name for term in terms)
+        ]
+
+    def save_quotation(self, data):
+        with self.lock:
+            quotation_id = int(data.get('id') or len(self.quotations) + 1)
+            quotation = self.quotations.setdefault(quotation_id, {'id': quotation_id, 'rows': []})
+            quotation.update({'name': data.get('name'), 'country': data.get('country'), 'eccn': data.get('eccn')})
+        return {'id': quotation_id}
+
+    def add_rows(self, quotation_id, names):
+        with self.lock:
+            rows = self.quotations[quotation_id]['rows']
+            # Numbered per product and never reused, so deleted rows leave gaps
+            counters = self.quotations[quotation_id].setdefault('counters', {})
+            for name in names:
+                code = product_code(name)
+                counters[name] = index = counters.get(name, 0) + 1
+                is_parts = self.catalogue.get(name, {}).get('tab') == 'Parts'
+                rows.append({
+                    'configname': f"{name}_{index}" if is_parts else f"{code}_{index}",
+                    'name': name,
+                    'product_code': code,
+                    'config_name': name,
+                    'sets': 1,
+                    'accessories': {},
+                })
+        return {'ok': True}
+
+    def find_row(self, quotation_id, configname):
+        for row in self.quotations[quotation_id]['rows']:
+            if row['configname'] == configname:
+                return row
+        raise KeyError(configname)
+
+    def edit_row(self, quotation_id, data):
+        with self.lock:
+            row = self.find_row(quotation_id, data['configname'])
+            row['config_name'] = data.get('config_name') or row['config_name']
+            row['sets'] = data.get('sets') or row['sets']
+        return {'ok': True}
+
+    def delete_rows(self, quotation_id, confignames):
+        with self.lock:
+            quotation = self.quotations[quotation_id]
+            quotation['rows'] = [row for row in quotation['rows'] if row['configname'] not in confignames]
+        return {'ok': True}
+
+    def components(self, quotation_id, configname):
+        row = self.find_row(quotation_id, configname)
+        return {
+            'product_code': row['product_code'],
+            'config_name': row['config_name'],
+            'accessories': [
+                {
+                    'name': acc_name,
+                    'row_id': f"item_tr_{row['product_code']}_{slug(acc_name)}",
+                    'qty': row['accessories'].get(acc_name, 0),
+                    'max': self.accessory_max,
+                }
+                for acc_name in self.catalogue.get(row['name'], {}).get('accessories', [])
+            ],
+        }
+
+    def save_config(self, quotation_id, data):
+        with self.lock:
+            row = self.find_row(quotation_id, data['configname'])
+            row['accessories'].update(data.get('accessories', {}))
+        return {'ok': True}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Serves the mock pages and JSON API for the MockIConfig on the server."""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real site
+
+    def log_message(self, format, *args):
+        logging.debug("mock iconfig: " + format % args)
+
+    @property
+    def app(self):
+        return self.server.app
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, payload, headers=None):
+        self._send(200, json.dumps(payload), 'application/json', headers)
+
+    def _page(self, body, script=''):
+        self._send(200, PAGE.replace('__BODY__', body).replace('__SCRIPT__', script))
+
+    def _logged_in(self):
+        return f"{SESSION_COOKIE}=" in self.headers.get('Cookie', '')
+
+    def _delay(self):
+        with self.app.lock:
+            self.app.requests += 1
+        if self.app.latency:
+            time.sleep(self.app.latency)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path.rstrip('/')
+
+        if path.startswith('/iconfig/api/'):
+            self._delay()
+            match = re.match(r'/iconfig/api/quotation/(\d+)(/components)?$', path)
+            if path == '/iconfig/api/quotations':
+                self._json({'quotations': [
+                    {'id': q['id'], 'name': q['name']} for q in self.app.quotations.values()
+                ]})
+            elif path == '/iconfig/api/search':
+                self._json({'products': self.app.search(query.get('tab'), query.get('q', ''))})
+            elif match and match.group(2):
+                self._json(self.app.components(int(match.group(1)), query.get('cfg')))
+            elif match:
+                self._json(self.app.quotations[int(match.group(1))])
+            else:
+                self._send(404, '{}', 'application/json')
+            return
+
+        if path in ('', '/iconfig', '/iconfig/Index'):
+            self._page(LOGIN_BODY, LOGIN_SCRIPT)
+        elif not self._logged_in():
+            self._send(302, '', headers={'Location': '/iconfig/Index'})
+        elif path == '/iconfig/Home':
+            self._page(HOME_BODY)
+        elif path == '/iconfig/Quotation/List':
+            self._page(LIST_BODY, LIST_SCRIPT)
+        elif path == '/iconfig/Quotation/Edit':
+            countries = ''.join(f"<span>{country}</span>" for country in COUNTRIES)
+            self._page(EDIT_BODY.replace('__COUNTRIES__', countries), EDIT_SCRIPT)
+        elif path == '/iconfig/Config/Components':
+            self._page(COMPONENTS_BODY, COMPONENTS_SCRIPT)
+        else:
+            self._send(404, 'Not found')
+
+    def do_POST(self):
+        self._delay()
+        length = int(self.headers.get('Content-Length') or 0)
+        data = json.loads(self.rfile.read(length) or b'{}')
+        path = urlparse(self.path).path
+        match = re.match(r'/iconfig/api/quotation/(\d+)/(add|edit|delete|config_save)$', path)
+
+        if path == '/iconfig/api/login':
+            self._json({'ok': True}, {'Set-Cookie': f"{SESSION_COOKIE}={int(time.time())}; Path=/"})
+        elif path == '/iconfig/api/quotation/save':
+            self._json(self.app.save_quotation(data))
+        elif match and match.group(2) == 'add':
+            self._json(self.app.add_rows(int(match.group(1)), data.get('names', [])))
+        elif match and match.group(2) == 'edit':
+            self._json(self.app.edit_row(int(match.group(1)), data))
+        elif match and match.group(2) == 'delete':
+            self._json(self.app.delete_rows(int(match.group(1)), data.get('confignames', [])))
+        elif match:
+            self._json(self.app.save_config(int(match.group(1)), data))
+        else:
+            self._send(404, '{}', 'application/json')
+
+
+def start_mock_server(app, host='127.0.0.1', port=0):
+    """Serves `app` from a background thread. Returns the server and its iConfig base URL."""
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.app = app
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://{host}:{server.server_address[1]}/iconfig"
+    logging.info(f"Mock iConfig serving {len(app.catalogue)} products at {base_url}")
+    return server, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the iConfig web app.')
+    parser.add_argument('config_files', nargs='*', default=['Config.txt'],
+                        help='Config files whose products and accessories form the mock catalogue')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of delay per API request')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server, base_url = start_mock_server(MockIConfig.from_config_files(args.config_files, latency=args.latency),
+                                         port=args.port)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
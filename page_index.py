@@ -0,0 +1,94 @@
+import logging
+
+# Indexes the catalogue results, the quotation's configuration list and the accessory rows
+# in one pass over the page's table rows. A MutationObserver marks the index dirty when rows
+# or their keys change; while it is clean the script returns null and the caller keeps the
+# elements it already has. arguments[0] forces a rebuild.
+SNAPSHOT_JS = """
+var state = window.__iconfigIndex;
+if (!state) {
+    state = window.__iconfigIndex = {dirty: true};
+    new MutationObserver(function () { state.dirty = true; }).observe(document.documentElement, {
+        childList: true, subtree: true, characterData: true,
+        attributes: true, attributeFilter: ['id', 'configname', 'sitenum']
+    });
+}
+if (!state.dirty && !arguments[0]) { return null; }
+state.dirty = false;
+
+function text(el) { return el ? (el.textContent || '').trim() : ''; }
+var results = {}, configs = {}, accessories = {};
+var rows = document.getElementsByTagName('tr');
+for (var i = 0; i < rows.length; i++) {
+    var tr = rows[i];
+    var checkList = tr.querySelector("input[name='checkList']");
+    if (checkList) {
+        var detail = tr.querySelector('a.showConfig');
+        var sets = checkList.getAttribute('siteNum');
+        configs[checkList.getAttribute('configname')] = {
+            row: tr, checkbox: checkList, detail: detail,
+            edit: tr.querySelector("a[class='editConfig pointer']"),
+            name: text(detail), text: text(tr), sets: sets === null ? null : parseInt(sets, 10)
+        };
+        continue;
+    }
+    if (tr.classList.contains('item_tr')) {
+        var span = tr.querySelector('td span');
+        if (span && !(text(span) in accessories)) { accessories[text(span)] = {row: tr, id: tr.id}; }
+        continue;
+    }
+    var checkbox = tr.querySelector("input[type='checkbox']");
+    if (checkbox) {
+        var cells = Array.prototype.map.call(tr.getElementsByTagName('td'), text);
+        var entry = {row: tr, checkbox: checkbox, cells: cells, visible: tr.offsetParent !== null};
+        cells.forEach(function (cell) { if (cell && !(cell in results)) { results[cell] = entry; } });
+    }
+}
+return {results: results, configs: configs, accessories: accessories};
+"""
+
+
+class PageIndex:
+    """Maps product names, confignames and accessory names to their rows from one page snapshot.
+
+    Call refresh() after a step that changes the page; it costs one round trip and only
+    rebuilds when the page's MutationObserver saw a change. Lookups are dict reads.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.results = {}
+        self.configs = {}
+        self.accessories = {}
+        self.snapshots = 0
+        self.reused = 0
+
+    def refresh(self, force=False):
+        data = self.driver.execute_script(SNAPSHOT_JS, force)
+        if data is None:
+            self.reused += 1
+            return self
+        self.snapshots += 1
+        self.results = data['results']
+        self.configs = data['configs']
+        self.accessories = data['accessories']
+        return self
+
+    def result_row(self, product_name):
+        """The catalogue search result row whose cell is exactly `product_name`, with its cells and checkbox."""
+        return self.results.get(product_name)
+
+    def config(self, config_name):
+        """The configuration list row with this configname."""
+        return self.configs.get(config_name)
+
+    def configs_containing(self, fragment):
+        """Confignames of the configuration list that contain `fragment`, e.g. a product code."""
+        return [config_name for config_name in self.configs if fragment in config_name]
+
+    def accessory_row(self, acc_name):
+        """The Components page row of an accessory, by its displayed name."""
+        return self.accessories.get(acc_name)
+
+    def log_stats(self):
+        logging.info(f"Page index: {self.snapshots} snapshot(s), {self.reused} refresh(es) served from the clean index.")
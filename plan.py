@@ -0,0 +1,163 @@
+import logging
+from collections import namedtuple
+
+CONFIG_PAGE = 'Page 2: Configuration'
+PARTS_TAB = ("partsCfg", "Parts")
+STANDARD_TAB = ("normCfg", "Standard")
+TABS_BY_NAME = {tab_name: (tab_id, tab_name) for tab_id, tab_name in (PARTS_TAB, STANDARD_TAB)}
+PARTS_PREFIXES = ('WA', 'SFP', 'QSFP')
+STANDARD_PREFIXES = ('S', 'F', 'R')
+REQUIRED_SETTINGS = ('Quotation name', 'Country')
+ECCN_SETTING = 'Is U.S. ECCN needed'
+
+# One product of the execution plan; `line` is where it appears in the config file
+PlannedProduct = namedtuple(
+    'PlannedProduct', ['name', 'line', 'quantity', 'accessories', 'tab', 'is_parts', 'result_xpath']
+)
+
+
+class ConfigError(ValueError):
+    """A configuration file that cannot be executed; `errors` holds (line number, message) pairs."""
+
+    def __init__(self, path, errors):
+        self.path = path
+        self.errors = errors
+        details = "\n".join(f"  line {line}: {message}" if line else f"  {message}" for line, message in errors)
+        super().__init__(f"{path} has {len(errors)} error(s):\n{details}")
+
+
+def result_row_xpath(product_name):
+    """XPath of a product's row in the catalogue results (not in the quotation's checkList table)."""
+    return f"//tr[contains(., '{product_name}') and .//input[@type='checkbox' and not(@name='checkList')]]"
+
+
+def resolve_tab(product_name):
+    """Returns the (tab id, tab name) a product is added from and whether its prefix is known."""
+    if product_name.startswith(PARTS_PREFIXES):
+        return PARTS_TAB, True
+    if product_name.startswith(STANDARD_PREFIXES):
+        return STANDARD_TAB, True
+    return PARTS_TAB, False
+
+
+def parse_quantity(token):
+    """Reads a quantity such as '4pcs' or '2'. Returns None if it has no digits."""
+    digits = ''.join(filter(str.isdigit, token))
+    return int(digits) if digits else None
+
+
+class ExecutionPlan:
+    """The validated contents of a configuration file: quotation settings and products in config order."""
+
+    def __init__(self, path, settings, products):
+        self.path = path
+        self.settings = settings
+        self.products = products  # product name -> PlannedProduct, in config order
+
+    def as_config(self):
+        """Returns the plan in the dict layout of get_config()."""
+        config = dict(self.settings)
+        config['products'] = {
+            name: {'quantity': product.quantity, 'accessories': dict(product.accessories)}
+            for name, product in self.products.items()
+        }
+        return config
+
+    def log_summary(self):
+        tabs = {}
+        for product in self.products.values():
+            tabs[product.tab[1]] = tabs.get(product.tab[1], 0) + 1
+        accessories = sum(len(product.accessories) for product in self.products.values())
+        logging.info(
+            f"Compiled {self.path}: {len(self.products)} product(s) "
+            f"({', '.join(f'{count} {tab}' for tab, count in tabs.items())}), {accessories} accessory line(s)."
+        )
+
+
+def compile_config(config_file):
+    """Parses and validates a configuration file in one pass. Raises ConfigError listing every bad line."""
+    settings = {}
+    products = {}
+    errors = []
+    unknown_prefix = []
+    page_context = None
+    current = None  # [name, line, quantity, accessories, valid] of the product being read
+
+    def close_product():
+        name, line, quantity, accessories, valid = current
+        if not valid:
+            return
+        tab, known = resolve_tab(name)
+        if not known:
+            unknown_prefix.append((line, name))
+        products[name] = PlannedProduct(
+            name, line, quantity, accessories, tab, tab == PARTS_TAB and known, result_row_xpath(name)
+        )
+
+    with open(config_file, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip()
+            if not line.strip():
+                continue
+
+            if line.startswith('Page '):
+                if current:
+                    close_product()
+                    current = None
+                page_context = line.strip()
+                continue
+
+            if page_context != CONFIG_PAGE:
+                if ':' not in line:
+                    errors.append((line_number, f"expected 'key: value', got {line.strip()!r}"))
+                    continue
+                key, value = line.split(':', 1)
+                settings[key.strip()] = value.strip()
+                continue
+
+            is_accessory = line[0].isspace()
+            parts = line.split()
+            quantity = parse_quantity(parts[-1]) if len(parts) >= 2 else None
+            if quantity is None:
+                errors.append((line_number, f"expected '<name> <quantity>', got {line.strip()!r}"))
+                continue
+            name = " ".join(parts[:-1])
+            if "'" in name:
+                errors.append((line_number, f"{name!r} contains a quote and cannot be located on the page"))
+                continue
+
+            if is_accessory:
+                if current is None:
+                    errors.append((line_number, f"accessory {name!r} does not follow a product"))
+                elif name in current[3]:
+                    errors.append((line_number, f"accessory {name!r} is listed twice for {current[0]}"))
+                else:
+                    current[3][name] = quantity
+                continue
+
+            if current:
+                close_product()
+            # Invalid products still collect their accessory lines so those are not reported too
+            current = [name, line_number, quantity, {}, False]
+            if name in products:
+                errors.append((line_number, f"product {name!r} is already listed on line {products[name].line}"))
+            elif quantity < 1:
+                errors.append((line_number, f"product {name!r} needs a quantity of at least 1"))
+            else:
+                current[4] = True
+    if current:
+        close_product()
+
+    for key in REQUIRED_SETTINGS:
+        if not settings.get(key):
+            errors.append((None, f"missing '{key}: ...' on Page 1"))
+    if settings.get(ECCN_SETTING, 'No') not in ('Yes', 'No'):
+        errors.append((None, f"'{ECCN_SETTING}' must be Yes or No, not {settings[ECCN_SETTING]!r}"))
+    if not products and not errors:
+        errors.append((None, f"no products under '{CONFIG_PAGE}'"))
+    if errors:
+        raise ConfigError(config_file, errors)
+
+    for line_number, name in unknown_prefix:
+        logging.warning(f"Line {line_number}: product {name} has an unknown type. Assuming 'Parts' unless the catalogue knows it.")
+    return ExecutionPlan(config_file, settings, products)
@@ -0,0 +1,138 @@
+import logging
+import random
+import time
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+import tracing
+
+# Errors worth retrying: the page was still moving, covered by the overlay, or slow
+TRANSIENT = ('stale', 'intercepted', 'timeout', 'missing')
+# For whole steps that can be re-entered from a known page, anything short of a lost browser
+REENTRANT = TRANSIENT + ('other',)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of running a step while the site looks down."""
+
+
+def classify(error):
+    """Sorts an exception into the kind of failure it is."""
+    if isinstance(error, StaleElementReferenceException):
+        return 'stale'
+    if isinstance(error, (ElementClickInterceptedException, ElementNotInteractableException)):
+        return 'intercepted'
+    if isinstance(error, TimeoutException):
+        return 'timeout'
+    if isinstance(error, NoSuchElementException):
+        return 'missing'
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return 'session'
+    if isinstance(error, WebDriverException) and 'disconnected' in str(error):
+        return 'session'
+    return 'other'
+
+
+class CircuitBreaker:
+    """Opens after `threshold` steps in a row have failed for good, or at once when the browser is gone."""
+
+    def __init__(self, threshold=3, cooldown=60):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    def check(self, step):
+        if self.opened_at is None:
+            return
+        if time.monotonic() - self.opened_at < self.cooldown:
+            raise CircuitOpenError(f"Not running '{step}': {self.failures} consecutive failures, the site looks down.")
+        self.opened_at = None  # Half-open: let one step through to probe the site
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def failure(self, kind):
+        self.failures += 1
+        if kind == 'session' or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+            logging.error(f"Circuit breaker opened after {self.failures} consecutive failure(s) ({kind}).")
+
+
+class RetryPolicy:
+    """Retries idempotent steps on transient errors with exponential backoff and jitter."""
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=8.0, jitter=0.5, breaker=None):
+        self.attempts = max(1, attempts)  # The action always runs at least once
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = {}  # error kind -> number of retries
+
+    def delay(self, attempt):
+        """Backoff before retry number `attempt` (1-based), spread by +/- jitter."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def call(self, step, action, recover=None, retry_on=TRANSIENT, attempts=None):
+        """Runs `action()` until it succeeds; `recover()` puts the page back in shape before each retry."""
+        attempts = max(1, attempts or self.attempts)
+        for attempt in range(1, attempts + 1):
+            self.breaker.check(step)
+            try:
+                result = action()
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                kind = classify(e)
+                if kind not in retry_on or attempt == attempts:
+                    self.breaker.failure(kind)
+                    raise
+                self.retries[kind] = self.retries.get(kind, 0) + 1
+                tracing.current_span().retries += 1
+                delay = self.delay(attempt)
+                logging.warning(f"'{step}' failed ({kind}: {str(e).splitlines()[0] if str(e) else type(e).__name__}); "
+                                f"retry {attempt}/{attempts - 1} in {delay:.2f}s.")
+                time.sleep(delay)
+                if recover:
+                    try:
+                        recover()
+                    except Exception as recover_error:
+                        logging.warning(f"Recovery before retrying '{step}' failed: {recover_error}")
+                continue
+            self.breaker.success()
+            return result
+
+    def log_summary(self):
+        if self.retries:
+            logging.info(f"Retries by error kind: {self.retries}")
+
+
+_policy = RetryPolicy()
+
+
+def start(attempts=3, base_delay=0.5, max_delay=8.0, breaker_threshold=3):
+    """Sets up a fresh retry policy and circuit breaker for a run."""
+    global _policy
+    _policy = RetryPolicy(attempts, base_delay, max_delay, breaker=CircuitBreaker(breaker_threshold))
+    return _policy
+
+
+def finish():
+    _policy.log_summary()
+
+
+def call(step, action, recover=None, retry_on=TRANSIENT, attempts=None):
+    """Runs a step under the current retry policy."""
+    return _policy.call(step, action, recover, retry_on, attempts)
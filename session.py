@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+SESSION_FILE = "session.json"
+LOGGED_IN_PROBE = (By.ID, "myH3CQuotation")
+
+
+def save_session(driver, path=SESSION_FILE):
+    """Stores the cookies, local storage and landing URL of a logged-in browser."""
+    session = {
+        'saved_at': time.time(),
+        'url': driver.current_url,
+        'cookies': driver.get_cookies(),
+        'local_storage': driver.execute_script(
+            "var items = {};"
+            "for (var i = 0; i < localStorage.length; i++) {"
+            "  var key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+            "}"
+            "return items;"
+        ),
+    }
+    # Write to a temporary file first so concurrent workers never read a partial session
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(session, f)
+    os.replace(tmp_path, path)
+    logging.info(f"Saved login session to {path}.")
+
+
+def load_session(path=SESSION_FILE):
+    """Reads a saved session, or returns None when there is no usable one."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable session file {path}: {e}")
+        return None
+
+
+def restore_session(driver, login_url, path=SESSION_FILE, probe_timeout=10):
+    """Reuses a saved session and returns True if the browser is logged in afterwards."""
+    session = load_session(path)
+    if not session:
+        logging.info("No saved login session found.")
+        return False
+
+    logging.info(f"Restoring login session saved at {time.ctime(session.get('saved_at', 0))}...")
+    # Cookies can only be set for the domain that is currently loaded
+    driver.get(login_url)
+    for cookie in session.get('cookies', []):
+        cookie.pop('sameSite', None)
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException as e:
+            logging.warning(f"Could not restore cookie {cookie.get('name')}: {e}")
+    driver.execute_script(
+        "var items = arguments[0];"
+        "for (var key in items) { localStorage.setItem(key, items[key]); }",
+        session.get('local_storage', {})
+    )
+    driver.get(session.get('url') or login_url)
+
+    if not is_logged_in(driver, probe_timeout):
+        logging.info("Saved login session has expired.")
+        driver.delete_all_cookies()
+        return False
+    logging.info("Saved login session is still valid, skipping login.")
+    return True
+
+
+def is_logged_in(driver, probe_timeout=10):
+    """Returns True if the loaded page shows the logged-in home page."""
+    try:
+        WebDriverWait(driver, probe_timeout).until(EC.presence_of_element_located(LOGGED_IN_PROBE))
+    except TimeoutException:
+        return False
+    return True
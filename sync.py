@@ -0,0 +1,139 @@
+import logging
+import re
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+# Reads every row of the quotation's configuration list in one round trip. The number of
+# sets comes from the checkbox's siteNum attribute, or from the row's sets cell without one.
+READ_ROWS_JS = """
+return Array.prototype.map.call(document.querySelectorAll("input[name='checkList']"), function (box) {
+    var row = box.closest('tr');
+    var link = row.querySelector('a.showConfig');
+    var sets = box.getAttribute('siteNum');
+    if (sets === null) {
+        var cell = row.querySelector('td.sets, td[name=siteNum]');
+        sets = cell ? cell.textContent : null;
+    }
+    return {
+        configname: box.getAttribute('configname'),
+        name: (link ? link.textContent : '').trim(),
+        sets: sets === null ? null : parseInt(sets, 10),
+        href: link ? link.href : null
+    };
+});
+"""
+
+CHECKLIST_LOCATOR = (By.XPATH, "//input[@name='checkList']")
+DELETE_BUTTON = (By.ID, "batchDelete")
+CONFIRM_YES = (By.ID, "_confirm_yes")
+
+
+class SyncRefusedError(RuntimeError):
+    """Raised instead of deleting rows when a sync would remove every row of the quotation."""
+
+
+def read_config_rows(driver):
+    """Returns the configname, config name, number of sets and Components link of every row in the configuration list."""
+    return driver.execute_script(READ_ROWS_JS)
+
+
+def normalize(text):
+    return re.sub(r'\s+', ' ', text or '').strip().casefold()
+
+
+def match_rows(rows, products, known=None):
+    """Pairs the quotation's rows with product names. Returns ({product name: row}, unmatched rows).
+
+    A row belongs to a product when its configname is the one journaled for the product in
+    `known` (product name -> {'config_name', 'product_code'}), when its configname carries the
+    product's code, when its label is the product name, or failing all of those when its label
+    contains the product name (the site can add e.g. a ' #1' suffix). Longer names win, so
+    'S5130S-28P-PWR-EI' is not taken for 'S5130S-28P'.
+    """
+    known = known or {}
+    kept = {}
+    unmatched = list(rows)
+
+    def assign(row, product_name):
+        kept[product_name] = row
+        unmatched.remove(row)
+
+    by_configname = {saved.get('config_name'): name for name, saved in known.items()
+                     if name in products and saved.get('config_name')}
+    for row in list(unmatched):
+        name = by_configname.get(row['configname'])
+        if name and name not in kept:
+            assign(row, name)
+    for name, saved in known.items():
+        code = saved.get('product_code')
+        if name in kept or name not in products or not code:
+            continue
+        for row in unmatched:
+            if code in (row['configname'] or ''):
+                assign(row, name)
+                break
+    names = sorted((name for name in products if name not in kept), key=len, reverse=True)
+    for exact in (True, False):
+        for row in list(unmatched):
+            label = normalize(row['name'])
+            for name in names:
+                if name in kept:
+                    continue
+                if label == normalize(name) if exact else normalize(name) in label:
+                    assign(row, name)
+                    break
+    return kept, unmatched
+
+
+def diff_quotation(rows, products, applied=None, known=None):
+    """Compares the quotation's rows with the configured products.
+
+    Rows are matched to products with match_rows; `known` is the journaled state of the
+    products added by the last run. `applied` maps product names to the accessory quantities
+    of the last completed run; accessory changes can only be found for products listed there.
+    """
+    kept, remove = match_rows(rows, products, known)
+    add = [name for name in products if name not in kept]
+    edit = [name for name, row in kept.items() if row['sets'] != products[name]['quantity']]
+
+    accessories = {}
+    for name in kept:
+        if not applied or name not in applied:
+            continue
+        before, after = applied[name], products[name]['accessories']
+        changed = {acc_name: qty for acc_name, qty in after.items() if before.get(acc_name) != qty}
+        # Accessories dropped from the config are set back to zero
+        changed.update({acc_name: 0 for acc_name in before if acc_name not in after})
+        if changed:
+            accessories[name] = changed
+    return {'kept': kept, 'add': add, 'edit': edit, 'remove': remove, 'accessories': accessories}
+
+
+def log_diff(diff, products):
+    unchanged = len(diff['kept']) - len(set(diff['edit']) | set(diff['accessories']))
+    logging.info(
+        f"Sync: {len(diff['add'])} to add, {len(diff['edit'])} quantity edit(s), "
+        f"{len(diff['accessories'])} accessory change(s), {len(diff['remove'])} to remove, {unchanged} unchanged."
+    )
+    for name in diff['add']:
+        logging.info(f"  + {name}")
+    for name in diff['edit']:
+        logging.info(f"  ~ {name}: sets {diff['kept'][name]['sets']} -> {products[name]['quantity']}")
+    for name, changed in diff['accessories'].items():
+        logging.info(f"  ~ {name}: accessories {changed}")
+    for row in diff['remove']:
+        logging.info(f"  - {row['name'] or row['configname']}")
+
+
+def remove_rows(driver, wait, waiter, rows):
+    """Ticks the given rows of the configuration list and deletes them in one go."""
+    rows_before = len(driver.find_elements(*CHECKLIST_LOCATOR))
+    for row in rows:
+        checkbox = driver.find_element(By.XPATH, f"//input[@name='checkList' and @configname='{row['configname']}']")
+        if not checkbox.is_selected():
+            driver.execute_script("arguments[0].click();", checkbox)
+    wait.until(EC.element_to_be_clickable(DELETE_BUTTON)).click()
+    wait.until(EC.element_to_be_clickable(CONFIRM_YES)).click()
+    logging.info(f"Deleting {len(rows)} row(s) from the quotation.")
+    waiter.row_count_change("rows deleted", CHECKLIST_LOCATOR, rows_before, fallback=3)
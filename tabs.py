@@ -0,0 +1,91 @@
+import logging
+from collections import deque
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+import diagnostics
+import tracing
+from logs import log_context
+
+DEFAULT_TABS = 3
+OPEN_TAB_JS = "window.open(arguments[0], '_blank');"
+
+
+class TabScheduler:
+    """Runs per-product jobs side by side in tabs of the one logged-in browser.
+
+    A job is a generator that works in its own tab and yields whenever the page has to load
+    something; the scheduler then moves on to the next tab, so the loads of up to `max_tabs`
+    pages overlap. Only one tab is driven at a time, and a job's save waits for the server
+    before it yields, so saves never run concurrently.
+    """
+
+    def __init__(self, driver, max_tabs=DEFAULT_TABS):
+        self.driver = driver
+        self.max_tabs = max(1, max_tabs)
+        self.opened = 0
+        self.visits = 0
+
+    def open_tab(self, url):
+        """Starts loading `url` in a new tab without waiting for it and returns the tab's handle."""
+        before = set(self.driver.window_handles)
+        self.driver.execute_script(OPEN_TAB_JS, url)
+        WebDriverWait(self.driver, 10).until(lambda driver: len(driver.window_handles) > len(before))
+        self.opened += 1
+        return (set(self.driver.window_handles) - before).pop()
+
+    def close_tab(self, handle):
+        try:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        except Exception as e:
+            logging.warning(f"Could not close tab {handle}: {e}")
+
+    def run(self, jobs):
+        """Runs (name, url, start) jobs, where start() returns the job's generator.
+
+        Returns a dict of each job name to the generator's return value, or to the exception
+        that stopped it. The browser is back on the original tab afterwards.
+        """
+        home = self.driver.current_window_handle
+        pending = deque(jobs)
+        active = deque()
+        results = {}
+        try:
+            while pending or active:
+                while pending and len(active) < self.max_tabs:
+                    name, url, start = pending.popleft()
+                    try:
+                        active.append((name, self.open_tab(url), start()))
+                    except Exception as e:
+                        logging.error(f"Could not open a tab for {name}: {e}")
+                        results[name] = e
+                if not active:
+                    continue
+                name, handle, steps = active.popleft()
+                self.visits += 1
+                with tracing.span("tab step", product=name) as step_span, log_context(product=name):
+                    try:
+                        self.driver.switch_to.window(handle)
+                        next(steps)
+                    except StopIteration as done:
+                        results[name] = done.value
+                    except Exception as e:
+                        logging.error(f"Tab for {name} failed: {e}")
+                        diagnostics.capture(self.driver, "components_tab", name, e)
+                        step_span.outcome = 'error'
+                        results[name] = e
+                    else:
+                        active.append((name, handle, steps))
+                        continue
+                self.close_tab(handle)
+        finally:
+            for name, handle, steps in active:
+                steps.close()
+                self.close_tab(handle)
+            self.driver.switch_to.window(home)
+        return results
+
+    def log_summary(self):
+        if self.opened:
+            logging.info(f"Tabs: {self.opened} page(s) opened, {self.visits} tab visit(s), up to {self.max_tabs} at once.")
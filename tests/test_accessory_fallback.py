@@ -0,0 +1,39 @@
+import shutil
+
+import pytest
+
+from benchmark import generate_bom, verify
+from journal import Journal, journal_path
+from login import get_config, run_quotation
+from mock_iconfig import MockIConfig, start_mock_server
+
+CHROME = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+pytestmark = pytest.mark.skipif(not any(shutil.which(name) for name in CHROME), reason="needs Chrome")
+
+
+@pytest.mark.parametrize('run_options', [
+    {'bulk_accessories': False},
+    {'bulk_accessories': False, 'confirm_steps': False, 'verify': True},
+])
+def test_per_row_accessories_finish_the_quotation(tmp_path, run_options):
+    """Accessories set one row at a time count as set, so the run completes and nothing is left to resume."""
+    text, catalogue = generate_bom(6)
+    config_file = str(tmp_path / "bom.txt")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+    app = MockIConfig(catalogue)
+    server, base_url = start_mock_server(app)
+    try:
+        ok = run_quotation(
+            config_file, screenshot_dir=str(tmp_path / "run"), session_file=None,
+            catalogue_file=str(tmp_path / "catalogue_cache.json"), trace_file=None, history_file=None,
+            base_url=base_url, headless=True, **run_options
+        )
+    finally:
+        server.shutdown()
+    assert ok
+    assert verify(app, get_config(config_file)) == []
+    journal = Journal(journal_path(config_file, str(tmp_path / "run")))
+    journal.load(config_file)
+    assert journal.completed
@@ -0,0 +1,73 @@
+import time
+
+import login
+from catalogue import CatalogueCache
+from plan import PARTS_TAB, PlannedProduct, resolve_tab, result_row_xpath
+
+
+def test_catalogue_cache_expires_entries(tmp_path):
+    cache = CatalogueCache(str(tmp_path / "catalogue.json"), ttl=60)
+    cache.put('S5130S-28P-PWR-EI', product_code='9801A1QJ', tab='Standard')
+    assert cache.get('S5130S-28P-PWR-EI')['product_code'] == '9801A1QJ'
+    cache.entries['S5130S-28P-PWR-EI']['updated_at'] = time.time() - 61
+    assert cache.get('S5130S-28P-PWR-EI') is None
+    assert 'S5130S-28P-PWR-EI' not in cache.entries
+
+
+def test_catalogue_cache_refresh_ignores_entries(tmp_path):
+    path = str(tmp_path / "catalogue.json")
+    cache = CatalogueCache(path)
+    cache.put('WA6320', tab='Parts')
+    cache.save()
+    assert CatalogueCache(path).get('WA6320') is not None
+    assert CatalogueCache(path, refresh=True).get('WA6320') is None
+
+
+def test_catalogue_cache_save_merges_runs_and_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "catalogue.json")
+    first, second = CatalogueCache(path, max_entries=2), CatalogueCache(path, max_entries=2)
+    first.put('A', tab='Parts')
+    first.put('B', tab='Parts')
+    first.entries['A']['last_used'] -= 100
+    first.save()
+    second.put('C', tab='Standard')
+    second.save()
+    assert sorted(CatalogueCache(path).entries) == ['B', 'C']
+
+
+def test_catalogue_cache_counts_one_lookup_per_product(tmp_path):
+    cache = CatalogueCache(str(tmp_path / "catalogue.json"))
+    cache.put('WA6320', tab='Standard')
+    for _ in range(3):
+        assert cache.get('WA6320') is not None
+        assert cache.get('SFP-XG-LX') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_add_products_looks_for_unfound_products_in_the_other_tab(monkeypatch):
+    located = {'S5130S-28P-PWR-EI': 'Standard', 'WA6320': 'Standard', 'SFP-XG-LX': 'Parts'}
+    visits = []
+
+    def add_tab_group(driver, wait, waiter, index, tab_id, tab_name, group, search_separator=None, catalogue=None,
+                      journal=None, unfound=None):
+        visits.append((tab_name, [(product['name'], product['is_parts']) for product in group]))
+        for product in group:
+            if located[product['name']] != tab_name:
+                unfound.append(((tab_id, tab_name), product))
+        return [product for product in group if located[product['name']] == tab_name]
+    monkeypatch.setattr(login, 'add_tab_group', add_tab_group)
+
+    products = {name: PlannedProduct(name, line, 1, {}, *planned_tab(name), result_row_xpath(name))
+                for line, name in enumerate(located, 6)}
+    added = login.add_products(None, None, None, None, products)
+    assert [product['name'] for product in added] == list(located)
+    assert visits == [
+        ('Standard', [('S5130S-28P-PWR-EI', False)]),
+        ('Parts', [('WA6320', True), ('SFP-XG-LX', True)]),
+        ('Standard', [('WA6320', False)]),  # Guessed Parts from its name, found on Standard
+    ]
+
+
+def planned_tab(name):
+    tab, known = resolve_tab(name)
+    return tab, tab == PARTS_TAB and known
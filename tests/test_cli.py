@@ -0,0 +1,21 @@
+import pytest
+
+from login import parse_args
+
+
+@pytest.mark.parametrize('argv', [
+    ['--dry-run'],
+    ['--retries', '0'],
+    ['--engine', 'http', '--sync'],
+    ['--engine', 'http', '--resume'],
+    ['--engine', 'http', '--verify'],
+])
+def test_parse_args_rejects(argv):
+    with pytest.raises(SystemExit) as raised:
+        parse_args(argv)
+    assert raised.value.code == 2
+
+
+def test_parse_args_accepts_a_sync_dry_run():
+    args = parse_args(['--sync', '--dry-run'])
+    assert args.sync and args.dry_run
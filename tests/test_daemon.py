@@ -0,0 +1,100 @@
+import json
+import os
+import time
+
+import daemon
+from daemon import Daemon, JobQueue
+
+
+def write_config(tmp_path, name):
+    path = tmp_path / name
+    path.write_text("Quotation name: Test\n", encoding='utf-8')
+    return str(path)
+
+
+def age(queue, name, seconds):
+    path = os.path.join(queue.dirs['incoming'], name)
+    os.utime(path, (time.time() - seconds, time.time() - seconds))
+
+
+def test_claim_takes_the_oldest_job_once(tmp_path):
+    queue = JobQueue(str(tmp_path / "spool"))
+    first = queue.submit(write_config(tmp_path, "a.txt"))
+    second = queue.submit(write_config(tmp_path, "b.txt"))
+    age(queue, first, 20)
+    age(queue, second, 10)
+    open(os.path.join(queue.dirs['incoming'], ".partial.txt.tmp"), 'w').close()
+    assert queue.pending() == [first, second]
+
+    name, path, queued = queue.claim()
+    assert name == first and queued >= 20
+    assert path == os.path.join(queue.dirs['running'], first) and os.path.isfile(path)
+    assert queue.claim()[0] == second
+    assert queue.claim() is None
+
+
+def test_claim_skips_a_job_another_daemon_took(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "spool"))
+    taken = queue.submit(write_config(tmp_path, "a.txt"))
+    left = queue.submit(write_config(tmp_path, "b.txt"))
+    age(queue, taken, 20)
+    other = JobQueue(queue.spool_dir)
+    monkeypatch.setattr(queue, 'pending', lambda: [taken, left])
+    other_name = other.claim()[0]
+    assert other_name == taken
+    assert queue.claim()[0] == left
+
+
+def test_finish_moves_the_job_with_its_result(tmp_path):
+    queue = JobQueue(str(tmp_path / "spool"))
+    queue.submit(write_config(tmp_path, "a.txt"))
+    name, _, _ = queue.claim()
+    queue.finish(name, False, {'ok': False, 'error': 'boom'})
+    assert os.listdir(queue.dirs['running']) == []
+    with open(os.path.join(queue.dirs['failed'], f"{os.path.splitext(name)[0]}.result.json"), encoding='utf-8') as f:
+        assert json.load(f) == {'ok': False, 'error': 'boom'}
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.driver = None
+        self.jobs = self.started = 0
+        self.memory_mb = None
+        self.released = []
+        self.closed = False
+
+    def acquire(self):
+        return 'driver'
+
+    def release(self, ok=True):
+        self.released.append(ok)
+
+    def close(self):
+        self.closed = True
+
+
+def test_serve_runs_each_job_and_records_failures(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "spool"))
+    good = queue.submit(write_config(tmp_path, "good.txt"))
+    bad = queue.submit(write_config(tmp_path, "bad.txt"))
+    age(queue, good, 10)
+
+    def run_quotation(config_file, screenshot_dir, driver, **options):
+        assert driver == 'driver' and options == {'trace_file': os.path.join(screenshot_dir, 'trace.jsonl')}
+        if 'bad' in config_file:
+            raise RuntimeError("site down")
+        return True
+    monkeypatch.setattr(daemon, 'run_quotation', run_quotation)
+
+    browser = FakeBrowser()
+    server = Daemon(queue, browser, {'trace_file': 'trace.jsonl'}, poll_interval=0)
+    server.serve(once=True)
+
+    assert (server.completed, server.failed) == (1, 1)
+    assert browser.released == [True, False] and browser.closed
+    assert good in os.listdir(queue.dirs['done']) and bad in os.listdir(queue.dirs['failed'])
+    with open(os.path.join(queue.dirs['failed'], f"{os.path.splitext(bad)[0]}.result.json"), encoding='utf-8') as f:
+        assert json.load(f)['error'] == "site down"
+    with open(server.status_path, encoding='utf-8') as f:
+        status = json.load(f)
+    assert (status['queue_depth'], status['running'], status['completed'], status['failed']) == (0, None, 1, 1)
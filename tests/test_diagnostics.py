@@ -0,0 +1,64 @@
+import base64
+import gzip
+import os
+
+import diagnostics
+from diagnostics import Diagnostics
+
+PNG = base64.b64encode(b"\x89PNG fake").decode('ascii')
+
+
+class FakeDriver:
+    page_source = "<html>page</html>"
+
+    def get_screenshot_as_base64(self):
+        return PNG
+
+    def get_log(self, kind):
+        return [{'level': 'SEVERE', 'message': 'boom'}]
+
+
+def test_capture_writes_the_artifacts_off_the_caller_thread(tmp_path):
+    captures = Diagnostics(str(tmp_path), budget=5)
+    assert captures.capture(FakeDriver(), "select", "S5130S-28P-PWR-EI", ValueError("not found"))
+    captures.close()
+    name = "001_select_S5130S-28P-PWR-EI"
+    assert sorted(os.listdir(tmp_path)) == [f"{name}.{ext}" for ext in ('console.json', 'error.txt', 'html', 'png')]
+    assert (tmp_path / f"{name}.png").read_bytes() == b"\x89PNG fake"
+    assert (tmp_path / f"{name}.error.txt").read_text(encoding='utf-8') == "ValueError: not found"
+
+
+def test_capture_skips_repeats_of_the_same_step_subject_and_error(tmp_path):
+    captures = Diagnostics(str(tmp_path), budget=10)
+    driver = FakeDriver()
+    assert captures.capture(driver, "select", "A", ValueError("Message: "))
+    assert captures.capture(driver, "select", "B", ValueError("Message: "))
+    assert captures.capture(driver, "select", "A", TimeoutError("Message: "))
+    assert not captures.capture(driver, "select", "A", ValueError("Message: \nstacktrace differs"))
+    captures.close()
+    assert (captures.captured, captures.duplicates) == (3, 1)
+
+
+def test_capture_stops_at_the_budget(tmp_path):
+    captures = Diagnostics(str(tmp_path), budget=2)
+    results = [captures.capture(FakeDriver(), "step", str(n)) for n in range(4)]
+    captures.close()
+    assert results == [True, True, False, False]
+    assert (captures.captured, captures.over_budget) == (2, 2)
+    assert len(os.listdir(tmp_path)) == 2 * 3  # png, html and console log each
+
+
+def test_compress_gzips_only_the_text_artifacts(tmp_path):
+    captures = Diagnostics(str(tmp_path), compress=True)
+    captures.capture(FakeDriver(), "save")
+    captures.close()
+    assert sorted(os.listdir(tmp_path)) == ["001_save.console.json.gz", "001_save.html.gz", "001_save.png"]
+    assert gzip.decompress((tmp_path / "001_save.html.gz").read_bytes()) == b"<html>page</html>"
+
+
+def test_module_capture_is_a_no_op_when_off(tmp_path):
+    assert not diagnostics.capture(FakeDriver(), "step")
+    diagnostics.start(str(tmp_path))
+    assert diagnostics.capture(FakeDriver(), "step")
+    assert diagnostics.finish().captured == 1
+    assert not diagnostics.capture(FakeDriver(), "step")
@@ -0,0 +1,66 @@
+import time
+from contextlib import closing
+
+import pytest
+
+import history
+import tracing
+
+
+def test_percentile():
+    assert history.percentile([], 50) is None
+    assert history.percentile([3.0], 50) == 3.0
+    assert history.percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.5
+    assert history.percentile([1.0, 2.0, 3.0, 4.0, 5.0], 90) == pytest.approx(4.6)
+
+
+def add_runs(conn, engine, config, walls):
+    for wall in walls:
+        run_id = conn.execute("INSERT INTO runs (started_at, config, engine, ok, wall) VALUES (?, ?, ?, 1, ?)",
+                              (time.time(), config, engine, wall)).lastrowid
+        conn.execute("INSERT INTO phases (run_id, phase, wall) VALUES (?, 'add products', ?)", (run_id, wall))
+
+
+def test_phase_stats_compares_runs_of_the_same_engine_and_config():
+    conn = history.connect(":memory:")
+    add_runs(conn, 'browser', 'bom_10.txt', [1.0] * 10)
+    add_runs(conn, 'browser', 'bom_100.txt', [10.0] * 5)  # Larger BOM, not a regression
+    add_runs(conn, 'http', 'bom_10.txt', [0.1] * 5)
+    stats = history.phase_stats(conn, recent_runs=5, min_baseline=5)
+    assert not any(entry['regression'] for entry in stats)
+    groups = {(entry['engine'], entry['config']) for entry in stats if entry['phase'] == 'add products'}
+    assert groups == {('browser', 'bom_10.txt'), ('browser', 'bom_100.txt'), ('http', 'bom_10.txt')}
+
+
+def test_phase_stats_flags_a_slower_median():
+    conn = history.connect(":memory:")
+    add_runs(conn, 'browser', 'bom_10.txt', [1.0] * 5 + [1.5] * 5)
+    add_runs(conn, 'http', 'bom_10.txt', [0.1] * 10)
+    stats = history.phase_stats(conn, recent_runs=5, threshold=1.25, min_baseline=5)
+    flagged = {(entry['engine'], entry['phase']) for entry in stats if entry['regression']}
+    assert flagged == {('browser', 'add products'), ('browser', 'run')}
+    only_http = history.phase_stats(conn, recent_runs=5, threshold=1.25, min_baseline=5, engine='http')
+    assert {entry['engine'] for entry in only_http} == {'http'}
+
+
+def test_record_run_stores_each_traced_phase(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    tracer = tracing.Tracer(None)
+    with tracer.span("add products", tab='Standard'):
+        with tracer.span("select", product='S5130S-28P-PWR-EI') as select_span:
+            select_span.retries = 2
+    run_id = history.record_run(path, tracer, time.time(), 'bom.txt', True, 3.0, products=1)
+    with closing(history.connect(path)) as conn:
+        assert conn.execute("SELECT engine, ok, products, retries FROM runs WHERE id = ?", (run_id,)).fetchone() \
+            == ('browser', 1, 1, 2)
+        assert sorted(conn.execute("SELECT phase, subject, retries FROM phases")) \
+            == [('add products', 'Standard', 0), ('select', 'S5130S-28P-PWR-EI', 2)]
+
+
+def test_record_run_without_a_trace_keeps_the_run_timing(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    history.record_run(path, None, time.time(), 'bom.txt', False, 3.0)
+    with closing(history.connect(path)) as conn:
+        assert conn.execute("SELECT ok, wall FROM runs").fetchall() == [(0, 3.0)]
+        assert conn.execute("SELECT COUNT(*) FROM phases").fetchone() == (0,)
+        assert [entry['phase'] for entry in history.phase_stats(conn)] == ['run']
@@ -0,0 +1,28 @@
+from http_engine import find_added_row
+
+
+def product(name, code=None):
+    return {'name': name, 'code': code}
+
+
+def test_find_added_row_does_not_give_a_prefix_product_the_longer_ones_row():
+    rows = [
+        {'configname': 'SFP-XG-LX_1', 'name': None},
+        {'configname': 'SFP-XG_1', 'name': None},
+    ]
+    claimed = set()
+    assert find_added_row(rows, product('SFP-XG'), claimed) is rows[1]
+    assert find_added_row(rows, product('SFP-XG-LX'), claimed) is rows[0]
+
+
+def test_find_added_row_prefers_the_label_then_the_code():
+    rows = [
+        {'configname': '02ABCDEF_1', 'name': 'S5130S-28P'},
+        {'configname': '02123456_1', 'name': 'S5130S-28P-PWR-EI'},
+        {'configname': '02FEDCBA_1', 'name': None},
+    ]
+    claimed = set()
+    assert find_added_row(rows, product('S5130S-28P-PWR-EI', '02ABCDEF'), claimed) is rows[1]
+    assert find_added_row(rows, product('S5130-HI', '02FEDCBA'), claimed) is rows[2]
+    assert find_added_row(rows, product('S5130S-28P'), claimed) is rows[0]
+    assert find_added_row(rows, product('WA6320'), claimed) is None
@@ -0,0 +1,72 @@
+from journal import Journal, journal_path
+
+
+def write_config(tmp_path, text="Quotation name: Test\n"):
+    path = tmp_path / "Config.txt"
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_journal_path_is_per_config_and_run_dir():
+    assert journal_path('configs/bom_10.txt', 'runs/bom_10').replace('\\', '/') == 'runs/bom_10/bom_10.journal.json'
+
+
+def test_load_resumes_a_run_that_created_its_quotation(tmp_path):
+    config_file = write_config(tmp_path)
+    journal = Journal(str(tmp_path / "Config.journal.json"))
+    journal.start(config_file)
+    journal.quotation_created('Test', 'http://mock/quotation/1')
+    journal.product_added({'name': 'S5130S-28P-PWR-EI', 'quantity': 2, 'is_parts': False, 'product_code': '9801A1QJ',
+                           'config_name': '9801A1QJ_1', 'edit_xpath': '//a', 'accessories': {'LSPM2150W': 2}})
+    journal.product_edited('S5130S-28P-PWR-EI')
+    journal.accessories_saved('S5130S-28P-PWR-EI', ['LSPM2150W'])
+    journal.accessories_saved('S5130S-28P-PWR-EI', ['LSPM2150W', 'FAN'])
+
+    resumed = Journal(journal.path)
+    assert resumed.load(config_file)
+    assert (resumed.quotation_name, resumed.quotation_url) == ('Test', 'http://mock/quotation/1')
+    assert resumed.is_added('S5130S-28P-PWR-EI') and resumed.is_edited('S5130S-28P-PWR-EI')
+    assert resumed.accessories_done('S5130S-28P-PWR-EI') == {'LSPM2150W', 'FAN'}
+    assert resumed.added['S5130S-28P-PWR-EI']['config_name'] == '9801A1QJ_1'
+    assert 'accessories' not in resumed.added['S5130S-28P-PWR-EI']  # Only the resume fields are journaled
+
+
+def test_load_starts_over_without_a_journal_or_a_quotation(tmp_path):
+    config_file = write_config(tmp_path)
+    journal = Journal(str(tmp_path / "Config.journal.json"))
+    assert not journal.load(config_file)
+    journal.start(config_file)
+    assert not Journal(journal.path).load(config_file)
+    (tmp_path / "Config.journal.json").write_text("{not json", encoding='utf-8')
+    assert not Journal(journal.path).load(config_file)
+
+
+def test_load_resumes_by_name_after_the_config_changed(tmp_path):
+    config_file = write_config(tmp_path)
+    journal = Journal(str(tmp_path / "Config.journal.json"))
+    journal.start(config_file)
+    journal.quotation_created('Test', None)
+    write_config(tmp_path, "Quotation name: Test\nCountry: Spain\n")
+    assert Journal(journal.path).load(config_file)
+
+
+def test_added_products_follow_the_current_config(tmp_path):
+    journal = Journal(str(tmp_path / "Config.journal.json"))
+    journal.start(write_config(tmp_path))
+    journal.product_added({'name': 'S5130S-28P-PWR-EI', 'quantity': 2, 'config_name': '9801A1QJ_1'})
+    journal.product_added({'name': 'WA6320', 'quantity': 1, 'config_name': 'WA6320_1'})
+    products = {'S5130S-28P-PWR-EI': {'quantity': 4, 'accessories': {'LSPM2150W': 1}}}
+    restored = journal.added_products(products)
+    assert len(restored) == 1
+    assert restored[0]['config_name'] == '9801A1QJ_1'
+    assert (restored[0]['quantity'], restored[0]['accessories']) == (4, {'LSPM2150W': 1})
+
+
+def test_complete_records_the_applied_accessories(tmp_path):
+    journal = Journal(str(tmp_path / "Config.journal.json"))
+    journal.start(write_config(tmp_path), applied={'old': {}})
+    assert journal.applied == {'old': {}}
+    journal.complete({'S5130S-28P-PWR-EI': {'quantity': 2, 'accessories': {'LSPM2150W': 2}}})
+    previous = Journal(journal.path).previous_run()
+    assert previous['completed']
+    assert previous['applied'] == {'S5130S-28P-PWR-EI': {'LSPM2150W': 2}}
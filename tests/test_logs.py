@@ -0,0 +1,54 @@
+import json
+import logging
+
+import pytest
+
+from logs import LOG_BACKUPS, log_context, rotating_handler, setup_logging, stop_logging
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_rotating_handler_keeps_earlier_runs(tmp_path):
+    path = tmp_path / "log.txt"
+    for run in range(LOG_BACKUPS + 3):
+        handler = rotating_handler(str(path), logging.Formatter('%(message)s'))
+        handler.emit(logging.makeLogRecord({'msg': f"run {run}"}))
+        handler.close()
+    assert path.read_text(encoding='utf-8') == f"run {LOG_BACKUPS + 2}\n"
+    assert (tmp_path / "log.txt.1").read_text(encoding='utf-8') == f"run {LOG_BACKUPS + 1}\n"
+    assert (tmp_path / f"log.txt.{LOG_BACKUPS}").exists()
+    assert not (tmp_path / f"log.txt.{LOG_BACKUPS + 1}").exists()
+
+
+def test_rotating_handler_does_not_rotate_an_empty_file(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text("", encoding='utf-8')
+    rotating_handler(str(path), logging.Formatter()).close()
+    assert not (tmp_path / "log.txt.1").exists()
+
+
+def test_setup_logging_writes_text_and_structured_records(tmp_path, restore_logging):
+    log_file = tmp_path / "log.txt"
+    setup_logging(str(log_file), run="bom_10")
+    logging.info("outside")
+    with log_context(product="S5130S-28P-PWR-EI"):
+        with log_context(accessory="LSPM2150W"):
+            logging.warning("inside")
+    logging.debug("not logged at INFO")
+    stop_logging()
+
+    text = log_file.read_text(encoding='utf-8').splitlines()
+    assert [line.split(' - ', 2)[1:] for line in text] == [['INFO', 'outside'], ['WARNING', 'inside']]
+    records = [json.loads(line) for line in (tmp_path / "log.jsonl").read_text(encoding='utf-8').splitlines()]
+    assert [{key: value for key, value in record.items() if key != 'ts'} for record in records] == [
+        {'level': 'INFO', 'msg': 'outside', 'run': 'bom_10'},
+        {'level': 'WARNING', 'msg': 'inside', 'run': 'bom_10', 'product': 'S5130S-28P-PWR-EI', 'accessory': 'LSPM2150W'},
+    ]
@@ -0,0 +1,42 @@
+from page_index import SNAPSHOT_JS, PageIndex
+
+
+class FakeDriver:
+    """Returns queued snapshots; None stands for a clean page index."""
+
+    def __init__(self, *snapshots):
+        self.snapshots = list(snapshots)
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        assert script == SNAPSHOT_JS
+        self.calls.append(args)
+        return self.snapshots.pop(0)
+
+
+SNAPSHOT = {
+    'results': {'S5130S-28P-PWR-EI': {'cells': ['', 'S5130S-28P-PWR-EI', '9801A1QJ'], 'visible': True}},
+    'configs': {'9801A1QJ_1': {'name': 'S5130S-28P-PWR-EI', 'sets': 2}, 'SFP-XG-LX_1': {'name': 'SFP-XG-LX', 'sets': 1}},
+    'accessories': {'LSPM2150W': {'id': 'item_tr_1'}},
+}
+
+
+def test_lookups_read_the_last_snapshot():
+    index = PageIndex(FakeDriver(SNAPSHOT)).refresh()
+    assert index.result_row('S5130S-28P-PWR-EI')['cells'][2] == '9801A1QJ'
+    assert index.result_row('S5130S-28P') is None
+    assert index.config('9801A1QJ_1')['sets'] == 2
+    assert index.configs_containing('9801A1QJ') == ['9801A1QJ_1']
+    assert index.accessory_row('LSPM2150W') == {'id': 'item_tr_1'}
+    assert index.accessory_row('FAN') is None
+
+
+def test_refresh_keeps_the_index_while_the_page_is_unchanged():
+    changed = dict(SNAPSHOT, configs={})
+    driver = FakeDriver(SNAPSHOT, None, changed)
+    index = PageIndex(driver)
+    index.refresh()
+    assert index.refresh().config('9801A1QJ_1')  # Clean: the earlier rows are kept
+    assert index.refresh(force=True).config('9801A1QJ_1') is None
+    assert (index.snapshots, index.reused) == (2, 1)
+    assert driver.calls == [(False,), (False,), (True,)]
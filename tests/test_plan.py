@@ -0,0 +1,49 @@
+import pytest
+
+from plan import PARTS_TAB, STANDARD_TAB, ConfigError, compile_config
+
+SETTINGS = "Page 1: Set basic information\nQuotation name: Test\nCountry: Spain\n\nPage 2: Configuration\n"
+
+
+def write_config(tmp_path, body):
+    path = tmp_path / "Config.txt"
+    path.write_text(SETTINGS + body, encoding='utf-8')
+    return str(path)
+
+
+def test_compile_config_keeps_config_order_and_tabs(tmp_path):
+    plan = compile_config(write_config(tmp_path, "S5130S-28P-PWR-EI\t4pcs\n    LSPM2150W 2pcs\nSFP-GE-LX-SM1310-A 8\n"))
+    assert list(plan.products) == ['S5130S-28P-PWR-EI', 'SFP-GE-LX-SM1310-A']
+    switch, module = plan.products.values()
+    assert (switch.line, switch.quantity, switch.tab, switch.is_parts) == (6, 4, STANDARD_TAB, False)
+    assert (module.line, module.quantity, module.tab, module.is_parts) == (8, 8, PARTS_TAB, True)
+    config = plan.as_config()
+    assert config['Quotation name'] == 'Test'
+    assert config['products']['S5130S-28P-PWR-EI'] == {'quantity': 4, 'accessories': {'LSPM2150W': 2}}
+
+
+def test_compile_config_reports_every_bad_line(tmp_path):
+    path = write_config(tmp_path, (
+        "    SFP-GE-LX-SM1310-A 2pcs\n"  # line 6: accessory before any product
+        "S5130S-28P-PWR-EI 4pcs\n"
+        "    LSPM2150W 2pcs\n"
+        "    LSPM2150W 1pcs\n"           # line 9: accessory listed twice
+        "S5130S-28P-PWR-EI 1pcs\n"       # line 10: product listed twice
+        "WA6320 pcs\n"                   # line 11: no quantity
+    ))
+    with pytest.raises(ConfigError) as raised:
+        compile_config(path)
+    errors = dict(raised.value.errors)
+    assert sorted(errors) == [6, 9, 10, 11]
+    assert "does not follow a product" in errors[6]
+    assert "listed twice" in errors[9]
+    assert "already listed on line 7" in errors[10]
+    assert "line 11:" in str(raised.value)
+
+
+def test_compile_config_requires_settings_and_products(tmp_path):
+    path = tmp_path / "Config.txt"
+    path.write_text("Page 1: Set basic information\nCountry: Spain\n\nPage 2: Configuration\n", encoding='utf-8')
+    with pytest.raises(ConfigError) as raised:
+        compile_config(str(path))
+    assert raised.value.errors == [(None, "missing 'Quotation name: ...' on Page 1")]
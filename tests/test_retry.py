@@ -0,0 +1,58 @@
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+from retry import CircuitBreaker, CircuitOpenError, RetryPolicy, classify
+
+
+def test_classify():
+    assert classify(StaleElementReferenceException()) == 'stale'
+    assert classify(TimeoutException()) == 'timeout'
+    assert classify(WebDriverException("chrome not reachable: disconnected")) == 'session'
+    assert classify(ValueError()) == 'other'
+
+
+def failing(errors, result='done'):
+    """An action raising each of `errors` in turn, then returning `result`; counts its calls."""
+    errors = list(errors)
+
+    def action():
+        action.calls += 1
+        if errors:
+            raise errors.pop(0)
+        return result
+    action.calls = 0
+    return action
+
+
+def test_retry_policy_retries_transient_errors():
+    policy = RetryPolicy(attempts=3, base_delay=0)
+    recovered = []
+    action = failing([StaleElementReferenceException(), TimeoutException()])
+    assert policy.call("step", action, recover=lambda: recovered.append(True)) == 'done'
+    assert action.calls == 3 and len(recovered) == 2
+    assert policy.retries == {'stale': 1, 'timeout': 1}
+
+
+def test_retry_policy_raises_other_errors_at_once():
+    action = failing([ValueError("bad")])
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=3, base_delay=0).call("step", action)
+    assert action.calls == 1
+
+
+def test_retry_policy_always_runs_once():
+    action = failing([])
+    assert RetryPolicy(attempts=0, base_delay=0).call("step", action) == 'done'
+    assert RetryPolicy(base_delay=0).call("step", action, attempts=0) == 'done'
+    assert action.calls == 2
+
+
+def test_circuit_breaker_stops_steps_after_repeated_failures():
+    policy = RetryPolicy(attempts=1, base_delay=0, breaker=CircuitBreaker(threshold=2))
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            policy.call("step", failing([ValueError()]))
+    action = failing([])
+    with pytest.raises(CircuitOpenError):
+        policy.call("step", action)
+    assert action.calls == 0
@@ -0,0 +1,27 @@
+import json
+import sqlite3
+
+import diagnostics
+import login
+import tracing
+
+
+def test_a_browser_that_fails_to_start_still_closes_the_run(tmp_path, monkeypatch):
+    config_file = tmp_path / "Config.txt"
+    config_file.write_text("Page 1: Set basic information\nQuotation name: Test\nCountry: Spain\n\n"
+                           "Page 2: Configuration\nS5130S-28P-PWR-EI 4pcs\n", encoding='utf-8')
+
+    def create_driver(*args, **kwargs):
+        raise RuntimeError("chrome not found")
+    monkeypatch.setattr(login, 'create_driver', create_driver)
+
+    trace_file = tmp_path / "trace.jsonl"
+    ok = login.run_quotation(str(config_file), screenshot_dir=str(tmp_path / "run"), session_file=None,
+                             catalogue_file=str(tmp_path / "catalogue.json"), trace_file=str(trace_file),
+                             history_file=str(tmp_path / "history.sqlite"))
+    assert ok is False
+    assert tracing._tracer is None and diagnostics._diagnostics is None
+    spans = [json.loads(line) for line in trace_file.read_text(encoding='utf-8').splitlines()]
+    assert [(span['name'], span['outcome']) for span in spans] == [('driver startup', 'error')]
+    with sqlite3.connect(tmp_path / "history.sqlite") as conn:
+        assert conn.execute("SELECT ok FROM runs").fetchall() == [(0,)]
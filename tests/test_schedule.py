@@ -0,0 +1,61 @@
+import logging
+
+from login import log_schedule, schedule_products
+from plan import PARTS_TAB, STANDARD_TAB, PlannedProduct, resolve_tab, result_row_xpath
+
+
+def plan(*names):
+    products = {}
+    for line, name in enumerate(names, 6):
+        tab, known = resolve_tab(name)
+        products[name] = PlannedProduct(name, line, 1, {}, tab, tab == PARTS_TAB and known, result_row_xpath(name))
+    return products
+
+
+PRODUCTS = plan('S5130S-28P-PWR-EI', 'SFP-GE-LX', 'SFP-XG-LX', 'S6520X-30QC-EI', 'WA6320')
+
+
+def visits(schedule):
+    return [(tab[1], [product['name'] for product in group]) for tab, group in schedule]
+
+
+def test_config_order_only_merges_neighbours_of_the_same_tab():
+    assert visits(schedule_products(PRODUCTS)) == [
+        ('Standard', ['S5130S-28P-PWR-EI']),
+        ('Parts', ['SFP-GE-LX', 'SFP-XG-LX']),
+        ('Standard', ['S6520X-30QC-EI']),
+        ('Parts', ['WA6320']),
+    ]
+
+
+def test_grouped_order_visits_each_tab_once():
+    assert visits(schedule_products(PRODUCTS, row_order='grouped')) == [
+        ('Standard', ['S5130S-28P-PWR-EI', 'S6520X-30QC-EI']),
+        ('Parts', ['SFP-GE-LX', 'SFP-XG-LX', 'WA6320']),
+    ]
+
+
+class Catalogue:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def get(self, product_name):
+        return self.entries.get(product_name)
+
+
+def test_the_catalogue_tab_overrides_the_name_guess():
+    catalogue = Catalogue({'WA6320': {'tab': 'Standard', 'product_code': '9801A2B3'}})
+    schedule = schedule_products(plan('S5130S-28P-PWR-EI', 'WA6320'), catalogue)
+    assert visits(schedule) == [('Standard', ['S5130S-28P-PWR-EI', 'WA6320'])]
+    assert schedule[0][0] == STANDARD_TAB
+
+
+def test_log_schedule_reports_the_visits_saved(caplog):
+    with caplog.at_level(logging.INFO):
+        log_schedule(schedule_products(PRODUCTS, row_order='grouped'), list(PRODUCTS), 'grouped')
+        log_schedule(schedule_products(PRODUCTS), list(PRODUCTS), 'config')
+    grouped, config = caplog.messages
+    assert "2 tab visit(s) for 5 product(s); saves 3 tab switch(es) and Add dialog(s) over one per product, " \
+           "2 over following config order" in grouped
+    assert "4 tab visit(s) for 5 product(s); saves 1 tab switch(es) and Add dialog(s) over one per product, " \
+           "0 over following config order" in config
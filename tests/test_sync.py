@@ -0,0 +1,33 @@
+from sync import diff_quotation
+
+
+def row(configname, name, sets):
+    return {'configname': configname, 'name': name, 'sets': sets, 'href': None}
+
+
+def products(**quantities):
+    return {name.replace('_', '-'): {'quantity': qty, 'accessories': {}} for name, qty in quantities.items()}
+
+
+def test_diff_quotation_matches_labels_with_a_suffix():
+    rows = [row('S5130S_1', 'S5130S-28P-PWR-EI #1', 4), row('LEGACY_1', 'Old product', 1)]
+    diff = diff_quotation(rows, products(S5130S_28P_PWR_EI=2, S5130S_28P=1))
+    assert diff['kept'] == {'S5130S-28P-PWR-EI': rows[0]}
+    assert diff['add'] == ['S5130S-28P']
+    assert diff['edit'] == ['S5130S-28P-PWR-EI']
+    assert diff['remove'] == [rows[1]]
+
+
+def test_diff_quotation_prefers_journaled_confignames_and_codes():
+    rows = [row('9801A1QJ_2', 'renamed on the site', 4), row('SFP_3', 'other label', 2)]
+    known = {'S5130S-28P-PWR-EI': {'product_code': '9801A1QJ'}, 'SFP-GE-LX': {'config_name': 'SFP_3'}}
+    diff = diff_quotation(rows, products(S5130S_28P_PWR_EI=4, SFP_GE_LX=2), known=known)
+    assert diff['kept'] == {'S5130S-28P-PWR-EI': rows[0], 'SFP-GE-LX': rows[1]}
+    assert not diff['add'] and not diff['edit'] and not diff['remove']
+
+
+def test_diff_quotation_lists_accessory_changes_of_applied_products():
+    configured = {'S5130S-28P-PWR-EI': {'quantity': 4, 'accessories': {'LSPM2150W': 2, 'FAN': 1}}}
+    applied = {'S5130S-28P-PWR-EI': {'LSPM2150W': 1, 'FAN': 1, 'RPS': 1}}
+    diff = diff_quotation([row('S5130S_1', 'S5130S-28P-PWR-EI', 4)], configured, applied)
+    assert diff['accessories'] == {'S5130S-28P-PWR-EI': {'LSPM2150W': 2, 'RPS': 0}}
@@ -0,0 +1,74 @@
+import json
+
+from sync import READ_ROWS_JS
+from verify import READ_COMPONENTS_JS, build_report, verify_quotation
+
+PRODUCTS = {
+    'S5130S-28P-PWR-EI': {'quantity': 2, 'accessories': {'-LSPM2150W': 2, '-FAN-40B-1-A': 1}},
+    'SFP-GE-LX-SM1310-A': {'quantity': 4, 'accessories': {}},
+}
+ROWS = [
+    {'configname': '9801A1QJ_1', 'name': 'S5130S-28P-PWR-EI #1', 'sets': 2, 'href': 'http://mock/components/1'},
+    {'configname': 'SFP-GE-LX-SM1310-A_1', 'name': 'SFP-GE-LX-SM1310-A', 'sets': 4, 'href': None},
+]
+
+
+def test_build_report_passes_a_matching_quotation():
+    report = build_report(ROWS, PRODUCTS, {'S5130S-28P-PWR-EI': {'LSPM2150W': 2, 'FAN-40B-1-A': 1}})
+    assert report['ok']
+    assert report['checked'] == {'rows': 2, 'products': 2, 'components': 1}
+
+
+def test_build_report_fails_a_label_matched_product_missing_an_accessory():
+    report = build_report(ROWS, PRODUCTS, {'S5130S-28P-PWR-EI': {'LSPM2150W': 2}})
+    assert not report['ok']
+    assert not report['missing'] and not report['unexpected']
+    assert report['accessories'] == {
+        'S5130S-28P-PWR-EI': [{'accessory': 'FAN-40B-1-A', 'expected': 1, 'actual': None}]
+    }
+
+
+def test_build_report_matches_rows_by_journaled_configname():
+    rows = [dict(ROWS[0], name='renamed on the site'), ROWS[1]]
+    known = {'S5130S-28P-PWR-EI': {'config_name': '9801A1QJ_1'}}
+    assert build_report(rows, PRODUCTS, {}, known)['missing'] == []
+    assert build_report(rows, PRODUCTS, {})['missing'] == ['S5130S-28P-PWR-EI']
+
+
+class FakeDriver:
+    """Serves the configuration list and one Components page to verify_quotation."""
+
+    def __init__(self, rows, components):
+        self.rows = rows
+        self.components = components
+        self.visited = []
+
+    def execute_script(self, script, *args):
+        if script == READ_ROWS_JS:
+            return self.rows
+        if script == READ_COMPONENTS_JS:
+            return self.components[self.visited[-1]]
+        return None
+
+    def get(self, url):
+        self.visited.append(url)
+
+
+class FakeWait:
+    def until(self, condition):
+        return object()
+
+
+class FakeWaiter:
+    def page_ready(self, what, fallback=None):
+        pass
+
+
+def test_verify_quotation_reads_components_of_label_matched_rows(tmp_path):
+    driver = FakeDriver(ROWS, {'http://mock/components/1': {'LSPM2150W': 2}})
+    report_file = str(tmp_path / "verification.json")
+    report = verify_quotation(driver, FakeWait(), FakeWaiter(), PRODUCTS, report_file=report_file)
+    assert driver.visited == ['http://mock/components/1']
+    assert not report['ok'] and list(report['accessories']) == ['S5130S-28P-PWR-EI']
+    with open(report_file, encoding='utf-8') as f:
+        assert json.load(f) == report
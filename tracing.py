@@ -0,0 +1,165 @@
+import json
+import logging
+import threading
+import time
+
+TRACE_FILE = "trace.jsonl"
+
+
+class Span:
+    """One timed step of a run; use as a context manager."""
+
+    __slots__ = ('tracer', 'id', 'parent', 'depth', 'name', 'attrs', 'start', 'wall', 'retries', 'outcome')
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.retries = 0
+        self.outcome = 'ok'
+        self.wall = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.tracer._push(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.outcome = 'error'
+        self.tracer._pop(self)
+        return False
+
+    def to_dict(self, origin):
+        return {
+            'id': self.id,
+            'parent': self.parent,
+            'depth': self.depth,
+            'name': self.name,
+            'start': round(self.start - origin, 4),
+            'wall': round(self.wall, 4) if self.wall is not None else None,
+            'retries': self.retries,
+            'outcome': self.outcome,
+            'attrs': self.attrs,
+        }
+
+
+class NullSpan:
+    """Stand-in used when tracing is off; accepts the same attribute writes and does nothing."""
+
+    __slots__ = ()
+
+    retries = 0
+    outcome = 'ok'
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """Collects nested spans and writes them as JSON lines."""
+
+    def __init__(self, path=TRACE_FILE):
+        self.path = path
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, span):
+        stack = self._stack()
+        span.parent = stack[-1].id if stack else None
+        span.depth = len(stack)
+        with self._lock:
+            span.id = len(self.spans)
+            self.spans.append(span)
+        stack.append(span)
+
+    def _pop(self, span):
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs)
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else NULL_SPAN
+
+    def write(self):
+        """Writes every recorded span to the trace file."""
+        if not self.path:
+            return  # Kept in memory only, for the run history
+        with open(self.path, 'w', encoding='utf-8') as f:
+            for span in self.spans:
+                f.write(json.dumps(span.to_dict(self.origin), ensure_ascii=False) + '\n')
+        logging.info(f"Wrote {len(self.spans)} trace spans to {self.path}.")
+
+    def log_summary(self, limit=10):
+        """Logs a table of the slowest finished spans that have no children."""
+        parents = {span.parent for span in self.spans}
+        leaves = [span for span in self.spans if span.id not in parents and span.wall is not None]
+        if not leaves:
+            return
+        logging.info("====== Slowest steps ======")
+        logging.info(f"  {'wall':>8}  {'retries':>7}  {'outcome':<7}  step")
+        for span in sorted(leaves, key=lambda s: s.wall, reverse=True)[:limit]:
+            label = span.name + ''.join(f" {key}={value}" for key, value in span.attrs.items())
+            logging.info(f"  {span.wall:7.2f}s  {span.retries:>7}  {span.outcome:<7}  {label}")
+
+
+_tracer = None
+
+
+def start(path=TRACE_FILE):
+    """Turns tracing on for this process; with no `path` the spans are not written to a file."""
+    global _tracer
+    _tracer = Tracer(path)
+    return _tracer
+
+
+def finish():
+    """Writes the trace and its summary, then turns tracing off."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer:
+        tracer.log_summary()
+        tracer.write()
+    return tracer
+
+
+def span(name, **attrs):
+    """Opens a span on the active tracer, or a no-op span when tracing is off."""
+    if _tracer is None:
+        return NULL_SPAN
+    return _tracer.span(name, **attrs)
+
+
+def current_span():
+    """Returns the innermost open span, or a no-op span."""
+    if _tracer is None:
+        return NULL_SPAN
+    return _tracer.current()
@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from accessories import clean_accessory_name
+from sync import diff_quotation, match_rows, read_config_rows
+
+REPORT_FILE = "verification.json"
+SWITCH_LINK = (By.CSS_SELECTOR, "a[id^='node_title__'][id$='_0']")
+
+# Reads every accessory row of an open Components page in one round trip: name -> quantity.
+READ_COMPONENTS_JS = """
+var found = {};
+document.querySelectorAll('tr.item_tr').forEach(function (tr) {
+    var span = tr.querySelector('td span');
+    var cell = tr.querySelector('td.item_qty');
+    if (!span || !cell) { return; }
+    var name = span.textContent.replace(/\\s+/g, ' ').trim();
+    if (!(name in found)) { found[name] = parseInt(cell.textContent, 10); }
+});
+return found;
+"""
+
+
+def read_components(driver, wait, waiter, url):
+    """Opens a row's Components page and returns the quantity of each of its accessories."""
+    driver.get(url)
+    waiter.page_ready("components page for verification", fallback=3)
+    driver.execute_script("arguments[0].click();", wait.until(EC.element_to_be_clickable(SWITCH_LINK)))
+    wait.until(EC.presence_of_element_located((By.ID, "allzhankai")))
+    return driver.execute_script(READ_COMPONENTS_JS)
+
+
+def compare_accessories(expected, actual):
+    """Lists the accessories whose quantity on the page differs from the config."""
+    mismatches = []
+    for acc_name, qty in expected.items():
+        name = clean_accessory_name(acc_name)
+        if actual.get(name) != qty:
+            mismatches.append({'accessory': name, 'expected': qty, 'actual': actual.get(name)})
+    return mismatches
+
+
+def build_report(rows, products, components, known=None):
+    """Compares the quotation's rows and components with the configured products.
+
+    `components` maps product names to the accessory quantities read from their page, or
+    to None when the page could not be read. Rows are matched to products as a sync
+    matches them, with the journaled `known` confignames and codes.
+    """
+    diff = diff_quotation(rows, products, known=known)
+    report = {
+        'missing': diff['add'],
+        'unexpected': [row['name'] or row['configname'] for row in diff['remove']],
+        'sets': [
+            {'product': name, 'expected': products[name]['quantity'], 'actual': diff['kept'][name]['sets']}
+            for name in diff['edit']
+        ],
+        'accessories': {},
+        'unread': [],
+        'checked': {'rows': len(rows), 'products': len(products), 'components': 0},
+    }
+    for name, actual in components.items():
+        if actual is None:
+            report['unread'].append(name)
+            continue
+        report['checked']['components'] += 1
+        mismatches = compare_accessories(products[name]['accessories'], actual)
+        if mismatches:
+            report['accessories'][name] = mismatches
+    report['ok'] = not any(report[key] for key in ('missing', 'unexpected', 'sets', 'accessories', 'unread'))
+    return report
+
+
+def verify_quotation(driver, wait, waiter, products, quotation_url=None, report_file=REPORT_FILE, known=None):
+    """Checks the finished quotation against the config and writes a JSON diff report.
+
+    Reads the configuration list once, then each product with accessories from its
+    Components page with one script. `known` is the journal's record of the added
+    products. Returns the report; report['ok'] is True on a match.
+    """
+    rows = read_config_rows(driver)
+    kept, _ = match_rows(rows, products, known)
+    components = {}
+    for name, data in products.items():
+        if not data['accessories'] or name not in kept:
+            continue  # Missing rows are already reported by the row comparison
+        url = kept[name].get('href')
+        if not url or not url.startswith('http'):
+            components[name] = None
+            continue
+        try:
+            components[name] = read_components(driver, wait, waiter, url)
+        except Exception as e:
+            logging.warning(f"Could not read the components of {name} for verification: {e}")
+            components[name] = None
+    if components and quotation_url:
+        driver.get(quotation_url)
+        waiter.page_ready("quotation after verification", fallback=3)
+
+    report = build_report(rows, products, components, known)
+    tmp_path = f"{report_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, report_file)
+    log_report(report, report_file)
+    return report
+
+
+def log_report(report, report_file):
+    checked = report['checked']
+    if report['ok']:
+        logging.info(f"Verification passed: {checked['rows']} row(s) and {checked['components']} "
+                     f"product component page(s) match the config (report: {report_file}).")
+        return
+    logging.error(
+        f"Verification failed (report: {report_file}): {len(report['missing'])} missing, "
+        f"{len(report['unexpected'])} unexpected, {len(report['sets'])} wrong sets, "
+        f"{len(report['accessories'])} product(s) with wrong accessories, {len(report['unread'])} unread."
+    )
+    for name in report['missing']:
+        logging.error(f"  missing: {name}")
+    for name in report['unexpected']:
+        logging.error(f"  unexpected: {name}")
+    for entry in report['sets']:
+        logging.error(f"  {entry['product']}: sets {entry['actual']}, expected {entry['expected']}")
+    for name, mismatches in report['accessories'].items():
+        for entry in mismatches:
+            logging.error(f"  {name}: {entry['accessory']} is {entry['actual']}, expected {entry['expected']}")
+    for name in report['unread']:
+        logging.error(f"  unread: {name}")
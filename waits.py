@@ -0,0 +1,128 @@
+import logging
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import tracing
+
+OVERLAY_SELECTOR = "div.blockUI.blockOverlay"
+
+# Installs a MutationObserver once per document and records the time of the last DOM change.
+DOM_OBSERVER_JS = """
+if (!window.__iconfigMutation) {
+    window.__iconfigMutation = {last: Date.now()};
+    new MutationObserver(function () {
+        window.__iconfigMutation.last = Date.now();
+    }).observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return Date.now() - window.__iconfigMutation.last;
+"""
+
+PENDING_AJAX_JS = """
+var pending = 0;
+if (window.jQuery) { pending += window.jQuery.active; }
+return pending;
+"""
+
+
+def document_ready():
+    """Condition: the browser reports the document as fully loaded."""
+    def _condition(driver):
+        return driver.execute_script("return document.readyState;") == 'complete'
+    return _condition
+
+
+def overlay_gone():
+    """Condition: no visible blockUI overlay is covering the page."""
+    def _condition(driver):
+        for overlay in driver.find_elements(By.CSS_SELECTOR, OVERLAY_SELECTOR):
+            try:
+                if overlay.is_displayed():
+                    return False
+            except WebDriverException:
+                continue  # Overlay removed between lookup and check
+        return True
+    return _condition
+
+
+def ajax_idle():
+    """Condition: jQuery reports no XHR in flight."""
+    def _condition(driver):
+        return driver.execute_script(PENDING_AJAX_JS) == 0
+    return _condition
+
+
+def dom_settled(quiet=0.3):
+    """Condition: no DOM mutation has been observed for `quiet` seconds."""
+    def _condition(driver):
+        return driver.execute_script(DOM_OBSERVER_JS) >= quiet * 1000
+    return _condition
+
+
+def row_count_changed(locator, before):
+    """Condition: the number of elements matching `locator` differs from `before`."""
+    def _condition(driver):
+        return len(driver.find_elements(*locator)) != before
+    return _condition
+
+
+def all_of(*conditions):
+    """Condition: every given condition holds on the same poll."""
+    def _condition(driver):
+        return all(condition(driver) for condition in conditions)
+    return _condition
+
+
+class PageWaiter:
+    """Waits for real page readiness signals and records how long each wait took."""
+
+    def __init__(self, driver, timeout=20, poll_frequency=0.1):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings = []
+
+    def until(self, step, condition, timeout=None, fallback=0):
+        """Waits for `condition`; on timeout logs a warning, sleeps `fallback` seconds and returns False."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        with tracing.span("wait", step=step) as wait_span:
+            try:
+                WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+                ok = True
+            except TimeoutException:
+                ok = False
+                wait_span.outcome = 'timeout'
+        elapsed = time.perf_counter() - start
+        self.timings.append((step, elapsed, ok))
+        if ok:
+            logging.debug("Wait '%s' satisfied after %.2fs.", step, elapsed)
+        else:
+            logging.warning(f"Wait '{step}' timed out after {elapsed:.2f}s, falling back.")
+            if fallback:
+                time.sleep(fallback)
+        return ok
+
+    def page_ready(self, step, timeout=None, fallback=0):
+        """Waits until the document is loaded, no XHR is pending and the overlay is gone."""
+        return self.until(step, all_of(document_ready(), ajax_idle(), overlay_gone()), timeout, fallback)
+
+    def idle(self, step, timeout=None, fallback=0, quiet=0.3):
+        """Waits until XHRs have finished, the overlay is gone and the DOM has settled."""
+        return self.until(step, all_of(ajax_idle(), overlay_gone(), dom_settled(quiet)), timeout, fallback)
+
+    def row_count_change(self, step, locator, before, timeout=None, fallback=0):
+        """Waits until the number of rows matching `locator` moves away from `before`."""
+        return self.until(step, all_of(row_count_changed(locator, before), overlay_gone()), timeout, fallback)
+
+    def log_summary(self):
+        """Logs the total and slowest waits of the run."""
+        if not self.timings:
+            return
+        total = sum(elapsed for _, elapsed, _ in self.timings)
+        timeouts = sum(1 for _, _, ok in self.timings if not ok)
+        logging.info(f"Waited {total:.2f}s in {len(self.timings)} waits ({timeouts} timed out).")
+        for step, elapsed, ok in sorted(self.timings, key=lambda t: t[1], reverse=True)[:5]:
+            logging.info(f"  {elapsed:6.2f}s  {step}{'' if ok else ' (timeout)'}")